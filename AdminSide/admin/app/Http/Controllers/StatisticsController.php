@@ -91,10 +91,9 @@ public function warmUpCache()
         try {
             \Log::info('Starting cache warm-up...');
             
-            // Warm up forecasts for common horizons
-            foreach ([6, 12, 18, 24] as $horizon) {
-                $this->_getForecast($horizon);
-            }
+            // Warm up forecasts for common horizons and every crime type
+            // with a single batch request
+            $this->_warmUpForecasts([6, 12, 18, 24]);
             
             // Warm up crime stats (all time)
             $this->_getCrimeStats(null, null);
@@ -145,22 +144,115 @@ private function _getForecast($horizon, $crimeType = null)
             $cacheKey .= "_" . md5($crimeType);
         }
 
-        return Cache::remember($cacheKey, 3600, function () use ($horizon, $crimeType) {
+        // Short TTL: after it expires the API is revalidated with the stored ETag,
+        // which costs a 304 instead of a full download while the data is unchanged
+        return Cache::remember($cacheKey, 300, function () use ($horizon, $crimeType, $cacheKey) {
             $params = ['horizon' => $horizon];
             if ($crimeType) {
                 $params['crime_type'] = $crimeType;
             }
 
-            $response = Http::get("{$this->sarimaApiUrl}/forecast", $params);
+            $payload = $this->_getRevalidated('/forecast', $params, $cacheKey);
             
-            if ($response->successful()) {
-                return $response->json()['data'];
+            if ($payload !== null) {
+                return $payload['data'];
             }
             
             throw new \Exception('Failed to fetch forecast from API');
         });
     }
 
+    /**
+     * GET from the SARIMA API with If-None-Match set to the ETag of the
+     * last response stored under $cacheKey; a 304 reuses that body.
+     * Returns the decoded JSON, or null when the API answered an error
+     */
+    private function _getRevalidated($path, array $params, $cacheKey, $timeout = 30)
+    {
+        $stored = Cache::get("{$cacheKey}_etag");
+        $request = Http::timeout($timeout);
+        if ($stored) {
+            $request = $request->withHeaders(['If-None-Match' => $stored['etag']]);
+        }
+
+        $response = $request->get("{$this->sarimaApiUrl}{$path}", $params);
+
+        if ($response->status() === 304 && $stored) {
+            return $stored['body'];
+        }
+
+        if ($response->successful()) {
+            $body = $response->json();
+            if ($response->header('ETag')) {
+                Cache::put("{$cacheKey}_etag", ['etag' => $response->header('ETag'), 'body' => $body], 86400);
+            }
+            return $body;
+        }
+
+        return null;
+    }
+
+    /**
+     * Fill the forecast caches for the given horizons from one
+     * /forecast/batch call (city-wide total plus all crime types)
+     */
+    private function _warmUpForecasts(array $horizons)
+    {
+        $response = Http::timeout(120)->post("{$this->sarimaApiUrl}/forecast/batch", [
+            'crime_types' => 'all',
+            'horizon' => max($horizons),
+            'include_total' => true,
+        ]);
+
+        if (!$response->successful()) {
+            throw new \Exception('Failed to fetch batch forecast from API');
+        }
+
+        $payload = $response->json();
+
+        // Expand the columnar series into the same rows /forecast returns
+        $toRows = function ($series, $horizon) {
+            $rows = [];
+            for ($i = 0; $i < min($horizon, count($series['dates'])); $i++) {
+                $rows[] = [
+                    'date' => $series['dates'][$i],
+                    'forecast' => $series['forecast'][$i],
+                    'lower_ci' => $series['lower_ci'][$i],
+                    'upper_ci' => $series['upper_ci'][$i],
+                ];
+            }
+            return $rows;
+        };
+
+        foreach ($horizons as $horizon) {
+            Cache::put("sarima_forecast_{$horizon}", $toRows($payload['total'], $horizon), 300);
+
+            foreach ($payload['series'] as $crimeType => $series) {
+                Cache::put("sarima_forecast_{$horizon}_" . md5($crimeType), $toRows($series, $horizon), 300);
+            }
+        }
+    }
+
+    /**
+     * Fetch month/year filtered statistics from the SARIMA API
+     * Returns null when the API is unavailable so callers can fall back
+     */
+    private function _getStatsFromApi($path, $month, $year)
+    {
+        try {
+            $params = array_filter(['month' => $month, 'year' => $year]);
+            $payload = $this->_getRevalidated($path, $params, 'sarima_api' . $path . '_' . md5(json_encode($params)), 5);
+
+            if ($payload !== null) {
+                return $payload;
+            }
+        } catch (\Exception $e) {
+            \Log::warning("SARIMA API {$path} unavailable, scanning CSV instead: " . $e->getMessage());
+        }
+
+        return null;
+    }
+
     /**
      * Get crime statistics from CSV files
      * Uses CrimeDAta.csv and DCPO_5years_monthly.csv
@@ -188,6 +280,13 @@ private function _getCrimeStats($month, $year)
         $cacheKey = 'crime_stats_data_v2' . ($month ? "_$month" : "") . ($year ? "_$year" : "");
             
         return Cache::remember($cacheKey, 3600, function () use ($month, $year) {
+            // Served from the SARIMA API's precomputed aggregates when it is up;
+            // the full CSV scan below is only a fallback
+            $apiStats = $this->_getStatsFromApi('/stats', $month, $year);
+            if ($apiStats !== null) {
+                return $apiStats['data'];
+            }
+
             $csvPath = base_path('../data/davao_crime_5years.csv');
             
             if (!file_exists($csvPath)) {
@@ -362,6 +461,15 @@ private function _getBarangayStats($month, $year)
          $cacheKey = 'barangay_crime_stats' . ($month ? "_$month" : "") . ($year ? "_$year" : "");
             
          return Cache::remember($cacheKey, 3600, function () use ($month, $year) {
+             $apiStats = $this->_getStatsFromApi('/barangay-stats', $month, $year);
+             if ($apiStats !== null) {
+                 return [
+                     'data' => $apiStats['data'],
+                     'total_barangays' => $apiStats['total_barangays'],
+                     'total_crimes' => $apiStats['total_crimes']
+                 ];
+             }
+
              $csvPath = base_path('../data/davao_crime_5years.csv');
              if (!file_exists($csvPath)) throw new \Exception('Data file not found at: ' . $csvPath);
 
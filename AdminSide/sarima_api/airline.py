@@ -0,0 +1,244 @@
+"""
+Vectorized estimator for the fixed airline model SARIMA(0,1,1)(0,1,1)[12].
+
+Every series the service fits uses the same order, so instead of one
+statsmodels state-space fit per series this module estimates theta and
+Theta for a whole (series x time) matrix at once:
+
+    w_t = (1 - B)(1 - B^12) y_t = (1 + theta B)(1 + Theta B^12) e_t
+
+The differenced series w is an MA(13) process, and its exact Gaussian
+likelihood (sigma2 concentrated out) is what SARIMAX maximises once the
+13 diffuse start-up observations are burned. The likelihood is:
+
+1. evaluated on a shared parameter grid, where the covariance (and its
+   Cholesky factor) depends only on the parameters, so the factors are
+   computed once and all series are scored with batched matrix products,
+2. refined per series with a shrinking 3x3 pattern search.
+
+Forecasts and confidence intervals are the exact finite-sample best
+linear predictor of the future differences, integrated back to levels.
+Parameters are kept invertible (|theta|, |Theta| < 1) like SARIMAX with
+enforce_invertibility=True.
+"""
+from dataclasses import dataclass
+from statistics import NormalDist
+import numpy as np
+
+SEASON = 12
+MA_LAGS = SEASON + 2        # psi_0 .. psi_13
+U_MAX = 3.5                 # grid bound in atanh space (|theta| <= 0.998)
+MEMORY_BUDGET = 128 * 2**20 # bytes per temporary array of one step (peak is a few times this)
+MAX_MONTHS = 1200           # longest series accepted (100 years of months)
+
+
+@dataclass
+class AirlineFit:
+    theta: np.ndarray       # (S,)
+    seasonal_theta: np.ndarray
+    sigma2: np.ndarray
+    loglike: np.ndarray
+    nobs: int               # differenced observations used per series
+    degenerate: np.ndarray  # bool (S,): differenced series is constant
+
+    @property
+    def params(self) -> np.ndarray:
+        """(S, 3) in SARIMAX order: ma.L1, ma.S.L12, sigma2."""
+        return np.column_stack([self.theta, self.seasonal_theta, self.sigma2])
+
+    def subset(self, rows) -> "AirlineFit":
+        return AirlineFit(self.theta[rows], self.seasonal_theta[rows], self.sigma2[rows],
+                          self.loglike[rows], self.nobs, self.degenerate[rows])
+
+
+# =========================================================
+# Model algebra
+# =========================================================
+def difference(Y: np.ndarray) -> np.ndarray:
+    """(1 - B)(1 - B^12) applied along the last axis."""
+    d = Y[..., 1:] - Y[..., :-1]
+    return d[..., SEASON:] - d[..., :-SEASON]
+
+
+def ma_weights(theta, seasonal_theta) -> np.ndarray:
+    theta = np.asarray(theta, dtype=float)
+    seasonal_theta = np.asarray(seasonal_theta, dtype=float)
+    psi = np.zeros(np.broadcast(theta, seasonal_theta).shape + (MA_LAGS,))
+    psi[..., 0] = 1.0
+    psi[..., 1] = theta
+    psi[..., SEASON] = seasonal_theta
+    psi[..., SEASON + 1] = theta * seasonal_theta
+    return psi
+
+
+def ma_covariance(theta, seasonal_theta, n: int) -> np.ndarray:
+    """(..., n, n) covariance of w for unit innovation variance (banded Toeplitz)."""
+    psi = ma_weights(theta, seasonal_theta)
+    acov = np.zeros(psi.shape[:-1] + (max(n, MA_LAGS),))
+    for h in range(MA_LAGS):
+        acov[..., h] = (psi[..., :MA_LAGS - h] * psi[..., h:]).sum(axis=-1)
+    lags = np.abs(np.subtract.outer(np.arange(n), np.arange(n)))
+    return acov[..., lags]
+
+
+def _rows_per_block(bytes_per_row: int, limit: int) -> int:
+    """How many rows of `bytes_per_row` fit MEMORY_BUDGET (at least 1, at most `limit`)."""
+    return int(max(1, min(limit, MEMORY_BUDGET // max(bytes_per_row, 1))))
+
+
+def _forward_solve(L: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Solve L z = b for batched lower-triangular L (..., n, n), b (..., n)."""
+    n = L.shape[-1]
+    z = np.empty(np.broadcast_shapes(L.shape[:-1], b.shape))
+    for i in range(n):
+        z[..., i] = (b[..., i] - (L[..., i, :i] * z[..., :i]).sum(axis=-1)) / L[..., i, i]
+    return z
+
+
+# =========================================================
+# Estimation
+# =========================================================
+class _Grid:
+    """
+    Parameter grid in atanh space with its inverse Cholesky factors,
+    shared by every series. The (grid x n x n) factors are kept when they
+    fit MEMORY_BUDGET and rebuilt block by block otherwise; scores are
+    computed a block of grid points at a time, so memory stays within
+    the budget whatever the series length.
+    """
+
+    def __init__(self, size: int, n: int):
+        self.n = n
+        self.axis = np.linspace(-U_MAX, U_MAX, size)
+        self.points = np.stack(np.meshgrid(self.axis, self.axis, indexing="ij"), axis=-1).reshape(-1, 2)
+        self._factors = None
+        if len(self.points) * n * n * 8 <= MEMORY_BUDGET:
+            self._factors = self._factor(slice(None))
+
+    def _factor(self, rows):
+        """(logdet, L^-1) for the grid points `rows`."""
+        points = self.points[rows]
+        L = np.linalg.cholesky(ma_covariance(np.tanh(points[:, 0]), np.tanh(points[:, 1]), self.n))
+        return 2.0 * np.log(np.diagonal(L, axis1=1, axis2=2)).sum(axis=-1), np.linalg.inv(L)
+
+    def best(self, W: np.ndarray) -> np.ndarray:
+        """Grid point with the lowest concentrated -2 loglik / n for every row of W."""
+        S, n = W.shape
+        G = len(self.points)
+        # grid points per block: Z is (block, n, S), plus the factors when not kept
+        per_point = 8 * n * (S + (n if self._factors is None else 0))
+        block = _rows_per_block(per_point, G)
+        nll = np.empty((S, G))
+        for lo in range(0, G, block):
+            rows = slice(lo, lo + block)
+            logdet, L_inv = (self._factors[0][rows], self._factors[1][rows]) if self._factors is not None \
+                else self._factor(rows)
+            Z = L_inv @ W.T                                 # (block, n, S)
+            qf = np.einsum("gns,gns->sg", Z, Z)
+            nll[:, rows] = np.log(np.maximum(qf, 1e-300) / n) + logdet / n
+        return self.points[nll.argmin(axis=1)]
+
+
+def _profile_nll(W: np.ndarray, U: np.ndarray):
+    """Concentrated -2 loglik / n and sigma2 for per-series candidates U (S, K, 2)."""
+    n = W.shape[1]
+    L = np.linalg.cholesky(ma_covariance(np.tanh(U[..., 0]), np.tanh(U[..., 1]), n))
+    logdet = 2.0 * np.log(np.diagonal(L, axis1=-2, axis2=-1)).sum(axis=-1)
+    z = _forward_solve(L, W[:, None, :])
+    sigma2 = (z ** 2).sum(axis=-1) / n
+    return np.log(np.maximum(sigma2, 1e-300)) + logdet / n, sigma2
+
+
+def fit_airline(Y: np.ndarray, grid_size: int = 41, rounds: int = 14, chunk: int = 128) -> AirlineFit:
+    """
+    Estimate theta, Theta and sigma2 for every row of Y (series x months).
+
+    Needs at least 15 months per series (13 are lost to differencing) and
+    at most MAX_MONTHS. Series are processed up to `chunk` at a time,
+    fewer when long series would take the step over MEMORY_BUDGET.
+    """
+    Y = np.atleast_2d(np.asarray(Y, dtype=float))
+    if Y.shape[1] > MAX_MONTHS:
+        raise ValueError(f"fit_airline takes at most {MAX_MONTHS} observations per series.")
+    W = difference(Y)
+    S, n = W.shape
+    if n < 2:
+        raise ValueError("fit_airline needs at least 15 observations per series.")
+
+    grid = _Grid(grid_size, n)
+    # the pattern search factors 9 candidate (n x n) covariances per series
+    chunk = _rows_per_block(9 * 8 * n * n, chunk)
+    stencil = np.array([[i, j] for i in (-1, 0, 1) for j in (-1, 0, 1)], dtype=float)
+    u = np.empty((S, 2))
+
+    for lo in range(0, S, chunk):
+        block = W[lo:lo + chunk]
+        rows = np.arange(len(block))
+
+        # 1) shared grid, 2) per-series pattern search around the grid winner
+        best = grid.best(block)
+        step = grid.axis[1] - grid.axis[0]
+        for _ in range(rounds):
+            candidates = np.clip(best[:, None, :] + step * stencil[None], -U_MAX - 1.5, U_MAX + 1.5)
+            values, _ = _profile_nll(block, candidates)
+            best = candidates[rows, values.argmin(axis=1)]
+            step /= 2.0
+        u[lo:lo + chunk] = best
+
+    degenerate = np.all(W == W[:, :1], axis=1)
+    u[degenerate] = 0.0
+
+    nll, sigma2 = np.empty(S), np.empty(S)
+    for lo in range(0, S, chunk):
+        values, variances = _profile_nll(W[lo:lo + chunk], u[lo:lo + chunk, None, :])
+        nll[lo:lo + chunk], sigma2[lo:lo + chunk] = values[:, 0], variances[:, 0]
+    loglike = -0.5 * n * (nll + np.log(2 * np.pi) + 1.0)
+
+    return AirlineFit(np.tanh(u[:, 0]), np.tanh(u[:, 1]), sigma2, loglike, n, degenerate)
+
+
+# =========================================================
+# Forecasting
+# =========================================================
+def forecast_airline(Y: np.ndarray, fit: AirlineFit, steps: int, alpha: float = 0.05, chunk: int = 128):
+    """
+    Mean forecast and (1 - alpha) intervals for every row of Y.
+    Returns (mean, lower, upper), each (S, steps). Not clipped at zero.
+    """
+    Y = np.atleast_2d(np.asarray(Y, dtype=float))
+    if Y.shape[1] > MAX_MONTHS:
+        raise ValueError(f"forecast_airline takes at most {MAX_MONTHS} observations per series.")
+    # a few (n + steps)^2 covariance blocks per series
+    chunk = _rows_per_block(4 * 8 * (Y.shape[1] + steps) ** 2, chunk)
+    if Y.shape[0] > chunk:
+        parts = [
+            forecast_airline(Y[lo:lo + chunk], fit.subset(slice(lo, lo + chunk)), steps, alpha, chunk)
+            for lo in range(0, Y.shape[0], chunk)
+        ]
+        return tuple(np.concatenate(arrays) for arrays in zip(*parts))
+
+    W = difference(Y)
+    S, n = W.shape
+
+    # best linear predictor of the next `steps` differences given the observed ones
+    cov = ma_covariance(fit.theta, fit.seasonal_theta, n + steps)      # (S, n+h, n+h)
+    cov_oo, cov_fo, cov_ff = cov[:, :n, :n], cov[:, n:, :n], cov[:, n:, n:]
+    gain = np.linalg.solve(cov_oo, np.swapaxes(cov_fo, 1, 2))          # (S, n, h)
+    w_hat = np.einsum("snh,sn->sh", gain, W)
+    w_err = cov_ff - np.einsum("shn,snk->shk", cov_fo, gain)
+
+    # integrate back to levels: y_t = y_{t-1} + y_{t-12} - y_{t-13} + w_t
+    history = np.concatenate([Y, np.zeros((S, steps))], axis=1)
+    T = Y.shape[1]
+    for k in range(steps):
+        t = T + k
+        history[:, t] = history[:, t - 1] + history[:, t - SEASON] - history[:, t - SEASON - 1] + w_hat[:, k]
+    mean = history[:, T:]
+
+    # level errors are A @ difference errors with A[k, j] = floor((k - j) / 12) + 1
+    lag = np.subtract.outer(np.arange(steps), np.arange(steps))
+    A = np.where(lag >= 0, lag // SEASON + 1, 0).astype(float)
+    var = np.einsum("kj,sjl,kl->sk", A, w_err, A) * fit.sigma2[:, None]
+    half = NormalDist().inv_cdf(1 - alpha / 2) * np.sqrt(np.maximum(var, 0.0))
+
+    return mean, mean - half, mean + half
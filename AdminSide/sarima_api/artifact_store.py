@@ -0,0 +1,147 @@
+import hashlib
+import json
+import os
+import re
+import tempfile
+from typing import Dict, Optional, Sequence
+import numpy as np
+import pandas as pd
+
+
+def file_hash(path: str) -> str:
+    """sha1 of a file's bytes (used to tag artifacts with their source CSV)."""
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def series_hash(target_ts: pd.Series) -> str:
+    """sha1 of a monthly series' dates and values."""
+    h = hashlib.sha1()
+    h.update(np.asarray(target_ts.index.asi8, dtype=np.int64).tobytes())
+    h.update(np.asarray(target_ts.values, dtype=np.float64).tobytes())
+    return h.hexdigest()
+
+
+def _slug(name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_]+", "_", name).lower() or "series"
+
+
+def _write_json(path: str, data: dict) -> None:
+    """
+    Write via a unique temp file + os.replace (atomic on the same
+    filesystem), so processes saving the same artifact never share one.
+    """
+    tmp_path = None
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"[WARN] Could not write artifact {path}: {e}")
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _read_json(path: str) -> Optional[dict]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"[WARN] Ignoring unreadable artifact {path}: {e}")
+        return None
+
+
+class ArtifactStore:
+    """
+    Fitted SARIMAX parameters on disk, one JSON file per series.
+
+    Each artifact records the model order, the aggregated series it was
+    fit on and its hash, and the hash of the source CSV. Params are only
+    handed back when both the order and the series hash still match, so
+    a changed series is refit and everything else is reused.
+    """
+
+    def __init__(self, root: str, order: Sequence[int], seasonal_order: Sequence[int]):
+        self.order = list(order)
+        self.seasonal_order = list(seasonal_order)
+        tag = "sarima_" + "".join(map(str, order)) + "_" + "".join(map(str, seasonal_order))
+        self.root = os.path.join(root, tag)
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.root, f"{_slug(name)}.json")
+
+    def load_params(self, name: str, target_ts: pd.Series, enforce: bool = False) -> Optional[np.ndarray]:
+        """Stored params for `name`, or None when missing or stale."""
+        path = self._path(name)
+        if not os.path.exists(path):
+            return None
+        artifact = _read_json(path)
+        if (
+            artifact is None
+            or artifact.get("name") != name
+            or artifact.get("order") != self.order
+            or artifact.get("seasonal_order") != self.seasonal_order
+            or artifact.get("enforce") != enforce
+            or artifact.get("series_hash") != series_hash(target_ts)
+        ):
+            return None
+        return np.asarray(artifact["params"], dtype=float)
+
+    def save(self, name: str, target_ts: pd.Series, params: Sequence[float],
+             enforce: bool = False, csv_hash: str = None) -> None:
+        artifact = {
+            "name": name,
+            "order": self.order,
+            "seasonal_order": self.seasonal_order,
+            "enforce": enforce,
+            "csv_hash": csv_hash,
+            "series_hash": series_hash(target_ts),
+            "params": [float(p) for p in params],
+            "index": [str(d.date()) for d in target_ts.index],
+            "values": [float(v) for v in target_ts.values],
+        }
+        _write_json(self._path(name), artifact)
+
+
+class OrderStore:
+    """
+    The winning SARIMA order per series from the offline order search
+    (order_search.py), one JSON file per series, with the params and
+    series hash it was fitted on. The order stays in use after the data
+    changes; the params are only reused while the series hash matches.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.root, f"{_slug(name)}.json")
+
+    def load_all(self) -> Dict[str, dict]:
+        """series name -> winner record, for every readable file."""
+        winners = {}
+        if not os.path.isdir(self.root):
+            return winners
+        for filename in sorted(os.listdir(self.root)):
+            if filename.endswith(".json"):
+                record = _read_json(os.path.join(self.root, filename))
+                if record and "name" in record and "order" in record:
+                    winners[record["name"]] = record
+        return winners
+
+    def save(self, name: str, target_ts: pd.Series, winner: dict, csv_hash: str = None) -> None:
+        os.makedirs(self.root, exist_ok=True)
+        record = dict(winner, name=name, csv_hash=csv_hash, series_hash=series_hash(target_ts))
+        _write_json(self._path(name), record)
+
+    @staticmethod
+    def params_for(record: Optional[dict], target_ts: pd.Series) -> Optional[np.ndarray]:
+        """The winner's params when they were fitted on exactly this series."""
+        if record is None or record.get("series_hash") != series_hash(target_ts):
+            return None
+        return np.asarray(record["params"], dtype=float)
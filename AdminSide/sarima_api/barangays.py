@@ -0,0 +1,202 @@
+import difflib
+import os
+import re
+import unicodedata
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from dataset import BASE_DIR
+
+
+# =========================================================
+# Paths
+# =========================================================
+DEFAULT_BARANGAY_LIST = os.getenv(
+    "SARIMA_BARANGAY_LIST",
+    os.path.abspath(os.path.join(BASE_DIR, "..", "..", "LIST OF BARANGAYS 2024.csv")),
+)
+UNASSIGNED_STATION = "UNASSIGNED"
+
+# "(BRGY IS NOW UNDER PS 18, DCPO)" notes in the crime data override the list
+STATION_NOTE = re.compile(r"\(\s*BRGY\s+(?:IS\s+NOW\s+)?UNDER\s+PS\s*(\d+)[^)]*\)", re.IGNORECASE)
+
+# match keys of crime-data spellings -> key of the listed barangay they
+# mean, for names too far apart for the spelling match
+BARANGAY_ALIASES: Dict[str, str] = {
+    "AQUINO": "WILFREDO AQUINO",
+    "DUTERTE": "GOVERNOR VICENTE DUTERTE",
+    "CENTRO SAN JUAN": "CENTRO AGDAO SAN JUAN",
+    "MATINA APLAYA": "75A MATINA APLAYA",
+    "MATINA CROSSING": "74A MATINA CROSSING",
+    "ALFONSO ANGLIONGTO SR": "ANGLIONGTO",
+    "BAGUIO PROPER": "BAGUIO",
+    "CALINAN": "CALINAN POB",
+    "SALUMAY": "DATU SALUMAY",
+    "SANTO NINO": "STO NINO",
+}
+
+
+# =========================================================
+# Name matching
+# =========================================================
+def normalize_barangay(name: str) -> str:
+    """
+    Match key for a barangay name: uppercase, without accents, station
+    notes, "(POB.)" markers, a leading BARANGAY/BRGY, hyphens or
+    punctuation. "BARANGAY 19-B (POB.)" and "BRGY 19-B" both become
+    "19B"; "Sto. Niño" becomes "STO NINO".
+    """
+    key = unicodedata.normalize("NFKD", str(name)).encode("ascii", "ignore").decode("ascii")
+    key = STATION_NOTE.sub(" ", key.upper())
+    key = re.sub(r"\(\s*P?OB\.?\s*\)", " ", key)
+    key = re.sub(r"^\s*(BARANGAY|BRGY\.?)\s*", "", key)
+    key = key.replace("-", "")
+    key = re.sub(r"[^A-Z0-9]+", " ", key)
+    return " ".join(key.split())
+
+
+def station_note(name: str):
+    """Station named in a "(BRGY IS NOW UNDER PS n, ...)" note, e.g. "PS18", else None."""
+    match = STATION_NOTE.search(str(name))
+    return f"PS{int(match.group(1))}" if match else None
+
+
+def read_listing(path: str = DEFAULT_BARANGAY_LIST) -> List[tuple]:
+    """(station, barangay) rows of the STATION/BARANGAY columns, in file order."""
+    if not os.path.exists(path):
+        print(f"[WARN] Barangay list not found at {path}; every barangay is {UNASSIGNED_STATION}.")
+        return []
+
+    listing = pd.read_csv(path, dtype=str)
+    return [
+        (station.strip().upper(), barangay.strip())
+        for station, barangay in zip(listing["STATION"], listing["BARANGAY"])
+        if isinstance(station, str) and isinstance(barangay, str) and barangay.strip()
+    ]
+
+
+def station_sort_key(station: str):
+    """PS1, PS2, ..., PS20, then anything else (UNASSIGNED last)."""
+    match = re.fullmatch(r"PS(\d+)", station)
+    return (0, int(match.group(1)), "") if match else (1, 0, station)
+
+
+# =========================================================
+# Canonical code tables
+# =========================================================
+class BarangayCodes:
+    """
+    Every raw barangay spelling resolved once to a canonical barangay id,
+    and every canonical barangay to a police station code, so rollups
+    are integer groupbys (np.bincount over `canonical` / `station_codes`)
+    instead of name matching at query time.
+
+    Canonical barangays are the rows of LIST OF BARANGAYS 2024.csv (one
+    per match key), plus any name in the crime data that matches none of
+    them. A raw name resolves by its match key, then BARANGAY_ALIASES,
+    then a close spelling (named barangays only; numbered ones like 11-A
+    vs 1-A are never fuzzy-matched). A "(BRGY IS NOW UNDER PS n)" note
+    moves the whole canonical barangay to that station, since the crime
+    data is newer than the list.
+
+    Immutable: `extend` returns a new table for raw names seen later.
+    """
+
+    def __init__(self, names: List[str], keys: List[str], station_of: np.ndarray, stations: List[str],
+                 raw_names: List[str], canonical: np.ndarray, methods: List[str]):
+        self.names = names              # canonical id -> display name
+        self.keys = keys                # canonical id -> match key
+        self.station_of = station_of    # canonical id -> station code
+        self.stations = stations        # station code -> label
+        self.raw_names = raw_names      # resolved raw spellings, in resolution order
+        self.canonical = canonical      # raw position -> canonical id
+        self.methods = methods          # raw position -> "exact" | "alias" | "fuzzy" | "unlisted"
+        self._by_key = {key: i for i, key in enumerate(keys)}
+        self._listed = len(keys) - methods.count("unlisted")
+
+    @classmethod
+    def from_listing(cls, listing: List[tuple]) -> "BarangayCodes":
+        names, keys, station_labels = [], [], []
+        seen = set()
+        for station, barangay in listing:
+            key = normalize_barangay(barangay)
+            if key not in seen:
+                seen.add(key)
+                names.append(barangay)
+                keys.append(key)
+                station_labels.append(station)
+        stations = sorted(set(station_labels) | {UNASSIGNED_STATION}, key=station_sort_key)
+        position = {label: i for i, label in enumerate(stations)}
+        station_of = np.array([position[label] for label in station_labels], dtype=np.int32)
+        return cls(names, keys, station_of, stations, [], np.array([], dtype=np.int32), [])
+
+    @classmethod
+    def load(cls, raw_names: List[str], path: str = DEFAULT_BARANGAY_LIST) -> "BarangayCodes":
+        return cls.from_listing(read_listing(path)).extend(raw_names)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    @property
+    def station_codes(self) -> np.ndarray:
+        """raw position -> station code."""
+        return self.station_of[self.canonical]
+
+    def match_key(self, name: str) -> str:
+        """Canonical match key for any spelling (its own key when it resolves to nothing)."""
+        key = normalize_barangay(name)
+        key = BARANGAY_ALIASES.get(key, key)
+        if key in self._by_key:
+            return key
+        close = self._close_match(key)
+        return close if close is not None else key
+
+    def _close_match(self, key: str):
+        if len(key) < 6 or key[0].isdigit():
+            return None
+        close = difflib.get_close_matches(key, self.keys[:self._listed], n=1, cutoff=0.85)
+        return close[0] if close else None
+
+    def extend(self, raw_names: List[str]) -> "BarangayCodes":
+        """Table that also resolves `raw_names` (already resolved ones are skipped)."""
+        known = set(self.raw_names)
+        new_names = [name for name in dict.fromkeys(raw_names) if name not in known]
+        if not new_names:
+            return self
+
+        names, keys = list(self.names), list(self.keys)
+        station_of, stations = list(self.station_of), list(self.stations)
+        by_key = dict(self._by_key)
+        canonical, methods = list(self.canonical), list(self.methods)
+
+        for raw in new_names:
+            key = normalize_barangay(raw)
+            alias = BARANGAY_ALIASES.get(key)
+            if key in by_key:
+                method = "exact"
+            elif alias in by_key:
+                key, method = alias, "alias"
+            else:
+                close = self._close_match(key)
+                key, method = (close, "fuzzy") if close is not None else (key, "unlisted")
+
+            if method == "unlisted" and key not in by_key:
+                by_key[key] = len(keys)
+                names.append(" ".join(STATION_NOTE.sub(" ", raw).split()))
+                keys.append(key)
+                station_of.append(stations.index(UNASSIGNED_STATION))
+            cid = by_key[key]
+
+            note = station_note(raw)
+            if note is not None:
+                if note not in stations:
+                    stations.append(note)
+                station_of[cid] = stations.index(note)
+
+            canonical.append(cid)
+            methods.append(method)
+
+        return BarangayCodes(names, keys, np.array(station_of, dtype=np.int32), stations,
+                             self.raw_names + new_names, np.array(canonical, dtype=np.int32), methods)
@@ -0,0 +1,109 @@
+"""
+Benchmark the vectorized airline estimator (airline.py) against the
+per-series SARIMAX loop on barangay x crime-type series.
+
+    python bench_airline.py --series 300 --horizon 24 --output bench_airline.json
+
+Both sides fit SARIMA(0,1,1)(0,1,1)[12] with invertibility enforced.
+Reports throughput and how far params, log-likelihoods and forecasts
+are from SARIMAX; exits non-zero when a series is outside tolerance.
+"""
+import argparse
+import json
+import time
+import warnings
+import numpy as np
+import pandas as pd
+
+from airline import fit_airline, forecast_airline
+from count_cube import CountCube
+from dataset import DEFAULT_CSV_PATH, load_crime_data
+from forecasting import fit_sarima
+
+
+def select_series(cube: CountCube, limit: int, min_total: int):
+    """(labels, matrix) for the busiest barangay x crime-type cells, full month span."""
+    totals = cube.counts.sum(axis=0)
+    cells = np.argwhere(totals >= min_total)
+    cells = cells[np.argsort(-totals[cells[:, 0], cells[:, 1]], kind="stable")][:limit]
+    labels = [f"{cube.crime_types[c]} @ {cube.barangays[b]}" for c, b in cells]
+    Y = cube.counts[:, cells[:, 0], cells[:, 1]].T.astype(float)
+    return labels, Y
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--csv", default=DEFAULT_CSV_PATH)
+    parser.add_argument("--series", type=int, default=300, help="number of barangay x crime series")
+    parser.add_argument("--min-total", type=int, default=1, help="skip cells with fewer records")
+    parser.add_argument("--horizon", type=int, default=24)
+    parser.add_argument("--param-tol", type=float, default=0.05)
+    parser.add_argument("--forecast-tol", type=float, default=0.05,
+                        help="max |forecast diff| relative to max(series mean, 1)")
+    parser.add_argument("--output", help="write results as JSON here")
+    args = parser.parse_args()
+
+    cube = CountCube.from_frame(load_crime_data(args.csv))
+    labels, Y = select_series(cube, args.series, args.min_total)
+    print(f"{len(labels)} series x {Y.shape[1]} months, horizon {args.horizon}")
+
+    # vectorized
+    start = time.perf_counter()
+    fit = fit_airline(Y)
+    mean, lower, upper = forecast_airline(Y, fit, args.horizon)
+    vec_seconds = time.perf_counter() - start
+
+    # per-series SARIMAX loop
+    sm_params, sm_llf, sm_mean, sm_upper = [], [], [], []
+    start = time.perf_counter()
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        for row in Y:
+            results = fit_sarima(pd.Series(row, index=cube.months), enforce=True)
+            forecast = results.get_forecast(steps=args.horizon)
+            sm_params.append(results.params.values)
+            sm_llf.append(results.llf)
+            sm_mean.append(forecast.predicted_mean.values)
+            sm_upper.append(forecast.conf_int().values[:, 1])
+    loop_seconds = time.perf_counter() - start
+
+    sm_params, sm_llf = np.array(sm_params), np.array(sm_llf)
+    scale = np.maximum(Y.mean(axis=1), 1.0)[:, None]
+    param_diff = np.abs(fit.params[:, :2] - sm_params[:, :2]).max(axis=1)
+    forecast_diff = (np.abs(mean - np.array(sm_mean)) / scale).max(axis=1)
+    upper_diff = (np.abs(upper - np.array(sm_upper)) / scale).max(axis=1)
+    llf_gain = fit.loglike - sm_llf      # > 0: vectorized found a better optimum
+
+    # a param gap only counts when SARIMAX also has the better likelihood
+    worse = llf_gain < -1e-3
+    failed = worse & ((param_diff > args.param_tol) | (forecast_diff > args.forecast_tol))
+
+    report = {
+        "series": len(labels),
+        "months": int(Y.shape[1]),
+        "horizon": args.horizon,
+        "vectorized_seconds": round(vec_seconds, 4),
+        "sarimax_loop_seconds": round(loop_seconds, 4),
+        "speedup": round(loop_seconds / vec_seconds, 2) if vec_seconds else None,
+        "series_per_second": {
+            "vectorized": round(len(labels) / vec_seconds, 1) if vec_seconds else None,
+            "sarimax_loop": round(len(labels) / loop_seconds, 1) if loop_seconds else None,
+        },
+        "param_diff": {"median": float(np.median(param_diff)), "p95": float(np.percentile(param_diff, 95)),
+                       "max": float(param_diff.max())},
+        "forecast_rel_diff": {"median": float(np.median(forecast_diff)), "max": float(forecast_diff.max())},
+        "upper_ci_rel_diff": {"median": float(np.median(upper_diff)), "max": float(upper_diff.max())},
+        "loglike_gain": {"min": float(llf_gain.min()), "max": float(llf_gain.max())},
+        "degenerate_series": int(fit.degenerate.sum()),
+        "out_of_tolerance": [labels[i] for i in np.flatnonzero(failed)],
+    }
+
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    raise SystemExit(1 if report["out_of_tolerance"] else 0)
+
+
+if __name__ == "__main__":
+    main()
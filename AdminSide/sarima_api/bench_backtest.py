@@ -0,0 +1,254 @@
+"""
+Rolling-origin backtest and fit-latency benchmark for every served series.
+
+    python bench_backtest.py --horizon 6 --origins 8 --output backtest.json
+    python bench_backtest.py --baseline backtest.json        # flag regressions
+
+For each series (the city-wide total and every crime type) the model is
+refit at several forecast origins, each using only the months before it,
+and scored on the following `--horizon` months. Forecasts go through the
+same code the API serves (fit_sarima + forecast_from_results, or the
+fallback when the history is too short), so clipping and CI clamping are
+included. Each fit records MAE, MAPE, 95% interval coverage and width,
+wall time (fastest of --repeat runs), optimizer iterations, convergence
+and ConvergenceWarnings.
+
+Results are written as JSON (environment, per-fit rows, per-series and
+overall summaries). With --baseline, MAE, fit time and convergence are compared
+against an earlier run and the exit code is 1 on a regression.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+import statsmodels
+from statsmodels.tools.sm_exceptions import ConvergenceWarning
+
+from airline import fit_airline, forecast_airline
+from artifact_store import OrderStore
+from count_cube import CountCube
+from dataset import DEFAULT_CSV_PATH, load_crime_data
+from forecasting import (
+    MIN_HISTORY_MONTHS,
+    TOTAL_SERIES,
+    SeriesForecast,
+    fallback_forecast,
+    fit_sarima,
+    forecast_from_results,
+    monthly_series,
+    series_spec,
+)
+from order_search import DEFAULT_ORDER_DIR
+
+ENGINES = ("sarimax", "airline")
+
+
+# =========================================================
+# One backtest fit
+# =========================================================
+def run_fit(train: pd.Series, steps: int, spec: dict, engine: str):
+    """(forecast, fit details) through the same path the API serves."""
+    if len(train) < MIN_HISTORY_MONTHS:
+        result = fallback_forecast(train, steps)
+        return result, {"method": result.method, "iterations": 0, "converged": None}
+
+    if engine == "airline":
+        fit = fit_airline(train.values)
+        mean, lower, upper = (a[0] for a in forecast_airline(train.values, fit, steps))
+        # same clip / clamp as forecast_from_results
+        mean = np.maximum(mean, 0.0)
+        upper = np.minimum(np.maximum(upper, 0.0), mean + float(train.max()))
+        result = SeriesForecast((), tuple(mean), tuple(np.maximum(lower, 0.0)), tuple(upper), "airline")
+        return result, {"method": result.method, "iterations": None, "converged": True}
+
+    results = fit_sarima(train, **spec)
+    result = forecast_from_results(train, results, steps)
+    return result, {
+        "method": result.method,
+        "iterations": int(results.mle_retvals.get("iterations", 0)),
+        "converged": bool(results.mle_retvals.get("converged", False)),
+    }
+
+
+def backtest_fit(name: str, train: pd.Series, actual: pd.Series, spec: dict, engine: str,
+                 repeat: int = 1) -> dict:
+    """
+    Fit on `train`, forecast len(actual) months and score. The fit is run
+    `repeat` times and the fastest wall time kept. Runs in a worker.
+    """
+    row = {"series": name, "origin": str(actual.index[0].date()), "train_months": len(train)}
+
+    timings = []
+    for _ in range(max(1, repeat)):
+        started = time.perf_counter()
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            result, details = run_fit(train, len(actual), spec, engine)
+        timings.append(time.perf_counter() - started)
+    row.update(details)
+    row["fit_seconds"] = round(min(timings), 4)
+    row["convergence_warnings"] = sum(issubclass(w.category, ConvergenceWarning) for w in caught)
+
+    forecast = np.asarray(result.forecast)
+    lower, upper = np.asarray(result.lower_ci), np.asarray(result.upper_ci)
+    y = actual.values
+    errors = np.abs(forecast - y)
+    nonzero = y != 0
+    row.update(
+        mae=float(errors.mean()),
+        mape=float((errors[nonzero] / np.abs(y[nonzero])).mean() * 100) if nonzero.any() else None,
+        coverage=float(((y >= lower) & (y <= upper)).mean()),
+        interval_width=float((upper - lower).mean()),
+    )
+    return row
+
+
+# =========================================================
+# Suite
+# =========================================================
+def served_series(df: pd.DataFrame, names: List[str] = None) -> Dict[str, pd.Series]:
+    """The city-wide total and every crime type, as the API builds them."""
+    cube = CountCube.from_frame(df)
+    series = {TOTAL_SERIES: monthly_series(df)}
+    series.update({name: cube.series(crime_type=name) for name in cube.crime_type_names})
+    if names:
+        wanted = {" ".join(n.split()).upper() for n in names}
+        series = {k: v for k, v in series.items() if k in wanted}
+    return series
+
+
+def summarize(rows: List[dict]) -> dict:
+    fit_seconds = np.array([r["fit_seconds"] for r in rows])
+    mapes = [r["mape"] for r in rows if r["mape"] is not None]
+    iterations = [r["iterations"] for r in rows if r["iterations"]]
+    return {
+        "fits": len(rows),
+        "mae": round(float(np.mean([r["mae"] for r in rows])), 4),
+        "mape": round(float(np.mean(mapes)), 2) if mapes else None,
+        "coverage": round(float(np.mean([r["coverage"] for r in rows])), 4),
+        "interval_width": round(float(np.mean([r["interval_width"] for r in rows])), 3),
+        "fit_seconds_p50": round(float(np.percentile(fit_seconds, 50)), 4),
+        "fit_seconds_p95": round(float(np.percentile(fit_seconds, 95)), 4),
+        "fit_seconds_total": round(float(fit_seconds.sum()), 3),
+        "mean_iterations": round(float(np.mean(iterations)), 1) if iterations else None,
+        "not_converged": sum(r["converged"] is False for r in rows),
+        "convergence_warnings": sum(r["convergence_warnings"] for r in rows),
+        "fallbacks": sum(r["method"] == "fallback" for r in rows),
+    }
+
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "statsmodels": statsmodels.__version__,
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def compare(current: dict, baseline: dict, tolerance: float, time_tolerance: float) -> List[str]:
+    """
+    Human-readable regressions of `current` against `baseline`: per-series
+    MAE, and the overall median fit time / non-converged count (per-series
+    timings are too noisy to compare one by one).
+    """
+    regressions = []
+    for name, now in current["series"].items():
+        before = baseline.get("series", {}).get(name)
+        if before and before["mae"] and now["mae"] > before["mae"] * (1 + tolerance):
+            regressions.append(f"{name}: mae {before['mae']} -> {now['mae']}")
+
+    now, before = current["overall"], baseline.get("overall", {})
+    if before.get("fit_seconds_p50") and now["fit_seconds_p50"] > before["fit_seconds_p50"] * (1 + time_tolerance):
+        regressions.append(f"overall: fit_seconds_p50 {before['fit_seconds_p50']} -> {now['fit_seconds_p50']}")
+    if now["not_converged"] > before.get("not_converged", now["not_converged"]):
+        regressions.append(f"overall: not_converged {before['not_converged']} -> {now['not_converged']}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--csv", default=DEFAULT_CSV_PATH)
+    parser.add_argument("--engine", choices=ENGINES, default="sarimax")
+    parser.add_argument("--horizon", type=int, default=6)
+    parser.add_argument("--origins", type=int, default=8, help="number of forecast origins per series")
+    parser.add_argument("--step", type=int, default=3, help="months between origins")
+    parser.add_argument("--series", nargs="*", help="only these crime types (default: total + all)")
+    parser.add_argument("--orders", action="store_true", help="use order_search.py winners like the API")
+    parser.add_argument("--repeat", type=int, default=3, help="time each fit this many times, keep the fastest")
+    parser.add_argument("--workers", type=int, default=1, help=">1 runs fits in parallel (noisier timings)")
+    parser.add_argument("--output", default="bench_backtest.json")
+    parser.add_argument("--baseline", help="earlier results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="allowed relative MAE regression")
+    parser.add_argument("--time-tolerance", type=float, default=0.25, help="allowed relative fit-time regression")
+    args = parser.parse_args()
+
+    df = load_crime_data(args.csv)
+    series = served_series(df, args.series)
+    winners = OrderStore(DEFAULT_ORDER_DIR).load_all() if args.orders else {}
+
+    jobs = []
+    for name, ts in series.items():
+        # last origin leaves exactly `horizon` months to score
+        last = len(ts) - args.horizon
+        for origin in range(last - (args.origins - 1) * args.step, last + 1, args.step):
+            if origin > 0:
+                jobs.append((name, ts.iloc[:origin], ts.iloc[origin:origin + args.horizon],
+                             series_spec(name, winners, enforce=name == TOTAL_SERIES), args.engine, args.repeat))
+    print(f"{len(jobs)} backtest fits over {len(series)} series ({args.engine}, horizon {args.horizon}).")
+
+    started = time.perf_counter()
+    if args.workers > 1:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            rows = list(pool.map(backtest_fit, *zip(*jobs)))
+    else:
+        rows = [backtest_fit(*job) for job in jobs]
+
+    by_series = {name: summarize([r for r in rows if r["series"] == name]) for name in series}
+    results = {
+        "created_at": pd.Timestamp.now().isoformat(timespec="seconds"),
+        "environment": environment(),
+        "dataset": {"csv": os.path.basename(args.csv), "source_hash": df.attrs.get("source_hash")},
+        "config": {k: v for k, v in vars(args).items() if k not in ("csv", "output", "baseline")},
+        "wall_seconds": round(time.perf_counter() - started, 2),
+        "overall": summarize(rows),
+        "series": by_series,
+        "rows": rows,
+    }
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+    print(f"{'series':<22}{'MAE':>9}{'MAPE%':>9}{'cover':>8}{'p50 s':>9}{'iters':>7}{'!conv':>7}{'warn':>6}")
+    for name, s in list(by_series.items()) + [("OVERALL", results["overall"])]:
+        print(f"{name[:21]:<22}{s['mae']:>9.2f}{(s['mape'] or 0):>9.1f}{s['coverage']:>8.2f}"
+              f"{s['fit_seconds_p50']:>9.3f}{(s['mean_iterations'] or 0):>7.1f}{s['not_converged']:>7}"
+              f"{s['convergence_warnings']:>6}")
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance, args.time_tolerance)
+        for line in regressions:
+            print(f"[REGRESSION] {line}")
+        raise SystemExit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+"""
+HTTP load test for the forecast API: throughput, latency percentiles and
+memory growth per endpoint.
+
+    python bench_load.py --requests 2000 --concurrency 8              # in-process
+    python bench_load.py --spawn --requests 2000 --output load.json   # local uvicorn
+    python bench_load.py --url http://127.0.0.1:8001 --pid 12345      # already running
+
+The traffic mix replays what the admin dashboard sends (StatisticsController
+and the statistics page): mostly /forecast for the city-wide total and the
+crime-type dropdown at 6/12/24 months, a /forecast/batch cache warm-up, and
+the /stats, /barangay-stats, /top-crimes, /top-barangays and /possible-crimes
+insight calls. Weights can be overridden with --mix name=weight.
+
+In-process mode drives main.app through httpx's ASGI transport (no sockets),
+so it measures the handlers and FastAPI itself. --spawn starts
+`uvicorn main:app` on a free port and waits for /ready, which adds the HTTP
+server and the network stack.
+
+Two phases are run:
+
+1. isolated: each endpoint alone, for its share of --requests, with the
+   server RSS sampled before and after (memory growth per endpoint);
+2. mixed: every endpoint interleaved by weight, for overall throughput
+   and per-endpoint p50/p95/p99 under realistic contention.
+
+--cold clears the forecast cache before every isolated phase so the first
+requests pay for the fits; by default one warm-up pass runs first.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+import httpx
+import numpy as np
+
+from bench_backtest import environment
+
+# name -> (weight, method, path, params or JSON body); "{crime}" is filled per request
+TRAFFIC_MIX = {
+    "forecast_total": (30, "GET", "/forecast", {"horizon": "{horizon}"}),
+    "forecast_crime_type": (30, "GET", "/forecast", {"horizon": "{horizon}", "crime_type": "{crime}"}),
+    "forecast_batch": (2, "POST", "/forecast/batch", {"crime_types": "all", "horizon": 24, "include_total": True}),
+    "stats": (12, "GET", "/stats", {}),
+    "stats_month": (6, "GET", "/stats", {"month": "{month}"}),
+    "barangay_stats": (8, "GET", "/barangay-stats", {}),
+    "top_crimes": (5, "GET", "/top-crimes", {"top_n": 10}),
+    "top_barangays": (5, "GET", "/top-barangays", {"top_n": 10}),
+    "possible_crimes": (2, "GET", "/possible-crimes", {"date": "{month}-01"}),
+}
+HORIZONS = (6, 12, 24)      # forecastHorizon options on the statistics page
+
+
+# =========================================================
+# Memory
+# =========================================================
+def rss_mb(pid: Optional[int]) -> Optional[float]:
+    """Resident set size of `pid` in MB from /proc (None where unavailable)."""
+    if pid is None:
+        return None
+    try:
+        with open(f"/proc/{pid}/statm", "r") as f:
+            return round(int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20, 1)
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+# =========================================================
+# Targets
+# =========================================================
+def in_process_client() -> httpx.AsyncClient:
+    """Client bound to main.app; runs the startup training the ASGI transport skips."""
+    import main
+
+    started = time.perf_counter()
+    main.FAST_START = False     # train before the first request, not in the background
+    main.startup_event()
+    if main.df_global is None:
+        raise SystemExit("[ERROR] In-process startup failed; see the log above.")
+    print(f"In-process app trained in {time.perf_counter() - started:.1f}s.")
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://bench", timeout=300)
+
+
+def spawn_uvicorn(timeout: float) -> tuple:
+    """
+    Start `uvicorn main:app` on a free port and wait for /ready. Returns
+    (process, url, cold start): seconds from spawn until / (liveness) and
+    /ready answered.
+    """
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    url = f"http://127.0.0.1:{port}"
+    started = time.monotonic()
+    cold_start = {}
+    while time.monotonic() < started + timeout:
+        if process.poll() is not None:
+            raise SystemExit(f"[ERROR] uvicorn exited with code {process.returncode}.")
+        try:
+            if "live_seconds" not in cold_start and httpx.get(f"{url}/", timeout=2).status_code == 200:
+                cold_start["live_seconds"] = round(time.monotonic() - started, 3)
+            if httpx.get(f"{url}/ready", timeout=2).status_code == 200:
+                cold_start["ready_seconds"] = round(time.monotonic() - started, 3)
+                return process, url, cold_start
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.1)
+    process.terminate()
+    raise SystemExit(f"[ERROR] {url} was not ready after {timeout:.0f}s.")
+
+
+# =========================================================
+# Load generation
+# =========================================================
+def fill(value, values: dict):
+    if isinstance(value, dict):
+        return {k: fill(v, values) for k, v in value.items()}
+    if isinstance(value, str) and value.startswith("{") and value.endswith("}"):
+        return values[value[1:-1]]
+    if isinstance(value, str):
+        return value.format(**values)
+    return value
+
+
+def build_requests(names: List[str], count: int, mix: Dict[str, float], crime_types: List[str],
+                   months: List[str], rng: random.Random) -> List[tuple]:
+    """`count` (endpoint, method, path, params/body) drawn by weight from `names`."""
+    weights = [mix[n] for n in names]
+    plan = []
+    for name in rng.choices(names, weights=weights, k=count):
+        _, method, path, template = TRAFFIC_MIX[name]
+        values = {"horizon": rng.choice(HORIZONS), "crime": rng.choice(crime_types), "month": rng.choice(months)}
+        plan.append((name, method, path, fill(template, values)))
+    return plan
+
+
+async def run_plan(client: httpx.AsyncClient, plan: List[tuple], concurrency: int) -> tuple:
+    """Send `plan` with `concurrency` workers. Returns (samples, wall seconds)."""
+    queue = list(reversed(plan))
+    samples = []
+
+    async def worker():
+        while queue:
+            name, method, path, payload = queue.pop()
+            started = time.perf_counter()
+            try:
+                if method == "GET":
+                    response = await client.get(path, params=payload)
+                else:
+                    response = await client.post(path, json=payload)
+                status, size = response.status_code, len(response.content)
+            except httpx.HTTPError:
+                status, size = None, 0
+            samples.append((name, time.perf_counter() - started, status, size))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    return samples, time.perf_counter() - started
+
+
+def summarize(samples: List[tuple], wall_seconds: float) -> dict:
+    latencies = np.array([s[1] for s in samples]) * 1000
+    ok = sum(1 for s in samples if s[2] == 200)
+    return {
+        "requests": len(samples),
+        "errors": len(samples) - ok,
+        "throughput_rps": round(len(samples) / wall_seconds, 1) if wall_seconds else None,
+        "p50_ms": round(float(np.percentile(latencies, 50)), 2),
+        "p95_ms": round(float(np.percentile(latencies, 95)), 2),
+        "p99_ms": round(float(np.percentile(latencies, 99)), 2),
+        "max_ms": round(float(latencies.max()), 2),
+        "mean_bytes": int(np.mean([s[3] for s in samples])),
+    }
+
+
+async def run_benchmark(client: httpx.AsyncClient, args, mix: Dict[str, float], server_pid: Optional[int]) -> dict:
+    crime_types = [row["crime_type"] for row in (await client.get("/top-crimes", params={"top_n": 15})).json()["data"]]
+    months = [f"{row['year']}-{row['month']:02d}"
+              for row in (await client.get("/stats")).json()["data"]["monthly"]][-24:]
+    rng = random.Random(args.seed)
+    names = [n for n in TRAFFIC_MIX if mix.get(n, 0) > 0]
+    total_weight = sum(mix[n] for n in names)
+
+    if not args.cold:
+        warmup = [(n, *TRAFFIC_MIX[n][1:3], fill(TRAFFIC_MIX[n][3], {"horizon": 24, "crime": c, "month": months[-1]}))
+                  for n in names for c in crime_types]
+        await run_plan(client, warmup, args.concurrency)
+
+    isolated = {}
+    for name in names:
+        if args.cold:
+            await client.post("/cache/invalidate", headers={"X-Admin-Token": os.getenv("SARIMA_ADMIN_TOKEN", "")})
+        count = max(args.min_requests, round(args.requests * mix[name] / total_weight))
+        plan = build_requests([name], count, mix, crime_types, months, rng)
+        rss_before = rss_mb(server_pid)
+        samples, wall = await run_plan(client, plan, args.concurrency)
+        rss_after = rss_mb(server_pid)
+        isolated[name] = summarize(samples, wall)
+        isolated[name].update(
+            rss_before_mb=rss_before,
+            rss_after_mb=rss_after,
+            rss_growth_mb=round(rss_after - rss_before, 1) if rss_before is not None and rss_after is not None else None,
+        )
+
+    rss_before = rss_mb(server_pid)
+    samples, wall = await run_plan(client, build_requests(names, args.requests, mix, crime_types, months, rng),
+                                   args.concurrency)
+    mixed = {"overall": summarize(samples, wall), "rss_before_mb": rss_before, "rss_after_mb": rss_mb(server_pid)}
+    mixed["endpoints"] = {name: summarize([s for s in samples if s[0] == name], wall)
+                          for name in names if any(s[0] == name for s in samples)}
+    return {"isolated": isolated, "mixed": mixed}
+
+
+def parse_mix(overrides: List[str]) -> Dict[str, float]:
+    mix = {name: float(spec[0]) for name, spec in TRAFFIC_MIX.items()}
+    for item in overrides or []:
+        name, _, weight = item.partition("=")
+        if name not in TRAFFIC_MIX:
+            raise SystemExit(f"[ERROR] Unknown endpoint '{name}'; choose from {', '.join(TRAFFIC_MIX)}.")
+        mix[name] = float(weight)
+    return mix
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--url", help="load-test a running server instead of the in-process app")
+    target.add_argument("--spawn", action="store_true", help="start a local uvicorn for the run")
+    parser.add_argument("--pid", type=int, help="server process to sample RSS from (with --url)")
+    parser.add_argument("--requests", type=int, default=1000, help="requests in the mixed phase")
+    parser.add_argument("--min-requests", type=int, default=20, help="floor per endpoint in the isolated phase")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--mix", nargs="*", metavar="NAME=WEIGHT", help="override traffic weights (0 drops one)")
+    parser.add_argument("--cold", action="store_true", help="clear the forecast cache before each isolated phase")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--ready-timeout", type=float, default=300.0)
+    parser.add_argument("--output", default="bench_load.json")
+    args = parser.parse_args()
+    mix = parse_mix(args.mix)
+
+    process, cold_start = None, None
+    if args.spawn:
+        process, url, cold_start = spawn_uvicorn(args.ready_timeout)
+        print(f"uvicorn live after {cold_start['live_seconds']}s, ready after {cold_start['ready_seconds']}s.")
+        client, server_pid, mode = httpx.AsyncClient(base_url=url, timeout=300), process.pid, "uvicorn"
+    elif args.url:
+        client, server_pid, mode = httpx.AsyncClient(base_url=args.url, timeout=300), args.pid, "remote"
+    else:
+        client, server_pid, mode = in_process_client(), os.getpid(), "in-process"
+
+    async def go():
+        async with client:
+            return await run_benchmark(client, args, mix, server_pid)
+
+    try:
+        phases = asyncio.run(go())
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=30)
+
+    results = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "environment": environment(),
+        "mode": mode,
+        "cold_start": cold_start,
+        "config": {k: v for k, v in vars(args).items() if k not in ("output", "mix")},
+        "mix": mix,
+        **phases,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+    for phase in ("isolated", "mixed"):
+        rows = results[phase] if phase == "isolated" else dict(results[phase]["endpoints"], OVERALL=results[phase]["overall"])
+        print(f"\n{phase} ({mode}, concurrency {args.concurrency})")
+        print(f"{'endpoint':<22}{'reqs':>6}{'err':>5}{'rps':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'rss +MB':>9}")
+        for name, s in rows.items():
+            growth = s.get("rss_growth_mb")
+            print(f"{name:<22}{s['requests']:>6}{s['errors']:>5}{s['throughput_rps']:>9.1f}{s['p50_ms']:>9.2f}"
+                  f"{s['p95_ms']:>9.2f}{s['p99_ms']:>9.2f}{'' if growth is None else f'{growth:.1f}':>9}")
+    print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
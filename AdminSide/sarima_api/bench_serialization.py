@@ -0,0 +1,156 @@
+"""
+Benchmark response serialization for forecast payloads: Pydantic row
+models (the old /forecast path) against plain rows and the columnar
+layout, encoded with the stdlib json module, orjson, MessagePack and
+Arrow IPC, plus the gzip/brotli size of each body.
+
+    python bench_serialization.py --series 500 --horizon 60 --output bench_serialization.json
+
+The payload is one forecast per barangay x crime-type series (what a
+per-barangay batch would return), made with the vectorized airline
+estimator on the real data so the numbers look like API output.
+Formats and compressions whose package is not installed (see
+requirements-optional.txt) are reported as skipped.
+"""
+import argparse
+import gzip
+import json
+import statistics
+import time
+from typing import Callable, Dict
+
+import numpy as np
+import pandas as pd
+from fastapi.encoders import jsonable_encoder
+from starlette.responses import JSONResponse
+
+from airline import fit_airline, forecast_airline
+from bench_airline import select_series
+from count_cube import CountCube
+from dataset import DEFAULT_CSV_PATH, load_crime_data
+from forecasting import future_dates
+from main import ForecastItem, ForecastResponse
+from serialization import (
+    ARROW,
+    BROTLI_QUALITY,
+    MSGPACK,
+    brotli,
+    dumps_json,
+    encode,
+    forecast_columns,
+    forecast_rows,
+    msgpack,
+    orjson,
+    pyarrow,
+)
+
+
+def build_payloads(labels, dates, mean, lower, upper) -> Dict[str, Callable[[], tuple]]:
+    """name -> builder returning (payload, table): each builder does the per-request work of one layout."""
+    columns = [(d, m.tolist(), lo.tolist(), hi.tolist()) for d, m, lo, hi in
+               zip([dates] * len(labels), mean, lower, upper)]
+
+    def pydantic_rows():
+        return {label: ForecastResponse(status="success", horizon=len(dates),
+                                        data=[ForecastItem(**row) for row in forecast_rows(*cols)])
+                for label, cols in zip(labels, columns)}, None
+
+    def rows():
+        return {label: {"status": "success", "horizon": len(dates), "data": forecast_rows(*cols)}
+                for label, cols in zip(labels, columns)}, None
+
+    def columnar():
+        table = {"series": [], "date": [], "forecast": [], "lower_ci": [], "upper_ci": []}
+        payload = {}
+        for label, cols in zip(labels, columns):
+            data = forecast_columns(*cols)
+            payload[label] = {"status": "success", "horizon": len(dates), "data": data}
+            table["series"] += [label] * len(dates)
+            for key in ("date", "forecast", "lower_ci", "upper_ci"):
+                table[key] += data[key]
+        return payload, table
+
+    return {"pydantic_rows": pydantic_rows, "rows": rows, "columns": columnar}
+
+
+def stdlib_json(payload) -> bytes:
+    return JSONResponse(jsonable_encoder(payload)).body
+
+
+def timed(fn: Callable[[], bytes], repeat: int):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = fn()
+        times.append(time.perf_counter() - start)
+    return body, statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--csv", default=DEFAULT_CSV_PATH)
+    parser.add_argument("--series", type=int, default=500, help="number of barangay x crime series")
+    parser.add_argument("--horizon", type=int, default=60)
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per case (median reported)")
+    parser.add_argument("--output", help="write results as JSON here")
+    args = parser.parse_args()
+
+    cube = CountCube.from_frame(load_crime_data(args.csv))
+    labels, Y = select_series(cube, args.series, 1)
+    mean, lower, upper = forecast_airline(Y, fit_airline(Y), args.horizon)
+    dates = [str(d.date()) for d in future_dates(pd.Series([0.0], index=cube.months[-1:]), args.horizon)]
+    print(f"{len(labels)} series x {args.horizon} months")
+
+    builders = build_payloads(labels, dates, np.maximum(mean, 0), np.maximum(lower, 0), upper)
+    cases = [
+        ("pydantic_rows", "json", lambda p, t: stdlib_json(p)),
+        ("rows", "json", lambda p, t: stdlib_json(p)),
+        ("rows", "orjson", lambda p, t: dumps_json(p)),
+        ("columns", "json", lambda p, t: stdlib_json(p)),
+        ("columns", "orjson", lambda p, t: dumps_json(p)),
+        ("columns", "msgpack", lambda p, t: encode(p, MSGPACK)),
+        ("columns", "arrow", lambda p, t: encode({"status": "success"}, ARROW, t)),
+    ]
+    missing = {"orjson": orjson is None, "msgpack": msgpack is None, "arrow": pyarrow is None}
+
+    results, skipped = [], []
+    for layout, encoder, encode_fn in cases:
+        if missing.get(encoder):
+            skipped.append(f"{layout}/{encoder}")
+            continue
+
+        def run():
+            payload, table = builders[layout]()
+            return encode_fn(payload, table)
+
+        body, seconds = timed(run, args.repeat)
+        sizes = {"raw": len(body), "gzip": len(gzip.compress(body, compresslevel=9))}
+        if brotli is not None:
+            sizes["br"] = len(brotli.compress(body, quality=BROTLI_QUALITY))
+        results.append({"layout": layout, "encoder": encoder, "ms": round(seconds * 1000, 2), "bytes": sizes})
+    if brotli is None:
+        skipped.append("br compression")
+
+    baseline = results[0]["ms"]
+    for row in results:
+        row["speedup"] = round(baseline / row["ms"], 2) if row["ms"] else None
+        print(f"  {row['layout']:>13}/{row['encoder']:<7} {row['ms']:>9.2f} ms  x{row['speedup']:<6} "
+              + "  ".join(f"{k}={v:,}" for k, v in row["bytes"].items()))
+
+    report = {
+        "series": len(labels),
+        "horizon": args.horizon,
+        "points": len(labels) * args.horizon,
+        "repeat": args.repeat,
+        "results": results,
+        "skipped": skipped,
+    }
+    if skipped:
+        print(f"Skipped (not installed): {', '.join(skipped)}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+
+from forecasting import normalize_crime_type
+
+
+class CountCube:
+    """
+    Dense crime counts indexed by (month, crime_type, barangay).
+
+    `cum` holds running totals along the month axis with a leading zero
+    row, so the total for any month range is `cum[end] - cum[start]`
+    and per-crime / per-barangay series are plain slices.
+    `calendar_totals` is (calendar month 1-12 x crime_type) over all years.
+
+    The derived arrays can be passed in by `add`, which updates them from
+    the new records instead of recomputing them from `counts`.
+    """
+
+    def __init__(self, months: pd.DatetimeIndex, crime_types: List[str], barangays: List[str],
+                 counts: np.ndarray, cum: np.ndarray = None, month_totals: np.ndarray = None,
+                 calendar_totals: np.ndarray = None):
+        self.months = months
+        self.crime_types = list(crime_types)
+        self.barangays = list(barangays)
+        self.counts = counts
+        if cum is None:
+            cum = np.concatenate(
+                [np.zeros((1,) + counts.shape[1:], dtype=np.int64), np.cumsum(counts, axis=0, dtype=np.int64)]
+            )
+        self.cum = cum
+        self.month_totals = counts.sum(axis=(1, 2), dtype=np.int64) if month_totals is None else month_totals
+        if calendar_totals is None:
+            calendar_totals = np.zeros((12, len(self.crime_types)), dtype=np.int64)
+            np.add.at(calendar_totals, np.asarray(months.month, dtype=np.intp) - 1,
+                      counts.sum(axis=2, dtype=np.int64))
+        self.calendar_totals = calendar_totals
+
+        # normalized name -> axis positions (labels that differ only by case share a name)
+        self._crime_index: Dict[str, List[int]] = {}
+        for i, name in enumerate(self.crime_types):
+            self._crime_index.setdefault(normalize_crime_type(name), []).append(i)
+        self._barangay_index: Dict[str, List[int]] = {}
+        for i, name in enumerate(self.barangays):
+            self._barangay_index.setdefault(normalize_crime_type(name), []).append(i)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "CountCube":
+        crime_cat = df["crime_type"].astype("category")
+        barangay_cat = df["barangay"].astype("category")
+
+        if df.empty:
+            months = pd.DatetimeIndex([], freq="MS")
+        else:
+            months = pd.date_range(df["date"].min().to_period("M").to_timestamp(),
+                                   df["date"].max().to_period("M").to_timestamp(), freq="MS")
+
+        counts = np.zeros((len(months), len(crime_cat.cat.categories), len(barangay_cat.cat.categories)),
+                          dtype=np.int32)
+        if len(months):
+            t = ((df["date"].dt.year - months[0].year) * 12 + (df["date"].dt.month - months[0].month)).to_numpy()
+            np.add.at(counts,
+                      (t, crime_cat.cat.codes.to_numpy(), barangay_cat.cat.codes.to_numpy()),
+                      df["crime_count"].to_numpy().astype(np.int32))
+
+        return cls(months, [str(c) for c in crime_cat.cat.categories],
+                   [str(b) for b in barangay_cat.cat.categories], counts)
+
+    def add(self, records: pd.DataFrame) -> "CountCube":
+        """
+        A new cube with `records` (date, crime_type, barangay, crime_count)
+        added on top of this one, which is left untouched. Unseen months and
+        labels grow the axes; running totals are only recomputed from the
+        earliest month the records touch, so appending the latest month's
+        incidents costs one month of work, not the whole history.
+        """
+        if records.empty:
+            return self
+
+        periods = records["date"].dt.to_period("M").dt.to_timestamp()
+        first, last = periods.min(), periods.max()
+        if len(self.months):
+            first, last = min(first, self.months[0]), max(last, self.months[-1])
+        months = pd.date_range(first, last, freq="MS")
+        shift = int(months.searchsorted(self.months[0])) if len(self.months) else 0
+
+        crime_types = list(dict.fromkeys(self.crime_types + [str(c) for c in records["crime_type"]]))
+        barangays = list(dict.fromkeys(self.barangays + [str(b) for b in records["barangay"]]))
+        crime_pos = {name: i for i, name in enumerate(crime_types)}
+        barangay_pos = {name: i for i, name in enumerate(barangays)}
+
+        t = ((periods.dt.year - months[0].year) * 12 + (periods.dt.month - months[0].month)).to_numpy()
+        c = np.array([crime_pos[str(name)] for name in records["crime_type"]], dtype=np.intp)
+        b = np.array([barangay_pos[str(name)] for name in records["barangay"]], dtype=np.intp)
+        values = records["crime_count"].to_numpy().astype(np.int32)
+
+        m0, c0, b0 = self.counts.shape
+        counts = np.zeros((len(months), len(crime_types), len(barangays)), dtype=np.int32)
+        counts[shift:shift + m0, :c0, :b0] = self.counts
+        np.add.at(counts, (t, c, b), values)
+
+        # months before the earliest record keep their running totals
+        start = min(int(t.min()), m0) if shift == 0 else 0
+        cum = np.zeros((len(months) + 1,) + counts.shape[1:], dtype=np.int64)
+        cum[:start + 1, :c0, :b0] = self.cum[:start + 1]
+        cum[start + 1:] = cum[start] + np.cumsum(counts[start:], axis=0, dtype=np.int64)
+
+        month_totals = np.zeros(len(months), dtype=np.int64)
+        month_totals[shift:shift + m0] = self.month_totals
+        np.add.at(month_totals, t, values)
+
+        calendar_totals = np.zeros((12, len(crime_types)), dtype=np.int64)
+        calendar_totals[:, :c0] = self.calendar_totals
+        np.add.at(calendar_totals, (np.asarray(months.month, dtype=np.intp)[t] - 1, c), values)
+
+        return CountCube(months, crime_types, barangays, counts, cum=cum, month_totals=month_totals,
+                         calendar_totals=calendar_totals)
+
+    # -----------------------------------------------------
+    # index helpers
+    # -----------------------------------------------------
+    @property
+    def crime_type_names(self) -> List[str]:
+        """Distinct normalized crime types, sorted."""
+        return sorted(self._crime_index)
+
+    def crime_positions(self, crime_type: Optional[str]):
+        """Axis positions for a crime type (slice(None) = all, [] = unknown)."""
+        if not crime_type:
+            return slice(None)
+        return self._crime_index.get(normalize_crime_type(crime_type), [])
+
+    def barangay_positions(self, barangay: Optional[str]):
+        if not barangay:
+            return slice(None)
+        return self._barangay_index.get(normalize_crime_type(barangay), [])
+
+    def month_bounds(self, start=None, end=None):
+        """Half-open [lo, hi) month positions for an inclusive start/end date."""
+        lo, hi = 0, len(self.months)
+        if start is not None and len(self.months):
+            lo = int(self.months.searchsorted(pd.Timestamp(start).to_period("M").to_timestamp()))
+        if end is not None and len(self.months):
+            hi = int(self.months.searchsorted(pd.Timestamp(end).to_period("M").to_timestamp(), side="right"))
+        return lo, max(lo, hi)
+
+    # -----------------------------------------------------
+    # queries
+    # -----------------------------------------------------
+    def range_totals(self, start=None, end=None) -> np.ndarray:
+        """(crime_type, barangay) totals for the inclusive month range."""
+        lo, hi = self.month_bounds(start, end)
+        return self.cum[hi] - self.cum[lo]
+
+    def totals_by_crime_type(self, start=None, end=None, barangay: str = None) -> pd.Series:
+        totals = self.range_totals(start, end)[:, self.barangay_positions(barangay)]
+        return pd.Series(totals.sum(axis=1), index=self.crime_types)
+
+    def totals_by_barangay(self, start=None, end=None, crime_type: str = None) -> pd.Series:
+        totals = self.range_totals(start, end)[self.crime_positions(crime_type), :]
+        return pd.Series(totals.sum(axis=0), index=self.barangays)
+
+    def top_by_calendar_month(self, n: int = 3) -> pd.DataFrame:
+        """
+        Top `n` crime types for each calendar month (1-12) over all years,
+        as rows of month, crime_type, total (largest first, stable on ties).
+        """
+        rows = []
+        for month, totals in enumerate(self.calendar_totals, start=1):
+            order = np.argsort(-totals, kind="stable")[:n]
+            rows.extend((month, self.crime_types[i], int(totals[i])) for i in order if totals[i] > 0)
+        return pd.DataFrame(rows, columns=["month", "crime_type", "total"])
+
+    def series(self, crime_type: str = None, barangay: str = None) -> pd.Series:
+        """
+        Monthly series for a crime type and/or barangay, spanning its
+        first to last month with records (same shape as monthly_series).
+        """
+        block = self.counts[:, self.crime_positions(crime_type), :][:, :, self.barangay_positions(barangay)]
+        values = block.sum(axis=(1, 2)).astype(float)
+
+        nonzero = np.flatnonzero(values)
+        if nonzero.size == 0:
+            return pd.Series([], index=pd.DatetimeIndex([], freq="MS"), dtype=float)
+        lo, hi = nonzero[0], nonzero[-1] + 1
+        return pd.Series(values[lo:hi], index=self.months[lo:hi])
@@ -0,0 +1,186 @@
+import json
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+
+from artifact_store import file_hash
+
+
+# =========================================================
+# Paths
+# =========================================================
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CSV_PATH = os.path.abspath(os.path.join(BASE_DIR, "..", "data", "davao_crime_5years.csv"))
+DEFAULT_CACHE_DIR = os.getenv("SARIMA_DATASET_CACHE_DIR", os.path.join(BASE_DIR, ".dataset_cache"))
+
+CACHE_FORMAT = 2            # 2: files named per source hash, NaN coordinates kept
+COLUMNS = {                 # column -> on-disk dtype
+    "id": np.int32,
+    "date": "datetime64[ns]",
+    "barangay": np.int32,       # categorical codes
+    "crime_type": np.int32,     # categorical codes
+    "crime_count": np.int32,
+    "latitude": np.float32,     # NaN when missing
+    "longitude": np.float32,
+}
+CATEGORICAL = ("barangay", "crime_type")
+
+
+# =========================================================
+# Cleaning (the one place the raw CSV rules live)
+# =========================================================
+def clean_crime_csv(csv_path: str) -> pd.DataFrame:
+    """
+    Read davao_crime_5years.csv and apply the standard cleaning:
+    parse dates (drop bad ones), keep positive counts, strip text
+    fields and drop duplicate rows. Sorted by date.
+    """
+    df = pd.read_csv(csv_path)
+
+    # Expect columns:
+    # id, date, barangay, crime_type, crime_count, latitude, longitude
+    df["date"] = pd.to_datetime(df["date"], errors="coerce")
+    df = df.dropna(subset=["date"]).sort_values("date")
+
+    # keep only positive crimes
+    df["crime_count"] = pd.to_numeric(df["crime_count"], errors="coerce")
+    df = df[df["crime_count"] > 0]
+
+    # strip text fields
+    df["barangay"] = df["barangay"].astype(str).str.strip()
+    df["crime_type"] = df["crime_type"].astype(str).str.strip()
+
+    return df.drop_duplicates()
+
+
+# =========================================================
+# Columnar cache
+# =========================================================
+def _cache_paths(csv_path: str, cache_dir: str):
+    name = os.path.splitext(os.path.basename(csv_path))[0]
+    root = os.path.join(cache_dir, name)
+    return root, os.path.join(root, "meta.json")
+
+
+def _read_meta(meta_path: str):
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_meta(meta_path: str, meta: dict) -> None:
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(meta_path), suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, meta_path)
+
+
+def _column_file(root: str, col: str, source_hash: str) -> str:
+    """One file per column and source version, so a rebuild never replaces a file that may be mapped."""
+    return os.path.join(root, f"{col}.{source_hash[:12]}.npy")
+
+
+def _save_column(path: str, values: np.ndarray) -> None:
+    """np.save through a unique temp file in the same folder, renamed into place."""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        np.save(f, values)
+    try:
+        os.replace(tmp_path, path)
+    except PermissionError:
+        # Windows: another process built and mapped the same version first
+        os.remove(tmp_path)
+        if not os.path.exists(path):
+            raise
+
+
+def _remove_old_columns(root: str, source_hash: str) -> None:
+    """Delete column files of other source versions; ones still mapped (Windows) go on a later build."""
+    keep = {os.path.basename(_column_file(root, col, source_hash)) for col in COLUMNS}
+    for filename in os.listdir(root):
+        if filename.endswith(".npy") and filename not in keep:
+            try:
+                os.remove(os.path.join(root, filename))
+            except OSError:
+                pass
+
+
+def build_cache(csv_path: str, root: str, meta_path: str, source_hash: str) -> dict:
+    """Clean the CSV once and write one .npy file per column."""
+    df = clean_crime_csv(csv_path)
+    os.makedirs(root, exist_ok=True)
+
+    categories = {}
+    for col, dtype in COLUMNS.items():
+        if col in CATEGORICAL:
+            cat = df[col].astype("category")
+            categories[col] = [str(c) for c in cat.cat.categories]
+            values = cat.cat.codes.to_numpy().astype(dtype)
+        elif col == "date":
+            values = df[col].to_numpy().astype(dtype)
+        elif np.issubdtype(dtype, np.floating):
+            # missing coordinates stay NaN (0/0 would be a real point off the coast)
+            values = pd.to_numeric(df[col], errors="coerce").to_numpy().astype(dtype)
+        else:
+            values = pd.to_numeric(df[col], errors="coerce").fillna(0).to_numpy().astype(dtype)
+        # a new file per source version: snapshots mapping the old files keep
+        # them, and nothing is replaced while mapped (which fails on Windows)
+        _save_column(_column_file(root, col, source_hash), values)
+
+    stat = os.stat(csv_path)
+    meta = {
+        "format": CACHE_FORMAT,
+        "source_mtime_ns": stat.st_mtime_ns,
+        "source_size": stat.st_size,
+        "source_hash": source_hash,
+        "rows": int(len(df)),
+        "categories": categories,
+    }
+    # meta last: a half-written cache never looks valid
+    _write_meta(meta_path, meta)
+    _remove_old_columns(root, source_hash)
+    print(f"[DATASET] Built columnar cache for {os.path.basename(csv_path)} ({len(df)} rows).")
+    return meta
+
+
+def load_crime_data(csv_path: str = DEFAULT_CSV_PATH, cache_dir: str = DEFAULT_CACHE_DIR) -> pd.DataFrame:
+    """
+    Cleaned crime data, served from a memory-mapped columnar cache.
+
+    The cache is rebuilt when the source CSV's mtime/size changes and
+    its sha1 no longer matches. barangay and crime_type come back as
+    categoricals, counts as int32 and coordinates as float32. The source
+    hash is available as df.attrs["source_hash"].
+    """
+    if not os.path.exists(csv_path):
+        raise FileNotFoundError(f"{os.path.basename(csv_path)} not found at: {csv_path}")
+
+    root, meta_path = _cache_paths(csv_path, cache_dir)
+    meta = _read_meta(meta_path)
+    stat = os.stat(csv_path)
+
+    if meta is None or meta.get("format") != CACHE_FORMAT:
+        meta = build_cache(csv_path, root, meta_path, file_hash(csv_path))
+    elif meta["source_mtime_ns"] != stat.st_mtime_ns or meta["source_size"] != stat.st_size:
+        source_hash = file_hash(csv_path)
+        if source_hash != meta["source_hash"]:
+            meta = build_cache(csv_path, root, meta_path, source_hash)
+        else:
+            # touched but unchanged: just remember the new mtime
+            meta.update(source_mtime_ns=stat.st_mtime_ns, source_size=stat.st_size)
+            _write_meta(meta_path, meta)
+
+    data = {}
+    for col in COLUMNS:
+        values = np.load(_column_file(root, col, meta["source_hash"]), mmap_mode="r")
+        if col in CATEGORICAL:
+            data[col] = pd.Categorical.from_codes(values, categories=meta["categories"][col])
+        else:
+            data[col] = values
+
+    df = pd.DataFrame(data, copy=False)
+    df.attrs["source_hash"] = meta["source_hash"]
+    return df
@@ -2,24 +2,18 @@
 import pandas as pd
 import numpy as np
 from statsmodels.tsa.statespace.sarimax import SARIMAX
-import os
 import sys
 
-# Load Data
-base_dir = os.path.dirname(os.path.abspath(__file__))
-csv_path = os.path.join(base_dir, "..", "data", "davao_crime_5years.csv")
+from dataset import load_crime_data
 
-if not os.path.exists(csv_path):
+# Load Data
+try:
+    df = load_crime_data()
+except FileNotFoundError:
     print("CSV not found!")
     sys.exit(1)
 
-df = pd.read_csv(csv_path)
-df["date"] = pd.to_datetime(df["date"], errors="coerce")
-df = df.dropna(subset=["date"]).sort_values("date")
-df["crime_count"] = pd.to_numeric(df["crime_count"], errors="coerce")
-df = df[df["crime_count"] > 0]
-df["barangay"] = df["barangay"].astype(str).str.strip()
-df["crime_type"] = df["crime_type"].astype(str).str.strip()
+df["crime_type"] = df["crime_type"].astype(str)
 
 unique_crimes = df["crime_type"].unique()
 print(f"Found {len(unique_crimes)} crime types.")
@@ -0,0 +1,252 @@
+from dataclasses import dataclass, replace
+from typing import List, Tuple
+import time
+import warnings
+import pandas as pd
+
+from artifact_store import OrderStore
+
+# statsmodels is imported inside the functions that fit, so importing this
+# module (and main.py) stays fast; the first fit pays for the import
+
+
+# =========================================================
+# Model settings (shared by the API and offline scripts)
+# =========================================================
+SARIMA_ORDER = (0, 1, 1)
+SARIMA_SEASONAL_ORDER = (0, 1, 1, 12)
+MAX_HORIZON = 60            # longest horizon the API will serve
+MIN_HISTORY_MONTHS = 6      # below this we use the statistical fallback
+TOTAL_SERIES = "__total__"  # series name of the city-wide total
+
+
+# =========================================================
+# Forecast result
+# =========================================================
+@dataclass(frozen=True)
+class SeriesForecast:
+    """
+    A long forecast for one series. Shorter horizons are answered
+    by slicing, so one fit serves 6/12/18/24 month requests alike.
+    """
+    dates: Tuple[str, ...]
+    forecast: Tuple[float, ...]
+    lower_ci: Tuple[float, ...]
+    upper_ci: Tuple[float, ...]
+    method: str             # "sarima", "fallback", "empty" or "reconciled"
+    params: Tuple[float, ...] = ()   # fitted SARIMAX params ("sarima" only)
+    reused: bool = False    # True when params came from the artifact store
+    fit_seconds: float = 0.0        # MLE wall time (0 when reused / not fitted)
+    iterations: int = 0             # optimizer iterations of that fit
+    convergence_warnings: int = 0   # ConvergenceWarnings it raised
+
+    def head(self, horizon: int) -> List[dict]:
+        return [
+            {
+                "date": self.dates[i],
+                "forecast": self.forecast[i],
+                "lower_ci": self.lower_ci[i],
+                "upper_ci": self.upper_ci[i],
+            }
+            for i in range(min(horizon, len(self.dates)))
+        ]
+
+
+# =========================================================
+# Helpers
+# =========================================================
+def normalize_crime_type(crime_type: str) -> str:
+    return " ".join(str(crime_type).split()).upper()
+
+
+def monthly_series(df: pd.DataFrame) -> pd.Series:
+    """Sum crime_count per month start (MS), filling empty months with 0."""
+    monthly = (
+        df.set_index("date")
+          .groupby(pd.Grouper(freq="MS"))["crime_count"]
+          .sum()
+          .asfreq("MS", fill_value=0)
+    )
+    return monthly.astype(float)
+
+
+def future_dates(target_ts: pd.Series, steps: int) -> pd.DatetimeIndex:
+    last_date = target_ts.index[-1] if target_ts is not None and not target_ts.empty else pd.Timestamp.now()
+    return pd.date_range(
+        start=last_date + pd.DateOffset(months=1),
+        periods=steps,
+        freq="MS",
+    )
+
+
+def build_sarima(target_ts: pd.Series, enforce: bool = False, order=SARIMA_ORDER,
+                 seasonal_order=SARIMA_SEASONAL_ORDER):
+    from statsmodels.tsa.statespace.sarimax import SARIMAX
+
+    return SARIMAX(
+        target_ts,
+        order=tuple(order),
+        seasonal_order=tuple(seasonal_order),
+        enforce_stationarity=enforce,
+        enforce_invertibility=enforce,
+    )
+
+
+def fit_sarima(target_ts: pd.Series, enforce: bool = False, start_params=None, order=SARIMA_ORDER,
+               seasonal_order=SARIMA_SEASONAL_ORDER, maxiter: int = 50):
+    """Fit SARIMA (default (0,1,1)(0,1,1)[12]) and return the statsmodels results."""
+    return build_sarima(target_ts, enforce, order, seasonal_order).fit(
+        start_params=start_params, disp=False, maxiter=maxiter
+    )
+
+
+def timed_fit(target_ts: pd.Series, **kwargs):
+    """
+    fit_sarima plus its fit details for SeriesForecast: wall time,
+    optimizer iterations and ConvergenceWarnings raised (which are
+    counted instead of printed).
+    """
+    from statsmodels.tools.sm_exceptions import ConvergenceWarning
+
+    started = time.perf_counter()
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always", ConvergenceWarning)
+        results = fit_sarima(target_ts, **kwargs)
+    for w in caught:
+        if not issubclass(w.category, ConvergenceWarning):
+            warnings.warn_explicit(w.message, w.category, w.filename, w.lineno)
+    return results, {
+        "fit_seconds": time.perf_counter() - started,
+        "iterations": int(results.mle_retvals.get("iterations", 0)),
+        "convergence_warnings": sum(issubclass(w.category, ConvergenceWarning) for w in caught),
+    }
+
+
+def apply_params(target_ts: pd.Series, params, enforce: bool = False, order=SARIMA_ORDER,
+                 seasonal_order=SARIMA_SEASONAL_ORDER):
+    """Run the Kalman filter with known params (no MLE) and return the results."""
+    return build_sarima(target_ts, enforce, order, seasonal_order).filter(params)
+
+
+# =========================================================
+# Forecast builders
+# =========================================================
+def forecast_from_results(target_ts: pd.Series, results, steps: int = MAX_HORIZON,
+                          reused: bool = False) -> SeriesForecast:
+    """Build a clipped/clamped forecast from fitted SARIMAX results."""
+    dates = [str(d.date()) for d in future_dates(target_ts, steps)]
+
+    try:
+        forecast_res = results.get_forecast(steps=steps)
+        mean = forecast_res.predicted_mean
+        ci = forecast_res.conf_int()
+    except Exception as e:
+        print(f"[ERROR] Forecast generation failed: {e}")
+        zeros = (0.0,) * steps
+        return SeriesForecast(tuple(dates), zeros, zeros, zeros, "empty")
+
+    # Heuristic clamping:
+    # Limit Upper CI to be relative to the forecast value to prevent "box" look.
+    # We allow it to go up to Forecast + MaxHistorical.
+    max_hist = float(target_ts.max()) if target_ts is not None and not target_ts.empty else 10.0
+
+    values, lowers, uppers = [], [], []
+    for i in range(steps):
+        val = float(mean.iloc[i]) if i < len(mean) else 0.0
+        lower = float(ci.iloc[i, 0]) if i < len(ci) else 0.0
+        upper = float(ci.iloc[i, 1]) if i < len(ci) else 0.0
+
+        # Clip negative values
+        val = max(0.0, val)
+        lower = max(0.0, lower)
+        upper = max(0.0, upper)
+
+        # Dynamic Clamp: Forecast + MaxHistorical
+        upper = min(upper, val + max_hist)
+
+        values.append(val)
+        lowers.append(lower)
+        uppers.append(upper)
+
+    params = tuple(float(p) for p in results.params)
+    return SeriesForecast(tuple(dates), tuple(values), tuple(lowers), tuple(uppers), "sarima", params, reused)
+
+
+def fallback_forecast(target_ts: pd.Series, steps: int = MAX_HORIZON) -> SeriesForecast:
+    """
+    Historical mean with a 5%/month decay, used when there is too little
+    data to fit or the fit failed. Returns zeros when there is no data at all.
+    """
+    dates = tuple(str(d.date()) for d in future_dates(target_ts, steps))
+
+    if target_ts is None or target_ts.empty:
+        zeros = (0.0,) * steps
+        return SeriesForecast(dates, zeros, zeros, zeros, "empty")
+
+    hist_mean = float(target_ts.mean())
+    hist_std = float(target_ts.std()) if len(target_ts) > 1 else hist_mean * 0.3
+
+    values, lowers, uppers = [], [], []
+    for i in range(steps):
+        forecast_val = hist_mean * (0.95 ** i)
+        values.append(forecast_val)
+        lowers.append(max(0.0, forecast_val - hist_std))
+        uppers.append(forecast_val + hist_std)
+
+    return SeriesForecast(dates, tuple(values), tuple(lowers), tuple(uppers), "fallback")
+
+
+def series_spec(name: str, order_winners: dict, enforce: bool = False) -> dict:
+    """
+    fit_sarima/apply_params keyword arguments for a series: its
+    order-search winner when there is one, else the fixed default order.
+    """
+    winner = order_winners.get(name)
+    if winner is None:
+        return {"order": SARIMA_ORDER, "seasonal_order": SARIMA_SEASONAL_ORDER, "enforce": enforce}
+    return {
+        "order": tuple(winner["order"]),
+        "seasonal_order": tuple(winner["seasonal_order"]),
+        "enforce": bool(winner.get("enforce", enforce)),
+    }
+
+
+def stored_params(name: str, target_ts: pd.Series, spec: dict, order_winners: dict, store=None):
+    """
+    Params fitted on exactly this series for `spec`: the order-search
+    winner's, else those saved in `store` (an ArtifactStore for spec's
+    order, or None), else None.
+    """
+    winner = order_winners.get(name)
+    if winner is not None and tuple(winner["order"]) == tuple(spec["order"]) \
+            and tuple(winner["seasonal_order"]) == tuple(spec["seasonal_order"]):
+        params = OrderStore.params_for(winner, target_ts)
+        if params is not None:
+            return params
+    return store.load_params(name, target_ts, spec["enforce"]) if store is not None else None
+
+
+def forecast_series(target_ts: pd.Series, steps: int = MAX_HORIZON, label: str = "",
+                    params=None, order=SARIMA_ORDER, seasonal_order=SARIMA_SEASONAL_ORDER,
+                    enforce: bool = False) -> SeriesForecast:
+    """
+    Forecast `steps` months ahead with a per-series model. Stored `params`
+    are applied with a filter-only pass; otherwise the model is fit on the fly.
+    """
+    if target_ts is None or len(target_ts) < MIN_HISTORY_MONTHS:
+        return fallback_forecast(target_ts, steps)
+
+    if params is not None:
+        try:
+            results = apply_params(target_ts, params, enforce, order, seasonal_order)
+            return forecast_from_results(target_ts, results, steps, reused=True)
+        except Exception as e:
+            print(f"[WARN] Stored params unusable for {label or 'series'}, refitting: {e}")
+
+    try:
+        results, details = timed_fit(target_ts, enforce=enforce, order=order, seasonal_order=seasonal_order)
+    except Exception as e:
+        print(f"[ERROR] Training failed for {label or 'series'}: {e}")
+        return fallback_forecast(target_ts, steps)
+
+    return replace(forecast_from_results(target_ts, results, steps), **details)
@@ -0,0 +1,243 @@
+"""
+Offline batch generation of the forecast CSVs the admin reads from
+AdminSide/admin/storage/app.
+
+    python generate_forecasts.py --workers 4 [--barangays] [--force] [--prune]
+
+Writes sarima_forecast.csv (city-wide total) and one
+sarima_forecast_<crime>.csv per crime type, as Date, Forecast_Crimes,
+Lower_CI, Upper_CI, with the model the API serves: each series' order
+search winner (else SARIMA(0,1,1)(0,1,1)[12]), reusing stored params
+from the artifact and order stores when they were fitted on the same
+series. --barangays also writes barangays/sarima_forecast_<barangay>.csv
+from the reconciled barangay -> station -> city hierarchy. --prune
+deletes sarima_forecast_<crime>.csv files for crime types no longer in
+the data (the older DCPO offense list: threats, cyber_libel, rape, ...).
+
+Every output is tagged in .sarima_forecast_manifest.json with a hash of
+its input series and model spec; outputs whose hash is unchanged are
+skipped, so only the series whose data changed are refitted, in parallel
+on a process pool. Files are written to a temp file and renamed into
+place, so the admin never reads a half-written CSV.
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from artifact_store import ArtifactStore, OrderStore, series_hash
+from barangays import BarangayCodes
+from count_cube import CountCube
+from dataset import BASE_DIR, DEFAULT_CSV_PATH, load_crime_data
+from forecasting import TOTAL_SERIES, SeriesForecast, forecast_series, monthly_series, series_spec, stored_params
+from hierarchy import HierarchicalForecast
+
+DEFAULT_OUTPUT_DIR = os.path.abspath(os.path.join(BASE_DIR, "..", "admin", "storage", "app"))
+DEFAULT_ARTIFACT_DIR = os.getenv("SARIMA_ARTIFACT_DIR", os.path.join(BASE_DIR, "artifacts"))
+MANIFEST_NAME = ".sarima_forecast_manifest.json"
+GENERATOR_VERSION = 1       # bump when the CSV layout changes to regenerate everything
+UMASK = os.umask(0)         # read once (the only way is to set it), then restored
+os.umask(UMASK)
+
+
+# =========================================================
+# Output files
+# =========================================================
+def forecast_filename(name: str) -> str:
+    """sarima_forecast.csv for the total, sarima_forecast_<slug>.csv for anything else."""
+    if name == TOTAL_SERIES:
+        return "sarima_forecast.csv"
+    return "sarima_forecast_" + (re.sub(r"[^A-Za-z0-9]+", "_", name).strip("_").lower() or "series") + ".csv"
+
+
+def forecast_frame(result: SeriesForecast, horizon: int) -> pd.DataFrame:
+    rows = result.head(horizon)
+    return pd.DataFrame({
+        "Date": [row["date"] for row in rows],
+        "Forecast_Crimes": [row["forecast"] for row in rows],
+        "Lower_CI": [row["lower_ci"] for row in rows],
+        "Upper_CI": [row["upper_ci"] for row in rows],
+    })
+
+
+def write_atomic(path: str, text: str) -> None:
+    """
+    Write via a unique temp file + os.replace (atomic on the same
+    filesystem), so two runs writing one output never share a temp file.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+            f.write(text)
+        # mkstemp makes it 0600; the admin app reads these, so give the umask's mode
+        os.chmod(tmp_path, 0o666 & ~UMASK)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def read_manifest(path: str) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        print(f"[WARN] Ignoring unreadable manifest {path}: {e}")
+        return {}
+
+
+def input_hash(*parts) -> str:
+    """sha1 of everything an output depends on besides the code."""
+    return hashlib.sha1(repr((GENERATOR_VERSION,) + parts).encode("utf-8")).hexdigest()
+
+
+# =========================================================
+# Series jobs
+# =========================================================
+def artifact_store_for(artifact_dir: str, spec: dict):
+    """The artifact store holding spec's order, None when nothing was saved for it (never creates one)."""
+    root = os.path.join(artifact_dir, "sarima_" + "".join(map(str, spec["order"])) + "_"
+                        + "".join(map(str, spec["seasonal_order"])))
+    if not os.path.isdir(root):
+        return None
+    return ArtifactStore(artifact_dir, spec["order"], spec["seasonal_order"])
+
+
+def prune_outputs(output_dir: str, keep: set, manifest: dict) -> list:
+    """Delete top-level sarima_forecast_*.csv files not in `keep`; returns their names."""
+    removed = []
+    for filename in sorted(os.listdir(output_dir)):
+        if filename.startswith("sarima_forecast_") and filename.endswith(".csv") and filename not in keep:
+            os.remove(os.path.join(output_dir, filename))
+            manifest.pop(filename, None)
+            removed.append(filename)
+    return removed
+
+
+def run_series(name: str, target_ts: pd.Series, horizon: int, params, spec: dict) -> SeriesForecast:
+    """Forecast one series. Runs in a worker."""
+    return forecast_series(target_ts, horizon, name, params, **spec)
+
+
+def generate_series(series: dict, winners: dict, output_dir: str, manifest: dict, args) -> dict:
+    """Forecast and write every stale series; returns {"written": [...], "skipped": [...]}."""
+    jobs, skipped = {}, []
+    for name, target_ts in series.items():
+        spec = series_spec(name, winners, enforce=name == TOTAL_SERIES)
+        filename = forecast_filename(name)
+        digest = input_hash(series_hash(target_ts), sorted(spec.items()), args.horizon)
+        if not args.force and manifest.get(filename) == digest \
+                and os.path.exists(os.path.join(output_dir, filename)):
+            skipped.append(name)
+            continue
+        params = stored_params(name, target_ts, spec, winners, artifact_store_for(args.artifact_dir, spec))
+        jobs[name] = (filename, digest, target_ts, params, spec)
+
+    written = []
+    if jobs:
+        with ProcessPoolExecutor(max_workers=min(args.workers, len(jobs))) as pool:
+            futures = {
+                pool.submit(run_series, name, target_ts, args.horizon, params, spec): name
+                for name, (_, _, target_ts, params, spec) in jobs.items()
+            }
+            for future in as_completed(futures):
+                name = futures[future]
+                filename, digest = jobs[name][:2]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"[ERROR] {name}: {e}")
+                    continue
+                write_atomic(os.path.join(output_dir, filename),
+                             forecast_frame(result, args.horizon).to_csv(index=False))
+                manifest[filename] = digest
+                written.append(name)
+                print(f"  {filename}: {result.method}{' (reused params)' if result.reused else ''}")
+    return {"written": written, "skipped": skipped}
+
+
+def generate_barangays(cube: CountCube, output_dir: str, manifest: dict, args) -> dict:
+    """Reconciled forecast per canonical barangay, rebuilt only when the count cube changed."""
+    folder = os.path.join(output_dir, "barangays")
+    key = "barangays/"
+    digest = input_hash(hashlib.sha1(np.ascontiguousarray(cube.counts).tobytes()).hexdigest(),
+                        tuple(str(m.date()) for m in cube.months), tuple(cube.crime_types),
+                        tuple(cube.barangays), args.horizon, args.hierarchy_method)
+    if not args.force and manifest.get(key) == digest and os.path.isdir(folder):
+        return {"written": [], "skipped": ["barangays"]}
+
+    codes = BarangayCodes.load(cube.barangays)
+    hierarchy = HierarchicalForecast.build(cube, codes, method=args.hierarchy_method)
+    os.makedirs(folder, exist_ok=True)
+    written = []
+    for cid in sorted(set(codes.canonical.tolist())):
+        result = hierarchy.get("barangay", codes.keys[cid])
+        if result is None:
+            continue
+        write_atomic(os.path.join(folder, forecast_filename(codes.keys[cid])),
+                     forecast_frame(result, args.horizon).to_csv(index=False))
+        written.append(codes.names[cid])
+    manifest[key] = digest
+    print(f"  barangays/: {len(written)} reconciled forecasts "
+          f"({hierarchy.stats()['build_seconds']}s hierarchy build)")
+    return {"written": written, "skipped": []}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--csv", default=DEFAULT_CSV_PATH)
+    parser.add_argument("--output-dir", default=DEFAULT_OUTPUT_DIR)
+    parser.add_argument("--artifact-dir", default=DEFAULT_ARTIFACT_DIR,
+                        help="artifact/order store to reuse params from (read only)")
+    parser.add_argument("--horizon", type=int, default=12, help="months per CSV")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--series", nargs="*", help="only these crime types (default: total + all)")
+    parser.add_argument("--barangays", action="store_true", help="also write reconciled per-barangay CSVs")
+    parser.add_argument("--hierarchy-method", choices=("top_down", "wls"),
+                        default=os.getenv("SARIMA_HIERARCHY_METHOD", "top_down"))
+    parser.add_argument("--force", action="store_true", help="regenerate even when the inputs are unchanged")
+    parser.add_argument("--prune", action="store_true",
+                        help="delete per-crime CSVs of crime types that are no longer in the data")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    df = load_crime_data(args.csv)
+    cube = CountCube.from_frame(df)
+    series = {TOTAL_SERIES: monthly_series(df)}
+    series.update({name: cube.series(crime_type=name) for name in cube.crime_type_names})
+    if args.series:
+        wanted = {TOTAL_SERIES} | {" ".join(s.split()).upper() for s in args.series}
+        series = {name: ts for name, ts in series.items() if name in wanted}
+
+    winners = OrderStore(os.path.join(args.artifact_dir, "orders")).load_all()
+    os.makedirs(args.output_dir, exist_ok=True)
+    manifest_path = os.path.join(args.output_dir, MANIFEST_NAME)
+    manifest = read_manifest(manifest_path)
+
+    print(f"Generating {len(series)} series into {args.output_dir} on {args.workers} workers.")
+    report = generate_series(series, winners, args.output_dir, manifest, args)
+    if args.barangays:
+        barangays = generate_barangays(cube, args.output_dir, manifest, args)
+        report["written"] += barangays["written"]
+        report["skipped"] += barangays["skipped"]
+
+    if args.prune and not args.series:
+        for filename in prune_outputs(args.output_dir, {forecast_filename(name) for name in series}, manifest):
+            print(f"  removed {filename}")
+
+    write_atomic(manifest_path, json.dumps(manifest, indent=2, sort_keys=True))
+    print(f"Done in {time.perf_counter() - started:.2f}s: {len(report['written'])} written, "
+          f"{len(report['skipped'])} unchanged.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+from forecasting import normalize_crime_type
+
+HOTSPOT_METHODS = ("grid", "kde")
+HOTSPOT_FORMATS = ("geojson", "grid")
+DEFAULT_CELL_DEGREES = 0.005        # ~550 m at Davao's latitude
+KERNEL_RADIUS = 3.0                 # truncate the Gaussian at 3 bandwidths
+MAX_GRID_CELLS = 250_000            # rows x cols per hotspot grid (/hotspots answers 400 beyond it)
+# (south, west, north, east) of Davao City with a few km of margin;
+# coordinates outside it are data errors, not incidents
+CITY_BOUNDS = (6.85, 125.10, 7.65, 125.80)
+
+
+def in_city(lat, lon):
+    """Elementwise: inside CITY_BOUNDS."""
+    south, west, north, east = CITY_BOUNDS
+    return (lat >= south) & (lat <= north) & (lon >= west) & (lon <= east)
+
+
+# =========================================================
+# Located incidents
+# =========================================================
+class IncidentPoints:
+    """
+    Every incident with usable coordinates as parallel arrays (day,
+    crime-type code, latitude, longitude, count), so a filter is a
+    boolean mask and binning is one bincount over the selected rows.
+    Immutable: `add` returns a new instance.
+    """
+
+    def __init__(self, days: np.ndarray, crime_codes: np.ndarray, crime_types: List[str],
+                 lat: np.ndarray, lon: np.ndarray, counts: np.ndarray):
+        self.days = days
+        self.crime_codes = crime_codes
+        self.crime_types = list(crime_types)
+        self.lat = lat
+        self.lon = lon
+        self.counts = counts
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "IncidentPoints":
+        return cls.empty().add(df)
+
+    @classmethod
+    def empty(cls) -> "IncidentPoints":
+        return cls(np.array([], dtype="datetime64[D]"), np.array([], dtype=np.int32), [],
+                   np.array([], dtype=np.float64), np.array([], dtype=np.float64), np.array([], dtype=np.int32))
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    def add(self, records: pd.DataFrame) -> "IncidentPoints":
+        """A new instance with `records` (date, crime_type, crime_count, latitude, longitude) appended."""
+        lat = pd.to_numeric(records["latitude"], errors="coerce").to_numpy(dtype=np.float64)
+        lon = pd.to_numeric(records["longitude"], errors="coerce").to_numpy(dtype=np.float64)
+        # 0/0 is what the report form sends when the user gave no location;
+        # points outside the city are dropped so they cannot stretch the grid
+        valid = np.isfinite(lat) & np.isfinite(lon) & in_city(lat, lon)
+        if not valid.any():
+            return self
+
+        labels = records["crime_type"].astype(str).to_numpy()[valid]
+        crime_types = list(dict.fromkeys(self.crime_types + labels.tolist()))
+        positions = {name: i for i, name in enumerate(crime_types)}
+        codes = np.array([positions[name] for name in labels], dtype=np.int32)
+
+        return IncidentPoints(
+            np.concatenate([self.days, records["date"].to_numpy()[valid].astype("datetime64[D]")]),
+            np.concatenate([self.crime_codes, codes]),
+            crime_types,
+            np.concatenate([self.lat, lat[valid]]),
+            np.concatenate([self.lon, lon[valid]]),
+            np.concatenate([self.counts, records["crime_count"].to_numpy()[valid].astype(np.int32)]),
+        )
+
+    def select(self, start=None, end=None, crime_type: str = None, positions: np.ndarray = None) -> np.ndarray:
+        """
+        Boolean mask of incidents from `start` to `end` (inclusive days) of
+        one crime type, over every incident or only over `positions`.
+        """
+        days = self.days if positions is None else self.days[positions]
+        mask = np.ones(len(days), dtype=bool)
+        if start is not None:
+            mask &= days >= np.datetime64(pd.Timestamp(start).date(), "D")
+        if end is not None:
+            mask &= days <= np.datetime64(pd.Timestamp(end).date(), "D")
+        if crime_type:
+            crime_codes = self.crime_codes if positions is None else self.crime_codes[positions]
+            mask &= np.isin(crime_codes, self.crime_codes_for(crime_type))
+        return mask
+
+    def crime_codes_for(self, crime_type: str) -> np.ndarray:
+        """Codes of the labels that normalize to `crime_type` (several when only case differs)."""
+        wanted = normalize_crime_type(crime_type)
+        return np.array([i for i, name in enumerate(self.crime_types) if normalize_crime_type(name) == wanted],
+                        dtype=np.int32)
+
+
+# =========================================================
+# Grid / kernel density
+# =========================================================
+def grid_extent(points: IncidentPoints, cell: float):
+    """
+    (lon0, lat0, cols, rows) covering every incident, snapped to
+    multiples of `cell` so cells line up across filters and reloads.
+    Never wider than CITY_BOUNDS, since `add` keeps only points inside.
+    """
+    if len(points) == 0:
+        return 0.0, 0.0, 0, 0
+    lon0 = np.floor(points.lon.min() / cell) * cell
+    lat0 = np.floor(points.lat.min() / cell) * cell
+    cols = int(np.floor((points.lon.max() - lon0) / cell)) + 1
+    rows = int(np.floor((points.lat.max() - lat0) / cell)) + 1
+    return float(lon0), float(lat0), cols, rows
+
+
+def gaussian_smoother(size: int, bandwidth: float) -> np.ndarray:
+    """
+    (size x size) matrix applying a truncated Gaussian along one axis,
+    each source cell's weights summing to 1 so smoothing keeps the total.
+    """
+    offsets = np.arange(size)[:, None] - np.arange(size)[None, :]
+    weights = np.exp(-0.5 * (offsets / bandwidth) ** 2)
+    weights[np.abs(offsets) > KERNEL_RADIUS * bandwidth] = 0.0
+    return weights / weights.sum(axis=0, keepdims=True)
+
+
+class HotspotGrid:
+    """
+    Incident intensity on a regular lon/lat grid: the weighted count per
+    cell ("grid"), or that count smoothed with a Gaussian kernel of
+    `bandwidth` cells ("kde", a binned kernel density estimate).
+    Row 0 is the southernmost row.
+    """
+
+    def __init__(self, lon0: float, lat0: float, cell: float, values: np.ndarray, counts: np.ndarray,
+                 method: str, bandwidth: float):
+        self.lon0 = lon0
+        self.lat0 = lat0
+        self.cell = cell
+        self.values = values
+        self.counts = counts
+        self.method = method
+        self.bandwidth = bandwidth
+
+    @classmethod
+    def build(cls, points: IncidentPoints, mask: np.ndarray, cell: float = DEFAULT_CELL_DEGREES,
+              method: str = "grid", bandwidth: float = 1.5) -> "HotspotGrid":
+        if method not in HOTSPOT_METHODS:
+            raise ValueError(f"method must be one of {', '.join(HOTSPOT_METHODS)}.")
+
+        # extent of every incident, not just the selected ones, so filtered
+        # grids overlay each other cell for cell
+        lon0, lat0, cols, rows = grid_extent(points, cell)
+        if rows * cols > MAX_GRID_CELLS:
+            raise ValueError(f"a {cell}-degree cell gives {rows * cols:,} cells (limit {MAX_GRID_CELLS:,}); "
+                             f"use a larger cell.")
+        ix = ((points.lon[mask] - lon0) / cell).astype(np.intp)
+        iy = ((points.lat[mask] - lat0) / cell).astype(np.intp)
+        counts = np.bincount(iy * cols + ix, weights=points.counts[mask], minlength=rows * cols)
+        counts = counts.reshape(rows, cols)
+
+        values = counts
+        if method == "kde" and rows and cols:
+            values = gaussian_smoother(rows, bandwidth) @ counts @ gaussian_smoother(cols, bandwidth).T
+        return cls(lon0, lat0, cell, values, counts, method, bandwidth)
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    def bbox(self) -> List[float]:
+        rows, cols = self.shape
+        return [round(self.lon0, 6), round(self.lat0, 6),
+                round(self.lon0 + cols * self.cell, 6), round(self.lat0 + rows * self.cell, 6)]
+
+    def cells(self, min_share: float = 0.0):
+        """(row, col) of cells whose intensity is above `min_share` of the peak."""
+        peak = self.values.max() if self.values.size else 0.0
+        if peak <= 0:
+            return np.array([], dtype=np.intp), np.array([], dtype=np.intp)
+        return np.nonzero(self.values > peak * min_share)
+
+    def to_geojson(self, min_share: float = 0.0) -> dict:
+        """FeatureCollection with one square Polygon per cell above `min_share` of the peak."""
+        rows, cols = self.cells(min_share)
+        peak = float(self.values.max()) if self.values.size else 0.0
+        west = self.lon0 + cols * self.cell
+        south = self.lat0 + rows * self.cell
+        features = [
+            {
+                "type": "Feature",
+                "geometry": {
+                    "type": "Polygon",
+                    "coordinates": [[
+                        [round(w, 6), round(s, 6)], [round(w + self.cell, 6), round(s, 6)],
+                        [round(w + self.cell, 6), round(s + self.cell, 6)], [round(w, 6), round(s + self.cell, 6)],
+                        [round(w, 6), round(s, 6)],
+                    ]],
+                },
+                "properties": {
+                    "intensity": round(float(v), 4),
+                    "relative": round(float(v) / peak, 4),
+                    "count": int(c),
+                },
+            }
+            for w, s, v, c in zip(west.tolist(), south.tolist(), self.values[rows, cols], self.counts[rows, cols])
+        ]
+        return {"type": "FeatureCollection", "bbox": self.bbox(), "features": features}
+
+    def to_grid(self, min_share: float = 0.0) -> dict:
+        """
+        Compact form: the grid geometry plus [row, col, intensity] for
+        every cell above `min_share` of the peak (cell (0, 0) is the
+        south-west corner at origin).
+        """
+        rows, cols = self.cells(min_share)
+        n_rows, n_cols = self.shape
+        return {
+            "origin": [round(self.lon0, 6), round(self.lat0, 6)],
+            "cell_size": self.cell,
+            "rows": n_rows,
+            "cols": n_cols,
+            "bbox": self.bbox(),
+            "max": round(float(self.values.max()), 4) if self.values.size else 0.0,
+            "cells": [[r, c, round(v, 4)] for r, c, v in zip(rows.tolist(), cols.tolist(),
+                                                              self.values[rows, cols].tolist())],
+        }
@@ -0,0 +1,107 @@
+import hashlib
+import json
+import os
+import threading
+from typing import List, Optional, Tuple
+
+import pandas as pd
+
+
+# =========================================================
+# Paths
+# =========================================================
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_INCIDENT_LOG = os.getenv("SARIMA_INCIDENT_LOG", os.path.join(BASE_DIR, "incidents", "incidents.jsonl"))
+
+# same columns as davao_crime_5years.csv (minus id)
+RECORD_COLUMNS = ("date", "barangay", "crime_type", "crime_count", "latitude", "longitude")
+
+
+# =========================================================
+# Append-only incident log
+# =========================================================
+class IncidentStore:
+    """
+    Incident records received after the CSV export, one JSON object per
+    line. Lines are only ever appended (and fsync'd) so a byte offset
+    names a fixed prefix of the log: a snapshot remembers how far it has
+    read and later picks up just the records past that offset.
+
+    Every line carries its batch id; a batch id seen before is ignored,
+    so a sender can safely retry a batch it got no answer for.
+    """
+
+    def __init__(self, path: str = DEFAULT_INCIDENT_LOG):
+        self.path = path
+        self._lock = threading.Lock()
+        self._hash = hashlib.sha1()
+        self._batches = set()
+        self.size = 0           # bytes of complete lines
+        self.records = 0
+        self._recover()
+
+    def _recover(self):
+        try:
+            with open(self.path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return
+
+        end = data.rfind(b"\n") + 1
+        if end < len(data):
+            # a write cut short by a crash; the batch was never acknowledged
+            print(f"[WARN] Dropping {len(data) - end} bytes of a partial line at the end of "
+                  f"{os.path.basename(self.path)}.")
+            with open(self.path, "r+b") as f:
+                f.truncate(end)
+
+        for line in data[:end].splitlines():
+            self._batches.add(json.loads(line).get("batch"))
+            self.records += 1
+        self._hash.update(data[:end])
+        self.size = end
+
+    def state(self) -> Tuple[int, str]:
+        """(size in bytes, sha1 of the log so far), read together."""
+        with self._lock:
+            return self.size, self._hash.hexdigest()
+
+    def append(self, records: List[dict], batch_id: str) -> Optional[Tuple[int, int]]:
+        """
+        Durably append `records` as one batch. Returns the (start, end)
+        byte offsets written, or None when `batch_id` was already stored.
+        """
+        lines = b"".join(
+            json.dumps({"batch": batch_id, **record}, separators=(",", ":")).encode("utf-8") + b"\n"
+            for record in records
+        )
+        with self._lock:
+            if batch_id in self._batches:
+                return None
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, "ab") as f:
+                f.write(lines)
+                f.flush()
+                os.fsync(f.fileno())
+            start = self.size
+            self.size += len(lines)
+            self.records += len(records)
+            self._hash.update(lines)
+            self._batches.add(batch_id)
+            return start, self.size
+
+    def read(self, start: int = 0, end: int = None) -> pd.DataFrame:
+        """Records stored between two byte offsets, typed like load_crime_data's columns."""
+        end = self.size if end is None else end
+        rows = []
+        if end > start:
+            with open(self.path, "rb") as f:
+                f.seek(start)
+                rows = [json.loads(line) for line in f.read(end - start).splitlines()]
+
+        df = pd.DataFrame(rows, columns=RECORD_COLUMNS)
+        df["date"] = pd.to_datetime(df["date"], errors="coerce")     # bad dates are skipped on replay
+        df["crime_count"] = df["crime_count"].astype("int32")
+        df["latitude"] = pd.to_numeric(df["latitude"]).astype("float32")
+        df["longitude"] = pd.to_numeric(df["longitude"]).astype("float32")
+        return df
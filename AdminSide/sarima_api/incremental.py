@@ -0,0 +1,87 @@
+from dataclasses import replace
+from typing import List
+import numpy as np
+import pandas as pd
+
+from forecasting import MAX_HORIZON, SARIMA_ORDER, SARIMA_SEASONAL_ORDER, forecast_from_results, timed_fit
+
+
+class IncrementalModel:
+    """
+    A fitted SARIMA series that absorbs new monthly observations cheaply.
+
+    New months are appended with `results.extend`, which only runs the
+    Kalman filter over the new points, so the cost grows with the new
+    data and not the history. Full re-estimation (warm-started from the
+    current params) happens every `refit_every` months, or sooner when
+    the mean scaled one-step error of the last `drift_window` months goes
+    past `drift_threshold`.
+    """
+
+    def __init__(self, name: str, target_ts: pd.Series, results, enforce: bool = False,
+                 refit_every: int = 12, drift_threshold: float = 0.3, drift_window: int = 3,
+                 order=SARIMA_ORDER, seasonal_order=SARIMA_SEASONAL_ORDER):
+        self.name = name
+        self.ts = target_ts.astype(float)
+        self.results = results
+        self.enforce = enforce
+        self.order = tuple(order)
+        self.seasonal_order = tuple(seasonal_order)
+        self.refit_every = refit_every
+        self.drift_threshold = drift_threshold
+        self.drift_window = drift_window
+        self.months_since_refit = 0
+        self.errors: List[float] = []      # scaled |actual - forecast| per ingested month
+        self.forecast = forecast_from_results(self.ts, self.results, MAX_HORIZON)
+
+    @property
+    def drift(self) -> float:
+        recent = self.errors[-self.drift_window:]
+        return float(np.mean(recent)) if recent else 0.0
+
+    def update(self, new_ts: pd.Series, force_refit: bool = False) -> dict:
+        """Append `new_ts` (the months right after the current series) and maybe refit."""
+        expected = self.ts.index[-1] + pd.DateOffset(months=1)
+        if new_ts.empty or new_ts.index[0] != expected:
+            raise ValueError(f"{self.name}: next month must be {expected.date()}")
+
+        # score the pre-update forecast before the new months are absorbed;
+        # everything is built in locals and only assigned once the fit or
+        # extend succeeded, so a failed update leaves the model as it was
+        predicted = self.results.get_forecast(steps=len(new_ts)).predicted_mean.values
+        scale = max(float(self.ts.mean()), 1.0)
+        errors = self.errors + list(np.abs(new_ts.values - predicted) / scale)
+        ts = pd.concat([self.ts, new_ts.astype(float)]).asfreq("MS", fill_value=0)
+        months_since_refit = self.months_since_refit + len(new_ts)
+        recent = errors[-self.drift_window:]
+        drift = float(np.mean(recent)) if recent else 0.0
+
+        reason = None
+        if force_refit:
+            reason = "requested"
+        elif months_since_refit >= self.refit_every:
+            reason = "schedule"
+        elif drift > self.drift_threshold:
+            reason = "drift"
+
+        details = {}
+        if reason:
+            results, details = timed_fit(ts, enforce=self.enforce, start_params=self.results.params,
+                                         order=self.order, seasonal_order=self.seasonal_order)
+            months_since_refit = 0
+            errors = []
+        else:
+            results = self.results.extend(new_ts.astype(float))
+        forecast = replace(forecast_from_results(ts, results, MAX_HORIZON), **details)
+
+        self.ts, self.results, self.forecast = ts, results, forecast
+        self.errors, self.months_since_refit = errors, months_since_refit
+        return {
+            "series": self.name,
+            "appended": len(new_ts),
+            "last_date": str(self.ts.index[-1].date()),
+            "refit": reason is not None,
+            "reason": reason,
+            "drift": round(drift, 4),
+            "months_since_refit": self.months_since_refit,
+        }
@@ -1,11 +1,7 @@
-import pandas as pd
-import os
+from dataset import load_crime_data
 
-base_dir = os.path.dirname(os.path.abspath(__file__))
-csv_path = os.path.join(base_dir, "..", "data", "davao_crime_5years.csv")
-
-df = pd.read_csv(csv_path)
-df["crime_type"] = df["crime_type"].astype(str).str.strip().str.upper()
+df = load_crime_data()
+df["crime_type"] = df["crime_type"].astype(str).str.upper()
 
 unique_crimes = sorted(df["crime_type"].unique())
 print(f"Found {len(unique_crimes)} unique crime types:\n")
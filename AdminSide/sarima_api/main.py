@@ -1,10 +1,74 @@
-from fastapi import FastAPI, HTTPException
+import time
+IMPORT_STARTED = time.perf_counter()   # cold-start clock, started before the heavy imports
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, Response
 from pydantic import BaseModel
-from typing import List
+from typing import Dict, List, Optional, Union
 import pandas as pd
 import numpy as np
-from statsmodels.tsa.statespace.sarimax import SARIMAX
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import replace
+import hashlib
+import hmac
 import os
+import re
+import threading
+import uuid
+
+from artifact_store import ArtifactStore, OrderStore
+from barangays import BarangayCodes, station_sort_key
+from count_cube import CountCube
+from dataset import DEFAULT_CSV_PATH, load_crime_data
+from hierarchy import LEVELS, HierarchicalForecast
+from hotspots import (
+    CITY_BOUNDS,
+    DEFAULT_CELL_DEGREES,
+    HOTSPOT_FORMATS,
+    HOTSPOT_METHODS,
+    HotspotGrid,
+    IncidentPoints,
+    in_city,
+)
+from forecasting import (
+    MAX_HORIZON,
+    MIN_HISTORY_MONTHS,
+    SARIMA_ORDER,
+    SARIMA_SEASONAL_ORDER,
+    TOTAL_SERIES,
+    apply_params,
+    fit_sarima,
+    forecast_from_results,
+    forecast_series,
+    monthly_series,
+    normalize_crime_type,
+    series_spec,
+    stored_params,
+    timed_fit,
+)
+from incident_store import DEFAULT_INCIDENT_LOG, IncidentStore
+from incremental import IncrementalModel
+from metrics import CONTENT_TYPE, MetricsRegistry
+from model_cache import FittedModelCache, SingleFlight
+from serialization import (
+    ARROW,
+    COMPRESS_MIN_BYTES,
+    ETAG_SUFFIXES,
+    LAYOUTS,
+    available_media_types,
+    compress,
+    encode,
+    forecast_columns,
+    forecast_rows,
+    negotiate,
+)
+from snapshot import DataSnapshot, FileWatcher
+from spatial_index import DEFAULT_INDEX_CELL_DEGREES, SpatialIndex
+from tiles import MAX_ZOOM, MIN_ZOOM, TilePyramid
+
+IMPORT_SECONDS = time.perf_counter() - IMPORT_STARTED
 
 app = FastAPI()
 
@@ -66,15 +130,270 @@ class PossibleCrimesResponse(BaseModel):
     data: List[PossibleCrimeItem]
 
 
+class MonthlyStatItem(BaseModel):
+    year: int
+    month: int
+    count: float
+
+class TypeStatItem(BaseModel):
+    type: str
+    count: float
+
+class LocationStatItem(BaseModel):
+    location: str
+    count: float
+
+class StatsOverview(BaseModel):
+    total: float
+    thisMonth: float
+    lastMonth: float
+    percentChange: float
+
+class CrimeStatsData(BaseModel):
+    monthly: List[MonthlyStatItem]
+    byType: List[TypeStatItem]
+    byStatus: List[dict]
+    byLocation: List[LocationStatItem]
+    overview: StatsOverview
+
+class CrimeStatsResponse(BaseModel):
+    status: str
+    data: CrimeStatsData
+    filter: Dict[str, Optional[str]]
+
+
+class BarangayStatItem(BaseModel):
+    barangay: str
+    total_crimes: float
+
+class BarangayStatsResponse(BaseModel):
+    status: str
+    data: List[BarangayStatItem]
+    total_barangays: int
+    total_crimes: float
+    filter: Dict[str, Optional[str]]
+
+
+class BatchForecastRequest(BaseModel):
+    crime_types: Union[List[str], str] = "all"
+    horizon: int = 24
+    include_total: bool = True
+
+class SeriesForecastColumns(BaseModel):
+    method: str
+    dates: List[str]
+    forecast: List[float]
+    lower_ci: List[float]
+    upper_ci: List[float]
+
+class BatchForecastResponse(BaseModel):
+    status: str
+    horizon: int
+    dataset_version: str
+    total: Optional[SeriesForecastColumns] = None
+    series: Dict[str, SeriesForecastColumns]
+
+
+class HierarchyForecastResponse(BaseModel):
+    status: str
+    level: str
+    name: Optional[str] = None
+    crime_type: Optional[str] = None
+    horizon: int
+    method: str
+    data: List[ForecastItem]
+
+
+class MonthlyObservation(BaseModel):
+    date: str
+    count: float
+
+class IngestRequest(BaseModel):
+    crime_type: Optional[str] = None    # omit for the city-wide total
+    observations: List[MonthlyObservation]
+    refit: bool = False
+
+class IngestResponse(BaseModel):
+    status: str
+    series: str
+    appended: int
+    last_date: str
+    refit: bool
+    reason: Optional[str] = None
+    drift: float
+    months_since_refit: int
+
+class IncidentRecord(BaseModel):
+    date: str                           # YYYY-MM-DD
+    barangay: str
+    crime_type: str
+    count: int = 1
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+
+class IncidentBatchRequest(BaseModel):
+    batch_id: Optional[str] = None      # resending the same id is a no-op
+    incidents: List[IncidentRecord]
+
+class IncidentBatchResponse(BaseModel):
+    status: str
+    batch_id: str
+    accepted: int
+    duplicate: bool
+    dataset_version: str
+    incidents: int
+
+
 # =========================================================
 # Globals (shared data/model)
 # =========================================================
-ts = None                   # monthly total crimes (city-wide)
-sarima_model = None         # SARIMA(0,1,1)(0,1,1,12) model
-df_global = None            # cleaned full dataframe
-top_crimes_overall = None   # Series: crime_type -> total
-top_barangays_overall = None# Series: barangay -> total
-top_crimes_by_month = None  # DataFrame: month, crime_type, total
+# The loaded data and models live in one immutable DataSnapshot. Routes
+# read `snapshot` once and use only that object; reloads and ingests
+# build a new one and publish it with a single reference swap.
+snapshot = None             # DataSnapshot, None until the first load
+snapshot_lock = threading.RLock()   # serializes publishers (reload, ingest)
+
+# Hot reload: POST /admin/reload, or a watcher polling the CSV every
+# SARIMA_RELOAD_POLL_SECONDS (0 disables). Every route that changes state
+# (/admin/reload, /incidents, /ingest/monthly, /cache/invalidate) needs
+# SARIMA_ADMIN_TOKEN sent as X-Admin-Token; without a configured token
+# they are disabled (403), since the incident log cannot be edited later.
+RELOAD_POLL_SECONDS = float(os.getenv("SARIMA_RELOAD_POLL_SECONDS", "30"))
+ADMIN_TOKEN = os.getenv("SARIMA_ADMIN_TOKEN")
+reload_lock = threading.Lock()      # one rebuild at a time
+reload_status = {"state": "idle", "reason": None, "last_error": None, "last_reload": None, "reloads": 0}
+dataset_watcher = None
+
+# Fitted params persisted across restarts (SARIMA_ARTIFACTS=0 disables),
+# one store per SARIMA order
+ARTIFACTS_ENABLED = os.getenv("SARIMA_ARTIFACTS", "1") == "1"
+ARTIFACT_DIR = os.getenv("SARIMA_ARTIFACT_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "artifacts"))
+artifact_stores = {}        # (order, seasonal_order) -> ArtifactStore
+
+# Per-series orders chosen offline by order_search.py (SARIMA_ORDER_SEARCH=0 ignores them)
+order_store = OrderStore(os.path.join(ARTIFACT_DIR, "orders")) if os.getenv("SARIMA_ORDER_SEARCH", "1") == "1" else None
+
+# Fitted per-crime-type forecasts, keyed by (crime_type, dataset_version)
+forecast_cache = FittedModelCache(
+    max_entries=int(os.getenv("SARIMA_CACHE_MAX_ENTRIES", "64")),
+    ttl_seconds=float(os.getenv("SARIMA_CACHE_TTL_SECONDS", "3600")),
+)
+
+# Process pool for CPU-heavy fits; identical in-flight fits share one future
+FIT_WORKERS = max(1, int(os.getenv("SARIMA_FIT_WORKERS", str(os.cpu_count() or 2))))
+fit_pool = None             # created on first use
+fit_flight = SingleFlight()
+
+# Monthly observations appended after load (see /ingest/monthly)
+REFIT_EVERY_MONTHS = int(os.getenv("SARIMA_REFIT_EVERY_MONTHS", "12"))
+DRIFT_THRESHOLD = float(os.getenv("SARIMA_DRIFT_THRESHOLD", "0.3"))
+incremental_models = {}     # series name -> IncrementalModel, for the published snapshot
+
+# Incidents POSTed to /incidents (SARIMA_INCIDENT_LOG), folded into the
+# aggregates as they arrive and replayed on top of the CSV on every load
+incident_store = IncidentStore(DEFAULT_INCIDENT_LOG)
+INCIDENT_BATCH_LIMIT = int(os.getenv("SARIMA_INCIDENT_BATCH_LIMIT", "5000"))
+
+# Reconciled barangay -> station -> city forecasts, rebuilt on a background
+# thread after a snapshot with a new dataset version is published (at most
+# once per SARIMA_HIERARCHY_MIN_INTERVAL_SECONDS); the last one built keeps
+# serving meanwhile (SARIMA_HIERARCHY_PREBUILD=1 holds /ready until the first
+# one is built). top_down keeps only the city fit's mean and splits it by
+# historical shares; the lower fits contribute their interval widths alone.
+HIERARCHY_PREBUILD = os.getenv("SARIMA_HIERARCHY_PREBUILD", "0") == "1"
+HIERARCHY_METHOD = os.getenv("SARIMA_HIERARCHY_METHOD", "top_down")     # or "wls"
+# a failed build is retried for the same dataset version only after
+# SARIMA_HIERARCHY_RETRY_SECONDS (a new version is always tried)
+HIERARCHY_RETRY_SECONDS = float(os.getenv("SARIMA_HIERARCHY_RETRY_SECONDS", "600"))
+# seconds between build starts; batches arriving meanwhile share one build
+HIERARCHY_MIN_INTERVAL_SECONDS = float(os.getenv("SARIMA_HIERARCHY_MIN_INTERVAL_SECONDS", "300"))
+hierarchy_forecast = None   # (dataset_version, HierarchicalForecast) last built
+hierarchy_building = False  # a build thread is running
+hierarchy_failure = None    # {"dataset_version", "failed_at" (monotonic), "error"} of the last failed build
+hierarchy_started_at = None  # monotonic start of the last build
+hierarchy_lock = threading.Lock()
+
+# Rendered /hotspots bodies per (dataset_version, filter); the grid always
+# spans the whole city, so panning the map never needs a new one
+hotspot_cache = FittedModelCache(
+    max_entries=int(os.getenv("SARIMA_HOTSPOT_CACHE_ENTRIES", "128")),
+    ttl_seconds=0,
+)
+
+# Bucket size of the /nearby spatial index, in degrees
+SPATIAL_CELL_DEGREES = float(os.getenv("SARIMA_SPATIAL_CELL_DEGREES", str(DEFAULT_INDEX_CELL_DEGREES)))
+NEARBY_MAX_RESULTS = 500
+
+# Deepest zoom of the /tiles aggregation pyramid (MIN_ZOOM..this)
+TILE_MAX_ZOOM = min(MAX_ZOOM, int(os.getenv("SARIMA_TILE_MAX_ZOOM", str(MAX_ZOOM))))
+
+# Opt-in background pre-fit of every crime type (SARIMA_WARMUP=1)
+WARMUP_ENABLED = os.getenv("SARIMA_WARMUP", "0") == "1"
+warmup_status = {}          # crime_type -> "pending" | "ready" | "failed"
+
+# Fast start (SARIMA_FAST_START=0 trains before serving): the data is loaded
+# and the model trained in a background thread, so / (liveness) answers at
+# once while /ready and the data routes report 503 until training is done
+FAST_START = os.getenv("SARIMA_FAST_START", "1") == "1"
+LIVENESS_ROUTES = {"/", "/ready", "/metrics", "/docs", "/redoc", "/openapi.json"}
+startup_state = {"status": "starting", "error": None}    # starting -> loading -> ready | failed
+cold_start = {"import_seconds": IMPORT_SECONDS}          # seconds since IMPORT_STARTED per milestone
+
+# ETag / Cache-Control on GET insight routes; If-None-Match answered with 304
+HTTP_MAX_AGE = int(os.getenv("SARIMA_HTTP_MAX_AGE", "60"))
+VERSIONED_ROUTES = {
+    "/forecast", "/forecast/hierarchy", "/hierarchy/stations", "/top-crimes", "/top-barangays",
+    "/possible-crimes", "/stats", "/barangay-stats", "/models/orders", "/hotspots",
+    "/nearby", "/station-stats", "/barangays",
+}
+VERSIONED_PREFIXES = {"/tiles/": "/tiles/{z}/{x}/{y}"}     # path prefix -> route template
+
+
+def versioned_route(path: str) -> Optional[str]:
+    """Route template of a snapshot-versioned path, None for anything else."""
+    if path in VERSIONED_ROUTES:
+        return path
+    for prefix, template in VERSIONED_PREFIXES.items():
+        if path.startswith(prefix):
+            return template
+    return None
+
+# Prometheus-style metrics served at /metrics (SARIMA_METRICS=0 stops per-request timing)
+METRICS_ENABLED = os.getenv("SARIMA_METRICS", "1") == "1"
+metrics = MetricsRegistry()
+REQUEST_SECONDS = metrics.histogram(
+    "sarima_http_request_duration_seconds", "Request latency by route template.", ("method", "route", "status"),
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+FIT_SECONDS = metrics.histogram(
+    "sarima_fit_duration_seconds", "SARIMAX MLE wall time per series.", ("series",),
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30, 60),
+)
+FIT_ITERATIONS = metrics.histogram(
+    "sarima_fit_iterations", "Optimizer iterations per SARIMAX fit.", ("series",),
+    buckets=(5, 10, 20, 30, 40, 50, 100, 200),
+)
+CONVERGENCE_WARNINGS = metrics.counter(
+    "sarima_convergence_warnings_total", "ConvergenceWarnings raised while fitting.", ("series",)
+)
+FORECASTS_BUILT = metrics.counter(
+    "sarima_forecasts_total",
+    "Forecasts built, by method (sarima/fallback/empty) and source (fitted/reused/none).",
+    ("series", "method", "source"),
+)
+LOAD_PHASE_SECONDS = metrics.gauge(
+    "sarima_load_phase_seconds", "Duration of each load_and_train phase in the last load.", ("phase",)
+)
+DATASET_LOADS = metrics.counter("sarima_dataset_loads_total", "Completed load_and_train runs.")
+DATASET_ROWS = metrics.gauge("sarima_dataset_rows", "Rows in the loaded dataset.")
+CACHE_LOOKUPS = metrics.counter("sarima_forecast_cache_lookups_total", "Forecast cache lookups.", ("result",))
+CACHE_HIT_RATIO = metrics.gauge("sarima_forecast_cache_hit_ratio", "Forecast cache hits / lookups.")
+CACHE_ENTRIES = metrics.gauge("sarima_forecast_cache_entries", "Fitted forecasts held in the cache.")
+FITS_STARTED = metrics.counter("sarima_fits_total", "Crime-type fits started or joined in flight.", ("outcome",))
+HIERARCHY_BUILD_SECONDS = metrics.gauge("sarima_hierarchy_build_seconds", "Last hierarchy build time.")
+COLD_START_SECONDS = metrics.gauge(
+    "sarima_cold_start_seconds", "Startup milestones (import, live, training, data_ready) in seconds.", ("milestone",)
+)
 
 
 # =========================================================
@@ -89,7 +408,282 @@ def month_name_from_int(m: int) -> str:
     return names.get(m, "Unknown")
 
 
-def load_and_train():
+def compute_dataset_version(df: pd.DataFrame) -> str:
+    """Short content hash of the cleaned dataframe."""
+    row_hashes = pd.util.hash_pandas_object(df, index=False).values
+    return hashlib.sha1(row_hashes.tobytes()).hexdigest()[:12]
+
+
+def incident_dataset_version(source_version: str, incident_offset: int, incident_digest: str) -> str:
+    """dataset_version once `incident_offset` bytes of the incident log are folded in."""
+    if incident_offset == 0:
+        return source_version
+    return hashlib.sha1(f"{source_version}:{incident_digest}".encode("utf-8")).hexdigest()[:12]
+
+
+def compute_model_version(order_winners: dict, generation: int) -> str:
+    """
+    Hash of everything besides the data that changes what the routes
+    return: API version, per-series orders, hierarchy reconciliation
+    method and ingested months.
+    """
+    orders = sorted((name, tuple(w["order"]), tuple(w["seasonal_order"])) for name, w in order_winners.items())
+    parts = (app.version, SARIMA_ORDER, SARIMA_SEASONAL_ORDER, orders, HIERARCHY_METHOD, generation)
+    return hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()[:8]
+
+
+def current_snapshot() -> DataSnapshot:
+    """The published snapshot; 500 when nothing has been loaded."""
+    snap = snapshot
+    if snap is None:
+        raise HTTPException(status_code=500, detail="Data not loaded.")
+    return snap
+
+
+def crime_type_series(snap: DataSnapshot) -> dict:
+    """Monthly series for every distinct (normalized) crime type."""
+    return {name: snap.count_cube.series(crime_type=name) for name in snap.count_cube.crime_type_names}
+
+
+def parse_month(value: str, field: str):
+    """Parse an optional YYYY-MM[-DD] query value; 400 on bad input."""
+    if not value:
+        return None
+    try:
+        return pd.Timestamp(value)
+    except Exception:
+        raise HTTPException(status_code=400, detail=f"Invalid {field}. Use YYYY-MM or YYYY-MM-DD.")
+
+
+def parse_day_range(start: str, end: str):
+    """Inclusive start/end days from YYYY-MM[-DD] values; a YYYY-MM end covers the whole month."""
+    start_ts = parse_month(start, "start")
+    end_ts = parse_month(end, "end")
+    if end_ts is not None and re.fullmatch(r"\d{4}-\d{2}", end):
+        end_ts = end_ts + pd.offsets.MonthEnd(0)
+    return start_ts, end_ts
+
+
+def check_layout(layout: str):
+    if layout not in LAYOUTS:
+        raise HTTPException(status_code=400, detail=f"layout must be one of {', '.join(LAYOUTS)}.")
+
+
+def encoded_response(request: Request, payload: dict, table: Optional[dict] = None) -> Response:
+    """
+    `payload` encoded for the request's Accept header (JSON via orjson,
+    MessagePack, or Arrow IPC of `table`) and brotli-compressed when the
+    client accepts br, skipping Pydantic response models. An Accept we
+    cannot meet gets JSON; 406 only when it refuses JSON (q=0).
+    """
+    media_type = negotiate(request.headers.get("accept"), tabular=table is not None)
+    if media_type is None:
+        offered = [m for m in available_media_types() if table is not None or m != ARROW]
+        raise HTTPException(status_code=406, detail=f"Acceptable types: {', '.join(offered)}.")
+    body, content_encoding = compress(encode(payload, media_type, table), request.headers.get("accept-encoding"))
+    headers = {"Vary": "Accept"}       # GZipMiddleware adds Accept-Encoding when it compresses
+    if content_encoding:
+        headers.update({"Content-Encoding": content_encoding, "Vary": "Accept, Accept-Encoding"})
+    return Response(content=body, media_type=media_type, headers=headers)
+
+
+def get_artifact_store(spec: dict):
+    if not ARTIFACTS_ENABLED:
+        return None
+    key = (tuple(spec["order"]), tuple(spec["seasonal_order"]))
+    if key not in artifact_stores:
+        artifact_stores[key] = ArtifactStore(ARTIFACT_DIR, *key)
+    return artifact_stores[key]
+
+
+def persist_fit(name: str, target_ts: pd.Series, result, spec: dict, csv_hash: str):
+    """Save freshly estimated params; reused ones are already on disk."""
+    store = get_artifact_store(spec)
+    if store is None or not result.params or result.reused:
+        return
+    store.save(name, target_ts, result.params, spec["enforce"], csv_hash)
+
+
+def record_forecast(name: str, result):
+    """Count a freshly built forecast and, when it was fitted, its fit details."""
+    source = "reused" if result.reused else "fitted" if result.fit_seconds else "none"
+    FORECASTS_BUILT.inc(series=name, method=result.method, source=source)
+    if result.fit_seconds:
+        FIT_SECONDS.observe(result.fit_seconds, series=name)
+        FIT_ITERATIONS.observe(result.iterations, series=name)
+        CONVERGENCE_WARNINGS.inc(result.convergence_warnings, series=name)
+
+
+def get_fit_pool() -> ProcessPoolExecutor:
+    global fit_pool
+    if fit_pool is None:
+        fit_pool = ProcessPoolExecutor(max_workers=FIT_WORKERS)
+    return fit_pool
+
+
+def reset_fit_pool():
+    """Drop a broken pool; the next fit starts a fresh one."""
+    global fit_pool
+    if fit_pool is not None:
+        fit_pool.shutdown(wait=False, cancel_futures=True)
+        fit_pool = None
+
+
+def submit_crime_type_fit(name: str, snap: DataSnapshot) -> Future:
+    """
+    Start (or join) the fit for one crime type on the process pool.
+    The returned Future settles only after the result is recorded,
+    persisted and cached, so a waiter that reads the cache finds it.
+    """
+    key = (name, snap.dataset_version)
+
+    def start() -> Future:
+        target_ts = snap.count_cube.series(crime_type=name)
+        spec = series_spec(name, snap.order_winners)
+        params = stored_params(name, target_ts, spec, snap.order_winners, get_artifact_store(spec))
+        fit = get_fit_pool().submit(forecast_series, target_ts, MAX_HORIZON, name, params, **spec)
+        stored = Future()
+
+        def store(f: Future):
+            if f.cancelled():
+                stored.cancel()
+                return
+            if f.exception() is not None:
+                stored.set_exception(f.exception())
+                return
+            try:
+                record_forecast(name, f.result())
+                persist_fit(name, target_ts, f.result(), spec, snap.csv_hash)
+                forecast_cache.put(key, f.result())
+            except Exception as e:
+                print(f"[WARN] Could not store the fit for {name}: {e}")
+            stored.set_result(f.result())
+
+        fit.add_done_callback(store)
+        return stored
+
+    return fit_flight.run(key, start)
+
+
+def warm_up_crime_types(snap: DataSnapshot):
+    """
+    Fit every crime-type series in a process pool and seed the forecast
+    cache with the results. Runs in a background thread; progress is
+    visible through /ready.
+    """
+    names = snap.count_cube.crime_type_names
+
+    warmup_status.clear()
+    warmup_status.update({name: "pending" for name in names})
+    print(f"[WARMUP] Fitting {len(names)} crime types on {FIT_WORKERS} workers...")
+
+    futures = {submit_crime_type_fit(name, snap): name for name in names}
+    for future in as_completed(futures):
+        name = futures[future]
+        try:
+            future.result()
+            warmup_status[name] = "ready"
+        except Exception as e:
+            print(f"[ERROR] Warm-up failed for {name}: {e}")
+            warmup_status[name] = "failed"
+
+    print("[WARMUP] Done.")
+
+
+def build_hierarchies():
+    """
+    Build the hierarchy for the published snapshot, and again for as long
+    as a newer dataset version was published during the build (a burst
+    of incident batches costs one extra build, not one per batch).
+    Builds start at least HIERARCHY_MIN_INTERVAL_SECONDS apart: every
+    node is refitted, so a steady stream of batches would otherwise keep
+    a core busy; the wait also folds in the batches that arrive during it.
+    """
+    global hierarchy_forecast, hierarchy_building, hierarchy_failure, hierarchy_started_at
+    while True:
+        if hierarchy_started_at is not None:
+            wait = hierarchy_started_at + HIERARCHY_MIN_INTERVAL_SECONDS - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+        snap = snapshot
+        with hierarchy_lock:
+            if not hierarchy_due(snap):
+                hierarchy_building = False
+                return
+            hierarchy_started_at = time.monotonic()
+        print("[HIERARCHY] Fitting and reconciling every node...")
+        try:
+            built = HierarchicalForecast.build(snap.count_cube, snap.barangay_codes, method=HIERARCHY_METHOD)
+        except Exception as e:
+            print(f"[ERROR] Hierarchy build failed for {snap.dataset_version}: {e} "
+                  f"(next try in {HIERARCHY_RETRY_SECONDS:.0f}s or on new data)")
+            with hierarchy_lock:
+                hierarchy_failure = {"dataset_version": snap.dataset_version, "failed_at": time.monotonic(),
+                                     "error": str(e) or type(e).__name__}
+                hierarchy_building = False
+            return
+        stats = built.stats()
+        HIERARCHY_BUILD_SECONDS.set(stats["build_seconds"])
+        print(f"[HIERARCHY] {stats['nodes']} nodes ({stats['bottom_series']} bottom series) "
+              f"in {stats['build_seconds']}s.")
+        with hierarchy_lock:
+            hierarchy_forecast = (snap.dataset_version, built)
+            hierarchy_failure = None
+
+
+def hierarchy_due(snap: Optional[DataSnapshot]) -> bool:
+    """`snap` needs a build: none exists for its version, and it has not just failed for that version."""
+    if snap is None or (hierarchy_forecast is not None and hierarchy_forecast[0] == snap.dataset_version):
+        return False
+    failure = hierarchy_failure
+    return not (failure is not None and failure["dataset_version"] == snap.dataset_version
+                and time.monotonic() - failure["failed_at"] < HIERARCHY_RETRY_SECONDS)
+
+
+def schedule_hierarchy_build():
+    """
+    Start the build thread unless one is already running (it picks up the
+    newest snapshot) or the newest snapshot's build failed recently.
+    """
+    global hierarchy_building
+    with hierarchy_lock:
+        if hierarchy_building or not hierarchy_due(snapshot):
+            return
+        hierarchy_building = True
+    threading.Thread(target=build_hierarchies, name="sarima-hierarchy", daemon=True).start()
+
+
+def get_hierarchy(snap: DataSnapshot):
+    """
+    (dataset_version, HierarchicalForecast) last built. It is older than
+    `snap` while a rebuild runs (or after one failed); 503 before the
+    first build has finished, saying so when it failed. Requests never
+    build it themselves.
+    """
+    built = hierarchy_forecast
+    if built is None or built[0] != snap.dataset_version:
+        schedule_hierarchy_build()      # no-op while one runs or after a recent failure
+    if built is None:
+        failure = hierarchy_failure
+        if failure is not None and not hierarchy_building:
+            retry = max(HIERARCHY_RETRY_SECONDS - (time.monotonic() - failure["failed_at"]), 1)
+            raise HTTPException(status_code=503, headers={"Retry-After": str(int(retry))},
+                                detail=f"Hierarchical forecast build failed: {failure['error']}")
+        raise HTTPException(status_code=503, headers={"Retry-After": "15"},
+                            detail="Hierarchical forecasts are being built; retry shortly.")
+    return built
+
+
+def hierarchy_ready() -> bool:
+    """
+    A hierarchy has been built. It may be for an older dataset version
+    while the rebuild for the latest incident batch runs; that one is
+    served meanwhile, so readiness does not drop on every batch.
+    """
+    return hierarchy_forecast is not None
+
+
+def build_snapshot() -> DataSnapshot:
     """
     1. Load davao_crime_5years.csv
     2. Clean data
@@ -99,111 +693,364 @@ def load_and_train():
        - top crimes overall
        - top barangays overall
        - top 3 crimes per calendar month
-    """
-    global ts, sarima_model, df_global
-    global top_crimes_overall, top_barangays_overall, top_crimes_by_month
-
-    # 1) Path to CSV  --------------------------------------
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    csv_path = os.path.join(base_dir, "..", "data", "davao_crime_5years.csv")
-    csv_path = os.path.abspath(csv_path)
 
-    if not os.path.exists(csv_path):
-        raise FileNotFoundError(f"davao_crime_5years.csv not found at: {csv_path}")
+    Nothing global is touched; the result is published with publish_snapshot.
+    """
+    phases = {}
+    started = time.perf_counter()
+
+    # 1) + 2) LOAD CLEANED DATA  ---------------------------
+    # served from the columnar cache; rebuilt when the CSV changes
+    df = load_crime_data(DEFAULT_CSV_PATH)
+    csv_hash = df.attrs["source_hash"]
+    phases["load"] = time.perf_counter() - started
+
+    mark = time.perf_counter()
+    source_version = compute_dataset_version(df)
+    count_cube = CountCube.from_frame(df)
+
+    # incidents received since the CSV export, replayed on top of it
+    incident_offset, incident_digest = incident_store.state()
+    incidents = valid_incidents(incident_store.read(0, incident_offset), count_cube.months[0])
+    count_cube = count_cube.add(incidents)
+    points = IncidentPoints.from_frame(df).add(incidents)
+    dataset_version = incident_dataset_version(source_version, incident_offset, incident_digest)
 
-    df = pd.read_csv(csv_path)
+    # 3) MONTHLY TOTAL CRIMES (CITY-WIDE)  -----------------
+    # group by month start, sum crime_count
+    ts = monthly_series(df) if incidents.empty else count_cube.series()
+    phases["aggregate"] = time.perf_counter() - mark
+
+    # 4) TRAIN SARIMA (order-search winner or (0,1,1)(0,1,1)[12])
+    # reuse stored params (filter only) when the series is unchanged
+    order_winners = order_store.load_all() if order_store is not None else {}
+    if order_winners:
+        print(f"   Loaded searched orders for {len(order_winners)} series.")
+    mark = time.perf_counter()
+    spec = series_spec(TOTAL_SERIES, order_winners, enforce=True)
+    params = stored_params(TOTAL_SERIES, ts, spec, order_winners, get_artifact_store(spec))
+    details = {}
+    if params is not None:
+        sarima_model = apply_params(ts, params, **spec)
+        print("   Reused stored params for the city-wide model.")
+    else:
+        sarima_model, details = timed_fit(ts, **spec)
+    phases["fit"] = time.perf_counter() - mark
 
-    # Expect columns:
-    # id, date, barangay, crime_type, crime_count, latitude, longitude
+    mark = time.perf_counter()
+    global_forecast = replace(forecast_from_results(ts, sarima_model, MAX_HORIZON, reused=params is not None), **details)
+    phases["forecast"] = time.perf_counter() - mark
+    record_forecast(TOTAL_SERIES, global_forecast)
+    persist_fit(TOTAL_SERIES, ts, global_forecast, spec, csv_hash)
 
-    # 2) CLEANING  -----------------------------------------
-    df["date"] = pd.to_datetime(df["date"], errors="coerce")
-    df = df.dropna(subset=["date"]).sort_values("date")
+    # 5) PRE-COMPUTE INSIGHTS  -----------------------------
+    mark = time.perf_counter()
 
-    # keep only positive crimes
-    df["crime_count"] = pd.to_numeric(df["crime_count"], errors="coerce")
-    df = df[df["crime_count"] > 0]
+    # 5a) Overall top crimes
+    top_crimes_overall = count_cube.totals_by_crime_type().sort_values(ascending=False)
 
-    # strip text fields
-    df["barangay"] = df["barangay"].astype(str).str.strip()
-    df["crime_type"] = df["crime_type"].astype(str).str.strip()
+    # 5b) Overall top barangays
+    top_barangays_overall = count_cube.totals_by_barangay().sort_values(ascending=False)
 
-    df = df.drop_duplicates()
+    # 5c) Top 3 crimes per calendar month (1–12)
+    top_crimes_by_month = count_cube.top_by_calendar_month(3)
 
-    df_global = df.copy()
+    phases["insights"] = time.perf_counter() - mark
+    phases["total"] = time.perf_counter() - started
+    for phase, seconds in phases.items():
+        LOAD_PHASE_SECONDS.set(seconds, phase=phase)
+    DATASET_LOADS.inc()
+    DATASET_ROWS.set(len(df) + len(incidents))
 
-    # 3) MONTHLY TOTAL CRIMES (CITY-WIDE)  -----------------
-    # group by month start, sum crime_count
-    monthly = (
-        df.set_index("date")
-          .groupby(pd.Grouper(freq="MS"))["crime_count"]
-          .sum()
-          .asfreq("MS", fill_value=0)
+    print("✅ Model trained on", len(ts), "months.")
+    print(f"   City-wide model: SARIMA{spec['order']}{spec['seasonal_order']}")
+
+    return DataSnapshot(
+        dataset_version=dataset_version,
+        model_version=compute_model_version(order_winners, 0),
+        csv_hash=csv_hash,
+        loaded_at=pd.Timestamp.now().isoformat(timespec="seconds"),
+        rows=len(df) + len(incidents),
+        ts=ts,
+        sarima_model=sarima_model,
+        global_forecast=global_forecast,
+        count_cube=count_cube,
+        top_crimes_overall=top_crimes_overall,
+        top_barangays_overall=top_barangays_overall,
+        top_crimes_by_month=top_crimes_by_month,
+        order_winners=order_winners,
+        source_version=source_version,
+        incident_offset=incident_offset,
+        incidents=len(incidents),
+        points=points,
+        spatial_index=SpatialIndex.build(points, SPATIAL_CELL_DEGREES),
+        tile_pyramid=TilePyramid.build(points, TILE_MAX_ZOOM),
+        barangay_codes=BarangayCodes.load(count_cube.barangays),
     )
 
-    ts = monthly.astype(float)
 
-    # 4) TRAIN SARIMA(0,1,1)(0,1,1)[12]  -------------------
+def incident_date_bounds(first_month: pd.Timestamp):
+    """(first, last) accepted incident day: the dataset's first month up to a month from today."""
+    return first_month, pd.Timestamp.today().normalize() + pd.DateOffset(months=1)
 
-    model = SARIMAX(
-        ts,
-        order=(0, 1, 1),
-        seasonal_order=(0, 1, 1, 12),
-        enforce_stationarity=True,
-        enforce_invertibility=True,
-    )
-    sarima_model_local = model.fit(disp=False)
 
-    # assign after training
-    global sarima_model
-    sarima_model = sarima_model_local
+def valid_incidents(records: pd.DataFrame, first_month: pd.Timestamp) -> pd.DataFrame:
+    """
+    The log records that pass the same checks as POST /incidents. A log
+    written before those checks (or edited by hand) can hold records that
+    would stretch the count cube over centuries; they are skipped on
+    replay, with a warning, instead of breaking every later build.
+    """
+    first_day, last_day = incident_date_bounds(first_month)
+    lat, lon = records["latitude"].to_numpy(), records["longitude"].to_numpy()
+    located = np.isfinite(lat) & np.isfinite(lon)
+    keep = (
+        records["date"].between(first_day, last_day).to_numpy()
+        & (records["crime_count"].to_numpy() > 0)
+        & (records["barangay"].astype(str).str.strip() != "").to_numpy()
+        & (records["crime_type"].astype(str).str.strip() != "").to_numpy()
+        & (np.isnan(lat) == np.isnan(lon))
+        & (~located | ((lat == 0) & (lon == 0)) | in_city(lat, lon))
+    )
+    if not keep.all():
+        print(f"[WARN] Skipping {int((~keep).sum())} incident log record(s) outside "
+              f"{first_day.date()}..{last_day.date()} or Davao City.")
+    return records[keep].reset_index(drop=True)
 
-    # 5) PRE-COMPUTE INSIGHTS  -----------------------------
 
-    # 5a) Overall top crimes
-    top_crimes_overall = (
-        df.groupby("crime_type")["crime_count"]
-          .sum()
-          .sort_values(ascending=False)
+def apply_incidents(snap: DataSnapshot) -> DataSnapshot:
+    """
+    `snap` with the incident log past its offset folded into the count
+    cube and the top-N tables, or `snap` itself when there is nothing
+    new. Only the new records are aggregated; the fitted city-wide model
+    picks them up on the next load (or through /ingest/monthly).
+    """
+    size, digest = incident_store.state()
+    if size <= snap.incident_offset:
+        return snap
+
+    incidents = valid_incidents(incident_store.read(snap.incident_offset, size), snap.count_cube.months[0])
+    count_cube = snap.count_cube.add(incidents)
+    points = snap.points.add(incidents)
+    rows = snap.rows + len(incidents)
+    DATASET_ROWS.set(rows)
+    return replace(
+        snap,
+        dataset_version=incident_dataset_version(snap.source_version, size, digest),
+        rows=rows,
+        count_cube=count_cube,
+        top_crimes_overall=count_cube.totals_by_crime_type().sort_values(ascending=False),
+        top_barangays_overall=count_cube.totals_by_barangay().sort_values(ascending=False),
+        top_crimes_by_month=count_cube.top_by_calendar_month(3),
+        incident_offset=size,
+        incidents=snap.incidents + len(incidents),
+        points=points,
+        spatial_index=snap.spatial_index.extend(points),
+        tile_pyramid=snap.tile_pyramid.extend(points),
+        barangay_codes=snap.barangay_codes.extend(count_cube.barangays),
     )
 
-    # 5b) Overall top barangays
-    top_barangays_overall = (
-        df.groupby("barangay")["crime_count"]
-          .sum()
-          .sort_values(ascending=False)
-    )
 
-    # 5c) Top 3 crimes per calendar month (1–12)
-    df["month"] = df["date"].dt.month
-    monthly_crime_type = (
-        df.groupby(["month", "crime_type"])["crime_count"]
-          .sum()
-          .reset_index()
-          .rename(columns={"crime_count": "total"})
-    )
+def publish_snapshot(new: DataSnapshot, reset: bool = True):
+    """
+    Swap in `new` for every request that starts from now on. A freshly
+    loaded snapshot (`reset`) drops the cached per-crime fits and the
+    ingested months, which belong to the one it replaces.
+    """
+    global snapshot
+    with snapshot_lock:
+        old, snapshot = snapshot, new
+        if reset:
+            incremental_models.clear()
+            forecast_cache.invalidate()
+    if old is None or old.dataset_version != new.dataset_version:
+        schedule_hierarchy_build()
 
-    top_crimes_by_month = (
-        monthly_crime_type
-        .sort_values(["month", "total"], ascending=[True, False])
-        .groupby("month")
-        .head(3)
-        .reset_index(drop=True)
-    )
 
-    print("✅ Model trained on", len(ts), "months.")
-    print("   Best model (fixed): SARIMA(0,1,1)(0,1,1)[12]")
+def load_and_train():
+    """Build a snapshot from the CSV and publish it."""
+    new = build_snapshot()
+    with snapshot_lock:
+        publish_snapshot(apply_incidents(new))
+
+
+def reload_dataset(reason: str) -> bool:
+    """
+    Rebuild the snapshot in the calling thread and publish it if the
+    dataset changed; requests keep being served from the old one
+    meanwhile. Returns False when a reload is already running.
+    """
+    if not reload_lock.acquire(blocking=False):
+        return False
+    try:
+        reload_status.update(state="running", reason=reason)
+        started = time.perf_counter()
+        try:
+            new = build_snapshot()
+        except Exception as e:
+            print(f"[ERROR] Reload ({reason}) failed, still serving the previous dataset: {e}")
+            reload_status.update(state="failed", last_error=str(e))
+            return True
+
+        with snapshot_lock:
+            # incident batches that arrived while the rebuild was reading the log
+            new = apply_incidents(new)
+            old = snapshot
+            unchanged = (old is not None and old.dataset_version == new.dataset_version
+                         and old.order_winners == new.order_winners)
+            if not unchanged:
+                publish_snapshot(new)
+
+        if unchanged:
+            print(f"[RELOAD] {reason}: dataset unchanged ({new.dataset_version}), keeping the current snapshot.")
+        else:
+            reload_status["reloads"] += 1
+            print(f"[RELOAD] {reason}: now serving {new.dataset_version} "
+                  f"({time.perf_counter() - started:.2f}s to rebuild).")
+            start_background_builds(new)
+        reload_status.update(state="idle", last_error=None, last_reload=pd.Timestamp.now().isoformat(timespec="seconds"))
+        return True
+    finally:
+        reload_lock.release()
 
 
 # =========================================================
 # Run training once when the API starts
 # =========================================================
-@app.on_event("startup")
-def startup_event():
+def start_background_builds(snap: DataSnapshot):
+    """The opt-in crime-type warm-up for a newly published snapshot (the hierarchy is built on publish)."""
+    if WARMUP_ENABLED:
+        threading.Thread(target=warm_up_crime_types, args=(snap,), name="sarima-warmup", daemon=True).start()
+
+
+def train_in_background():
+    """
+    load_and_train plus the opt-in warm-ups, recording how long after
+    import the data became servable. Runs on a thread in fast-start mode.
+    """
+    global dataset_watcher
+    startup_state["status"] = "loading"
+    started = time.perf_counter()
     try:
         load_and_train()
     except Exception as e:
         print("[ERROR] Error during startup training:", e)
+        startup_state.update(status="failed", error=str(e))
+        return
+
+    cold_start["training_seconds"] = time.perf_counter() - started
+    cold_start["data_ready_seconds"] = time.perf_counter() - IMPORT_STARTED
+    startup_state["status"] = "ready"
+    for milestone, seconds in cold_start.items():
+        COLD_START_SECONDS.set(seconds, milestone=milestone.removesuffix("_seconds"))
+    print(f"[STARTUP] Import {cold_start['import_seconds']:.2f}s, live {cold_start['live_seconds']:.2f}s, "
+          f"data ready {cold_start['data_ready_seconds']:.2f}s after start.")
+
+    start_background_builds(snapshot)
+    if RELOAD_POLL_SECONDS > 0:
+        dataset_watcher = FileWatcher(
+            DEFAULT_CSV_PATH, RELOAD_POLL_SECONDS, lambda: reload_dataset("file changed")
+        ).start()
+
+
+@app.on_event("startup")
+def startup_event():
+    cold_start["live_seconds"] = time.perf_counter() - IMPORT_STARTED
+    if FAST_START:
+        threading.Thread(target=train_in_background, name="sarima-startup", daemon=True).start()
+    else:
+        train_in_background()
+
+
+@app.on_event("shutdown")
+def shutdown_event():
+    if dataset_watcher is not None:
+        dataset_watcher.stop()
+    if fit_pool is not None:
+        fit_pool.shutdown(wait=False, cancel_futures=True)
+
+
+# =========================================================
+# Fast start
+# =========================================================
+@app.middleware("http")
+async def hold_until_loaded(request: Request, call_next):
+    """While background training runs, data routes get 503 + Retry-After instead of "Data not loaded"."""
+    if startup_state["status"] in ("starting", "loading") and request.url.path not in LIVENESS_ROUTES:
+        return JSONResponse(
+            status_code=503,
+            headers={"Retry-After": "5"},
+            content={"detail": "Model is still loading; poll /ready.", "startup": startup_state["status"]},
+        )
+    return await call_next(request)
+
+
+# =========================================================
+# Conditional GET
+# =========================================================
+@app.middleware("http")
+async def conditional_get(request: Request, call_next):
+    """
+    ETag = dataset version + model version on the versioned GET routes.
+    A matching If-None-Match gets a 304 before the route (and the model)
+    is touched; clients holding the last body can revalidate cheaply.
+    The ETag is weak (W/): identity, gzip and br bodies of a response
+    share it, being the same content in different encodings.
+    """
+    snap = snapshot
+    if snap is None or request.method != "GET" or versioned_route(request.url.path) is None:
+        return await call_next(request)
+
+    etag = snap.etag
+    suffix = ETAG_SUFFIXES.get(negotiate(request.headers.get("accept")))
+    if suffix:
+        # MessagePack / Arrow bodies are other representations of the same URL
+        etag = f'{etag[:-1]}-{suffix}"'
+
+    headers = {"ETag": "W/" + etag, "Cache-Control": f"public, max-age={HTTP_MAX_AGE}, must-revalidate"}
+    if_none_match = request.headers.get("if-none-match", "")
+    # weak comparison, as If-None-Match calls for
+    if if_none_match.strip() == "*" or etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers={**headers, "Vary": "Accept, Accept-Encoding"})
+
+    response = await call_next(request)
+    if response.status_code == 200:
+        if "etag" in response.headers:
+            headers.pop("ETag")        # the route tagged an older build itself
+        response.headers.update(headers)
+    return response
+
+
+# =========================================================
+# Compression
+# =========================================================
+# gzip for bodies of SARIMA_COMPRESS_MIN_BYTES or more (brotli bodies from
+# encoded_response already carry Content-Encoding and pass through, which
+# Starlette's GZipMiddleware does from 0.22; requirements.txt pins above it);
+# inside time_requests so the timings include it
+app.add_middleware(GZipMiddleware, minimum_size=COMPRESS_MIN_BYTES)
+
+
+# =========================================================
+# Request timing
+# =========================================================
+@app.middleware("http")
+async def time_requests(request: Request, call_next):
+    """Latency per route template (not raw path, so crime types don't explode the label set)."""
+    if not METRICS_ENABLED:
+        return await call_next(request)
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # 304s from conditional_get never reach the router
+        route = getattr(request.scope.get("route"), "path", None)
+        if route is None:
+            route = versioned_route(request.url.path) or "unmatched"
+        REQUEST_SECONDS.observe(time.perf_counter() - started, method=request.method, route=route, status=status)
 
 
 # =========================================================
@@ -211,188 +1058,311 @@ def startup_event():
 # =========================================================
 @app.get("/", tags=["health"])
 def health_check():
+    """Liveness: answers as soon as the process serves, even while the model is loading."""
     return {"status": "ok", "message": "SARIMA API is running."}
 
 
+@app.get("/ready", tags=["health"])
+def readiness_check():
+    """
+    Readiness: 503 until the data is loaded and (with SARIMA_WARMUP=1)
+    every crime-type model has been fitted / (with
+    SARIMA_HIERARCHY_PREBUILD=1) the first hierarchy is built, so a load
+    balancer can hold traffic. Rebuilds after new data keep it ready.
+    Also reports the cold-start timings.
+    """
+    snap = snapshot
+    loaded = snap is not None
+    warming = WARMUP_ENABLED and (not warmup_status or "pending" in warmup_status.values())
+    ready = loaded and not warming and (not HIERARCHY_PREBUILD or hierarchy_ready())
+    built = hierarchy_forecast
+
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "status": "ready" if ready else "starting",
+            "data_loaded": loaded,
+            "warmup_enabled": WARMUP_ENABLED,
+            "series": dict(warmup_status),
+            "hierarchy_ready": hierarchy_ready(),
+            "hierarchy_current": loaded and built is not None and built[0] == snap.dataset_version,
+            "hierarchy_building": hierarchy_building,
+            "hierarchy_error": hierarchy_failure["error"] if hierarchy_failure else None,
+            "snapshot": snap.summary() if snap is not None else None,
+            "reload": dict(reload_status),
+            "startup": startup_state["status"],
+            "startup_error": startup_state["error"],
+            "cold_start": {k: round(v, 3) for k, v in cold_start.items()},
+        },
+    )
+
+
+def get_crime_type_forecast(crime_type: str, snap: DataSnapshot):
+    """
+    Return the long (MAX_HORIZON) forecast for one crime type, fitting
+    it only when the cache has no entry for the snapshot's dataset version.
+    """
+    key = (normalize_crime_type(crime_type), snap.dataset_version)
+
+    if key[0] in incremental_models:
+        return incremental_models[key[0]].forecast
+
+    cached = forecast_cache.get(key)
+    if cached is not None:
+        return cached
+
+    # FILTERED (Specific Crime)
+    # Fitted off the request thread; concurrent requests for the same
+    # crime type wait on the same fit. An empty series falls through to
+    # a zero forecast so the UI doesn't break.
+    try:
+        return submit_crime_type_fit(key[0], snap).result()
+    except BrokenProcessPool as e:
+        print(f"[ERROR] Fit pool broken, fitting {key[0]} in-process: {e}")
+        reset_fit_pool()
+    return fit_crime_type_in_process(key[0], snap)
+
+
+def fit_crime_type_in_process(name: str, snap: DataSnapshot):
+    """Fit one crime type on the calling thread (when the pool has died)."""
+    target_ts = snap.count_cube.series(crime_type=name)
+    spec = series_spec(name, snap.order_winners)
+    params = stored_params(name, target_ts, spec, snap.order_winners, get_artifact_store(spec))
+    result = forecast_series(target_ts, MAX_HORIZON, name, params, **spec)
+    record_forecast(name, result)
+    persist_fit(name, target_ts, result, spec, snap.csv_hash)
+    forecast_cache.put((name, snap.dataset_version), result)
+    return result
+
+
+def get_crime_type_forecasts(names: List[str], snap: DataSnapshot) -> dict:
+    """
+    Forecasts for many crime types at once. Cached fits are reused and
+    the misses are fitted in parallel on the process pool.
+    """
+    version = snap.dataset_version
+    results = {}
+    missing = []
+    for name in names:
+        if name in incremental_models:
+            results[name] = incremental_models[name].forecast
+            continue
+        cached = forecast_cache.get((name, version))
+        if cached is not None:
+            results[name] = cached
+        else:
+            missing.append(name)
+
+    # A worker dying breaks the whole pool, so every fit still pending
+    # fails with it; those are redone in-process like the single route.
+    broken = []
+    futures = {}
+    for name in missing:
+        try:
+            futures[submit_crime_type_fit(name, snap)] = name
+        except BrokenProcessPool:
+            broken.append(name)
+    for future in as_completed(futures):
+        try:
+            results[futures[future]] = future.result()
+        except BrokenProcessPool:
+            broken.append(futures[future])
+
+    if broken:
+        print(f"[ERROR] Fit pool broken, fitting {len(broken)} crime types in-process")
+        reset_fit_pool()
+        for name in broken:
+            results[name] = fit_crime_type_in_process(name, snap)
+
+    return results
+
+
+def to_columns(result, horizon: int) -> dict:
+    """SeriesForecastColumns fields of a forecast's first `horizon` months."""
+    return {
+        "method": result.method,
+        "dates": list(result.dates[:horizon]),
+        "forecast": list(result.forecast[:horizon]),
+        "lower_ci": list(result.lower_ci[:horizon]),
+        "upper_ci": list(result.upper_ci[:horizon]),
+    }
+
+
+def forecast_payload(result, horizon: int, layout: str) -> tuple:
+    """(data in `layout`, columnar table for Arrow) of a forecast's first `horizon` months."""
+    columns = (result.dates[:horizon], result.forecast[:horizon], result.lower_ci[:horizon], result.upper_ci[:horizon])
+    table = forecast_columns(*columns)
+    return (table if layout == "columns" else forecast_rows(*columns)), table
+
+
 # ---------- 1) FORECAST TOTAL CRIMES (MONTHLY) ----------
 @app.get("/forecast", response_model=ForecastResponse, tags=["forecast"])
-def get_forecast(horizon: int = 12, crime_type: str = None):
+def get_forecast(http_request: Request, horizon: int = 12, crime_type: str = None, layout: str = "rows"):
     """
     Get next N months crime forecast.
     If crime_type is provided, forecasts for that specific crime.
     Otherwise, forecasts city-wide total.
     Default horizon = 12 months.
+    layout=columns returns data as {"date": [...], "forecast": [...], ...};
+    Accept: application/msgpack or application/vnd.apache.arrow.stream
+    switch the encoding (when those packages are installed).
+    Example: /forecast?horizon=24&crime_type=THEFT&layout=columns
     """
-    global ts, sarima_model, df_global
-
-    if df_global is None:
-        raise HTTPException(status_code=500, detail="Data not loaded.")
+    snap = current_snapshot()
 
-    # Select Time Series
-    target_ts = None
-    model_to_use = None
+    if horizon <= 0 or horizon > MAX_HORIZON:
+        raise HTTPException(status_code=400, detail=f"horizon must be between 1 and {MAX_HORIZON} months.")
+    check_layout(layout)
 
     if not crime_type:
         # GLOBAL (City-wide)
-        if ts is None or sarima_model is None:
-             raise HTTPException(status_code=500, detail="Global model not trained.")
-        target_ts = ts
-        model_to_use = sarima_model
+        result = snap.global_forecast
     else:
-        # FILTERED (Specific Crime)
-        # Filter logic similar to load_and_train 
-        # (case-insensitive match might be safer, but frontend sends exact UPPERCASE)
-        subset = df_global[df_global["crime_type"].str.upper() == crime_type.upper()]
-        
-        if subset.empty:
-             # Return empty forecast or error? Error is better to indicate no data.
-             # Alternatively, return 0s if we want to be nice.
-             # Let's return 0s if no data found to avoid breaking UI.
-             pass 
-        
-        # Create monthly series
-        monthly = (
-            subset.set_index("date")
-            .groupby(pd.Grouper(freq="MS"))["crime_count"]
-            .sum()
-            .asfreq("MS", fill_value=0)
-        )
-        target_ts = monthly.astype(float)
-
-        # Basic check: do we have enough data?
-        if len(target_ts) < 6:
-             # Not enough data to forecast properly. Return 0s
-             # We create a dummy model result or just manual 0s?
-             # Manual 0s is easier.
-             model_to_use = None
-        else:
-            # TRAIN ON THE FLY
-            try:
-                # Use simple order for speed/stability on small data
-                temp_model = SARIMAX(
-                    target_ts,
-                    order=(0, 1, 1),
-                    seasonal_order=(0, 1, 1, 12),
-                    enforce_stationarity=False,
-                    enforce_invertibility=False
-                )
-                model_to_use = temp_model.fit(disp=False)
-            except Exception as e:
-                print(f"[ERROR] Training failed for {crime_type}: {e}")
-                model_to_use = None
-
-    if horizon <= 0 or horizon > 60:
-        raise HTTPException(status_code=400, detail="horizon must be between 1 and 60 months.")
-
-    # Generate Forecast
-    items: List[ForecastItem] = []
-    
-    # Future dates
-    last_date = target_ts.index[-1] if target_ts is not None and not target_ts.empty else pd.Timestamp.now()
-    future_dates = pd.date_range(
-        start=last_date + pd.DateOffset(months=1),
-        periods=horizon,
-        freq="MS",
-    )
+        result = get_crime_type_forecast(crime_type, snap)
 
-    if model_to_use:
-        try:
-            forecast_res = model_to_use.get_forecast(steps=horizon)
-            mean = forecast_res.predicted_mean
-            ci = forecast_res.conf_int()
-            
-            # Heuristic clamping: 
-            # Limit Upper CI to be relative to the forecast value to prevent "box" look.
-            # We allow it to go up to Forecast + MaxHistorical.
-            max_hist = float(target_ts.max()) if target_ts is not None and not target_ts.empty else 10.0
-            
-            for i in range(horizon):
-                val = float(mean.iloc[i]) if i < len(mean) else 0.0
-                lower = float(ci.iloc[i, 0]) if i < len(ci) else 0.0
-                upper = float(ci.iloc[i, 1]) if i < len(ci) else 0.0
-                
-                # Clip negative values
-                val = max(0.0, val)
-                lower = max(0.0, lower)
-                upper = max(0.0, upper)
-                
-                # Dynamic Clamp: Forecast + MaxHistorical
-                # This ensures the error bar is proportional to the scale of data
-                dynamic_limit = val + max_hist
-                if upper > dynamic_limit:
-                     upper = dynamic_limit
-
-                items.append(
-                    ForecastItem(
-                        date=str(future_dates[i].date()),
-                        forecast=val,
-                        lower_ci=lower,
-                        upper_ci=upper,
-                    )
-                )
-        except Exception as e:
-            print(f"[ERROR] Forecast generation failed: {e}")
-            # Fallback to 0s
-            for i in range(horizon):
-                items.append(ForecastItem(date=str(future_dates[i].date()), forecast=0.0, lower_ci=0.0, upper_ci=0.0))
+    data, table = forecast_payload(result, horizon, layout)
+    return encoded_response(http_request, {"status": "success", "horizon": horizon, "data": data}, table)
 
+
+# ---------- 1b) BATCH FORECAST (MANY CRIME TYPES) ------
+@app.post("/forecast/batch", response_model=BatchForecastResponse, tags=["forecast"])
+def get_forecast_batch(request: BatchForecastRequest, http_request: Request):
+    """
+    Forecast several crime types (or "all") in one call, up to `horizon`
+    months. Shorter horizons are prefixes of the returned columns.
+    Accept: application/msgpack, or application/vnd.apache.arrow.stream for
+    one long table (series, date, forecast, lower_ci, upper_ci, method).
+    Example body: {"crime_types": "all", "horizon": 24}
+    """
+    snap = current_snapshot()
+
+    horizon = request.horizon
+    if horizon <= 0 or horizon > MAX_HORIZON:
+        raise HTTPException(status_code=400, detail=f"horizon must be between 1 and {MAX_HORIZON} months.")
+
+    if isinstance(request.crime_types, str):
+        if request.crime_types.lower() != "all":
+            raise HTTPException(status_code=400, detail='crime_types must be a list or "all".')
+        names = snap.count_cube.crime_type_names
     else:
-        # Fallback for insufficient data or failed training
-        # Use historical statistics instead of zeros
-        if target_ts is not None and not target_ts.empty and len(target_ts) > 0:
-            # Calculate historical mean and std
-            hist_mean = float(target_ts.mean())
-            hist_std = float(target_ts.std()) if len(target_ts) > 1 else hist_mean * 0.3
-            
-            # Use mean as forecast, with reasonable confidence intervals
-            for i in range(horizon):
-                # Slight decay over time (assume mean reverts)
-                decay_factor = 0.95 ** i  # 5% decay per month
-                forecast_val = hist_mean * decay_factor
-                
-                # CI based on historical variability
-                lower_val = max(0.0, forecast_val - hist_std)
-                upper_val = forecast_val + hist_std
-                
-                items.append(
-                    ForecastItem(
-                        date=str(future_dates[i].date()),
-                        forecast=forecast_val,
-                        lower_ci=lower_val,
-                        upper_ci=upper_val,
-                    )
-                )
-        else:
-            # Truly no data - return zeros
-            for i in range(horizon):
-                items.append(
-                    ForecastItem(
-                        date=str(future_dates[i].date()),
-                        forecast=0.0,
-                        lower_ci=0.0,
-                        upper_ci=0.0,
-                    )
-                )
+        names = list(dict.fromkeys(normalize_crime_type(c) for c in request.crime_types if c))
+
+    results = get_crime_type_forecasts(names, snap)
+
+    series = {name: to_columns(results[name], horizon) for name in names}
+    total = to_columns(snap.global_forecast, horizon) if request.include_total else None
+    payload = {
+        "status": "success",
+        "horizon": horizon,
+        "dataset_version": snap.dataset_version,
+        "total": total,
+        "series": series,
+    }
+
+    table = {"series": [], "date": [], "forecast": [], "lower_ci": [], "upper_ci": [], "method": []}
+    for name, columns in ([(TOTAL_SERIES, total)] if total else []) + list(series.items()):
+        table["series"] += [name] * len(columns["dates"])
+        table["date"] += columns["dates"]
+        table["forecast"] += columns["forecast"]
+        table["lower_ci"] += columns["lower_ci"]
+        table["upper_ci"] += columns["upper_ci"]
+        table["method"] += [columns["method"]] * len(columns["dates"])
+    return encoded_response(http_request, payload, table)
+
+
+# ---------- 1c) HIERARCHICAL FORECAST ------------------
+@app.get("/forecast/hierarchy", response_model=HierarchyForecastResponse, tags=["forecast"])
+def get_hierarchy_forecast(http_request: Request, level: str = "city", name: str = None, crime_type: str = None,
+                           horizon: int = 12, layout: str = "rows"):
+    """
+    Reconciled forecast for one node of the barangay -> station -> city
+    tree, optionally for one crime type. Children always add up to their
+    parent. Served from results precomputed in the background; while a
+    rebuild for new data runs the previous build is served (its ETag
+    says which dataset version it is for), 503 before the first build.
+    layout and Accept work as for /forecast.
+    Example: /forecast/hierarchy?level=station&name=PS18&crime_type=ROBBERY&horizon=12
+    """
+    snap = current_snapshot()
+
+    if horizon <= 0 or horizon > MAX_HORIZON:
+        raise HTTPException(status_code=400, detail=f"horizon must be between 1 and {MAX_HORIZON} months.")
+    check_layout(layout)
+
+    if level not in LEVELS:
+        raise HTTPException(status_code=400, detail=f"level must be one of {', '.join(LEVELS)}.")
+    if level != "city" and not name:
+        raise HTTPException(status_code=400, detail=f"name is required for level={level}.")
+
+    built_version, hierarchy = get_hierarchy(snap)
+    result = hierarchy.get(level, name, crime_type)
+    if result is None:
+        raise HTTPException(status_code=404, detail="No crime history for that node.")
+
+    data, table = forecast_payload(result, horizon, layout)
+    payload = {
+        "status": "success",
+        "level": level,
+        "name": name if level != "city" else None,
+        "crime_type": crime_type,
+        "horizon": horizon,
+        "method": result.method,
+        "data": data,
+    }
+    response = encoded_response(http_request, payload, table)
+    if built_version != snap.dataset_version:
+        # an older build: tag it with its own version so it is never cached as the current one
+        response.headers["ETag"] = f'W/"{built_version}-{snap.model_version}"'
+    return response
+
 
-    return ForecastResponse(status="success", horizon=horizon, data=items)
+@app.get("/hierarchy/stations", tags=["forecast"])
+def get_hierarchy_stations():
+    """
+    Police stations and the barangays rolled up into each (from the
+    STATION column of LIST OF BARANGAYS 2024.csv), read from the code
+    table; does not wait for the hierarchical forecasts.
+    Example: /hierarchy/stations
+    """
+    snap = current_snapshot()
+    codes = snap.barangay_codes
+    stations = {}
+    for name, station in zip(codes.raw_names, codes.station_codes):
+        stations.setdefault(codes.stations[station], []).append(name)
+    summary = {"stations": len(stations), "barangays": sum(len(names) for names in stations.values())}
+    built = hierarchy_forecast
+    if built is not None and built[0] == snap.dataset_version:
+        summary.update(built[1].stats())
+    data = {station: stations[station] for station in sorted(stations, key=station_sort_key)}
+    return {"status": "success", "data": data, "summary": summary}
 
 
 # ---------- 2) TOP CRIMES OVERALL -----------------------
 @app.get("/top-crimes", response_model=TopCrimesResponse, tags=["insights"])
-def get_top_crimes(top_n: int = 10):
+def get_top_crimes(top_n: int = 10, start: str = None, end: str = None,
+                   barangay: str = None, crime_type: str = None):
     """
     Return top N crime types based on 5-year historical data.
-    Example: /top-crimes?top_n=5
+    Optional start/end (inclusive months), barangay and crime_type filters.
+    Example: /top-crimes?top_n=5&start=2024-01&end=2024-06&barangay=BAGO APLAYA
     """
-    global top_crimes_overall
-
-    if top_crimes_overall is None:
+    snap = snapshot
+    if snap is None:
         raise HTTPException(status_code=500, detail="Top crimes not available (model not initialized).")
+    count_cube = snap.count_cube
 
     if top_n <= 0:
         raise HTTPException(status_code=400, detail="top_n must be positive.")
 
-    series = top_crimes_overall.head(top_n)
+    if start or end or barangay or crime_type:
+        totals = count_cube.totals_by_crime_type(parse_month(start, "start"), parse_month(end, "end"), barangay)
+        if crime_type:
+            totals = totals.iloc[count_cube.crime_positions(crime_type)]
+        totals = totals[totals > 0].sort_values(ascending=False)
+    else:
+        totals = snap.top_crimes_overall
+
+    series = totals.head(top_n)
 
     data = [
         TopCrimeItem(crime_type=str(idx), total=int(val))
@@ -404,20 +1374,30 @@ def get_top_crimes(top_n: int = 10):
 
 # ---------- 3) TOP BARANGAYS (PINAKAMADAMING KRIMEN) ---
 @app.get("/top-barangays", response_model=TopBarangaysResponse, tags=["insights"])
-def get_top_barangays(top_n: int = 10):
+def get_top_barangays(top_n: int = 10, start: str = None, end: str = None,
+                      barangay: str = None, crime_type: str = None):
     """
     Return top N barangays with highest crime totals.
-    Example: /top-barangays?top_n=10
+    Optional start/end (inclusive months), barangay and crime_type filters.
+    Example: /top-barangays?top_n=10&start=2024-01&crime_type=ROBBERY
     """
-    global top_barangays_overall
-
-    if top_barangays_overall is None:
+    snap = snapshot
+    if snap is None:
         raise HTTPException(status_code=500, detail="Top barangays not available (model not initialized).")
+    count_cube = snap.count_cube
 
     if top_n <= 0:
         raise HTTPException(status_code=400, detail="top_n must be positive.")
 
-    series = top_barangays_overall.head(top_n)
+    if start or end or barangay or crime_type:
+        totals = count_cube.totals_by_barangay(parse_month(start, "start"), parse_month(end, "end"), crime_type)
+        if barangay:
+            totals = totals.iloc[count_cube.barangay_positions(barangay)]
+        totals = totals[totals > 0].sort_values(ascending=False)
+    else:
+        totals = snap.top_barangays_overall
+
+    series = totals.head(top_n)
 
     data = [
         TopBarangayItem(barangay=str(idx), total=int(val))
@@ -434,10 +1414,10 @@ def get_possible_crimes_for_month(date: str):
     Given a date, return the top 3 historical crimes for that calendar month.
     Example: /possible-crimes?date=2025-03-01
     """
-    global top_crimes_by_month
-
-    if top_crimes_by_month is None:
+    snap = snapshot
+    if snap is None:
         raise HTTPException(status_code=500, detail="Top crimes by month not available (model not initialized).")
+    top_crimes_by_month = snap.top_crimes_by_month
 
     # parse date
     try:
@@ -452,11 +1432,8 @@ def get_possible_crimes_for_month(date: str):
         raise HTTPException(status_code=404, detail="No crime history for that month.")
 
     data = [
-        PossibleCrimeItem(
-            crime_type=row["crime_type"],
-            total_5years=int(row["total"])
-        )
-        for _, row in sub.iterrows()
+        PossibleCrimeItem(crime_type=crime, total_5years=int(total))
+        for crime, total in zip(sub["crime_type"].tolist(), sub["total"].tolist())
     ]
 
     return PossibleCrimesResponse(
@@ -465,6 +1442,607 @@ def get_possible_crimes_for_month(date: str):
         month_name=month_name_from_int(m),
         data=data
     )
+
+
+# ---------- 4b) CRIME / BARANGAY STATISTICS ------------
+def stats_month_bounds(count_cube: CountCube, month: str = None, year: str = None):
+    """
+    Cube month range for the admin's ?month=YYYY-MM / ?year=YYYY filters
+    (both given = their intersection). 400 on malformed values.
+    """
+    if month and not re.fullmatch(r"\d{4}-\d{2}", month):
+        raise HTTPException(status_code=400, detail="month must be YYYY-MM.")
+    if year and not re.fullmatch(r"\d{4}", year):
+        raise HTTPException(status_code=400, detail="year must be YYYY.")
+
+    lo, hi = 0, len(count_cube.months)
+    if month:
+        m_lo, m_hi = count_cube.month_bounds(month + "-01", month + "-01")
+        lo, hi = max(lo, m_lo), min(hi, m_hi)
+    if year:
+        y_lo, y_hi = count_cube.month_bounds(year + "-01-01", year + "-12-01")
+        lo, hi = max(lo, y_lo), min(hi, y_hi)
+    return lo, max(lo, hi)
+
+
+def ranked(totals: np.ndarray, labels: List[str]) -> List[tuple]:
+    """(label, total) pairs with a positive total, largest first (stable on ties)."""
+    order = np.argsort(-totals, kind="stable")
+    return [(labels[i], float(totals[i])) for i in order if totals[i] > 0]
+
+
+@app.get("/stats", response_model=CrimeStatsResponse, tags=["insights"])
+def get_crime_stats(month: str = None, year: str = None):
+    """
+    Monthly totals, top 15 crime types, top 10 locations and an overview,
+    in the shape StatisticsController::_getCrimeStats returns.
+    Example: /stats?year=2024 or /stats?month=2024-03
+    """
+    count_cube = current_snapshot().count_cube
+    lo, hi = stats_month_bounds(count_cube, month, year)
+    totals = count_cube.cum[hi] - count_cube.cum[lo]
+
+    monthly = [
+        MonthlyStatItem(year=d.year, month=d.month, count=float(count_cube.month_totals[i]))
+        for i, d in enumerate(count_cube.months[lo:hi], start=lo)
+        if count_cube.month_totals[i] > 0
+    ]
+    # same ordering as the admin's ->sortBy('year')->sortBy('month')
+    monthly.sort(key=lambda item: (item.month, item.year))
+
+    this_month = monthly[-1].count if monthly else 0.0
+    percent_change = 0.0
+    if len(monthly) >= 2 and monthly[-2].count > 0:
+        percent_change = round((this_month - monthly[-2].count) / monthly[-2].count * 100, 2)
+
+    by_type = ranked(totals.sum(axis=1), count_cube.crime_types)[:15]
+    by_location = ranked(totals.sum(axis=0), count_cube.barangays)[:10]
+
+    data = CrimeStatsData(
+        monthly=monthly,
+        byType=[TypeStatItem(type=t, count=c) for t, c in by_type],
+        byStatus=[],
+        byLocation=[LocationStatItem(location=l, count=c) for l, c in by_location],
+        overview=StatsOverview(
+            total=float(totals.sum()),
+            thisMonth=this_month,
+            lastMonth=0.0,
+            percentChange=percent_change,
+        ),
+    )
+    return CrimeStatsResponse(status="success", data=data, filter={"month": month, "year": year})
+
+
+@app.get("/barangay-stats", response_model=BarangayStatsResponse, tags=["insights"])
+def get_barangay_stats(month: str = None, year: str = None):
+    """
+    Crime totals for every barangay, largest first, in the shape
+    StatisticsController::_getBarangayStats returns.
+    Example: /barangay-stats?month=2024-03
+    """
+    count_cube = current_snapshot().count_cube
+    lo, hi = stats_month_bounds(count_cube, month, year)
+    by_barangay = ranked((count_cube.cum[hi] - count_cube.cum[lo]).sum(axis=0), count_cube.barangays)
+
+    return BarangayStatsResponse(
+        status="success",
+        data=[BarangayStatItem(barangay=b, total_crimes=c) for b, c in by_barangay],
+        total_barangays=len(by_barangay),
+        total_crimes=float(sum(c for _, c in by_barangay)),
+        filter={"month": month, "year": year},
+    )
+
+
+def barangay_code_totals(snap: DataSnapshot, month: str = None, year: str = None, crime_type: str = None):
+    """
+    (codes, totals per canonical barangay) for the stats filters: the
+    cube's per-spelling totals summed by canonical id in one bincount.
+    """
+    count_cube, codes = snap.count_cube, snap.barangay_codes
+    lo, hi = stats_month_bounds(count_cube, month, year)
+    totals = (count_cube.cum[hi] - count_cube.cum[lo])[count_cube.crime_positions(crime_type), :].sum(axis=0)
+    return codes, np.bincount(codes.canonical[:len(count_cube.barangays)], weights=totals, minlength=len(codes))
+
+
+@app.get("/station-stats", tags=["insights"])
+def get_station_stats(month: str = None, year: str = None, crime_type: str = None):
+    """
+    Crime totals per police station (PS1..PS20, then UNASSIGNED), with
+    every barangay spelling rolled up to its canonical barangay first.
+    Example: /station-stats?year=2024&crime_type=Theft
+    """
+    codes, by_barangay = barangay_code_totals(current_snapshot(), month, year, crime_type)
+    by_station = np.bincount(codes.station_of, weights=by_barangay, minlength=len(codes.stations))
+    reporting = np.bincount(codes.station_of, weights=by_barangay > 0, minlength=len(codes.stations))
+
+    return {
+        "status": "success",
+        "data": [
+            {"station": station, "total_crimes": float(total), "barangays": int(n)}
+            for station, total, n in sorted(zip(codes.stations, by_station.tolist(), reporting.tolist()),
+                                            key=lambda row: station_sort_key(row[0]))
+        ],
+        "total_crimes": float(by_station.sum()),
+        "filter": {"month": month, "year": year, "crime_type": crime_type},
+    }
+
+
+@app.get("/barangays", tags=["insights"])
+def get_barangays(month: str = None, year: str = None, crime_type: str = None, station: str = None):
+    """
+    The canonical barangay table: id, name, police station, the crime-data
+    spellings resolved to it (and how) and its crime total for the filters.
+    Unlisted barangays (no row in the barangay list) come after the listed ones.
+    Example: /barangays?station=PS3&year=2024
+    """
+    codes, by_barangay = barangay_code_totals(current_snapshot(), month, year, crime_type)
+    spellings = {}
+    for raw, cid, method in zip(codes.raw_names, codes.canonical.tolist(), codes.methods):
+        spellings.setdefault(cid, []).append({"name": raw, "match": method})
+
+    wanted = str(station).strip().upper() if station else None
+    data = [
+        {
+            "id": cid,
+            "barangay": codes.names[cid],
+            "station": codes.stations[code],
+            "total_crimes": float(by_barangay[cid]),
+            "spellings": spellings.get(cid, []),
+        }
+        for cid, code in enumerate(codes.station_of.tolist())
+        if wanted is None or codes.stations[code] == wanted
+    ]
+    return {
+        "status": "success",
+        "data": data,
+        "total_barangays": len(data),
+        "total_crimes": float(sum(item["total_crimes"] for item in data)),
+        "filter": {"month": month, "year": year, "crime_type": crime_type, "station": station},
+    }
+
+
+# ---------- 4c) HOTSPOTS -------------------------------
+@app.get("/hotspots", tags=["insights"])
+def get_hotspots(start: str = None, end: str = None, crime_type: str = None, method: str = "grid",
+                 cell: float = DEFAULT_CELL_DEGREES, bandwidth: float = 1.5, format: str = "geojson",
+                 min_share: float = 0.0):
+    """
+    Crime intensity from the incident coordinates on a city-wide lon/lat
+    grid of `cell` degrees: counts per cell (method=grid) or a Gaussian
+    kernel density of `bandwidth` cells (method=kde). Optional start/end
+    (YYYY-MM or YYYY-MM-DD, inclusive) and crime_type filters; cells below
+    min_share of the peak are left out. format=geojson returns a
+    FeatureCollection of cell polygons, format=grid [row, col, intensity]
+    triples. Each filter is computed once per dataset version.
+    Example: /hotspots?method=kde&crime_type=ROBBERY&start=2024-01&format=grid
+    """
+    snap = current_snapshot()
+
+    if method not in HOTSPOT_METHODS:
+        raise HTTPException(status_code=400, detail=f"method must be one of {', '.join(HOTSPOT_METHODS)}.")
+    if format not in HOTSPOT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(HOTSPOT_FORMATS)}.")
+    if not 0.001 <= cell <= 0.05:
+        raise HTTPException(status_code=400, detail="cell must be between 0.001 and 0.05 degrees.")
+    if not 0 < bandwidth <= 10:
+        raise HTTPException(status_code=400, detail="bandwidth must be between 0 and 10 cells.")
+    if not 0 <= min_share < 1:
+        raise HTTPException(status_code=400, detail="min_share must be in [0, 1).")
+
+    start_ts, end_ts = parse_day_range(start, end)
+    key = (snap.dataset_version, start_ts, end_ts, normalize_crime_type(crime_type) if crime_type else None,
+           method, cell, bandwidth if method == "kde" else None, format, min_share)
+    body = hotspot_cache.get(key)
+    if body is None:
+        try:
+            grid = HotspotGrid.build(snap.points, snap.points.select(start_ts, end_ts, crime_type),
+                                     cell=cell, method=method, bandwidth=bandwidth)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if format == "geojson":
+            payload = grid.to_geojson(min_share)
+        else:
+            payload = {"status": "success", "method": method, **grid.to_grid(min_share)}
+        body = JSONResponse(payload).body
+        hotspot_cache.put(key, body)
+
+    media_type = "application/geo+json" if format == "geojson" else "application/json"
+    return Response(content=body, media_type=media_type)
+
+
+# ---------- 4d) INCIDENTS NEAR A POINT -----------------
+@app.get("/nearby", tags=["insights"])
+def get_nearby(lat: float = None, lon: float = None, radius: float = None, k: int = None,
+               bbox: str = None, start: str = None, end: str = None, crime_type: str = None,
+               limit: int = 100):
+    """
+    Incidents around a point from the spatial index: within `radius`
+    meters of lat/lon (nearest first), the `k` nearest to lat/lon, or
+    inside bbox=west,south,east,north. Optional start/end (inclusive)
+    and crime_type filters; at most `limit` incidents are listed, `total`
+    counts every match.
+    Example: /nearby?lat=7.0731&lon=125.6128&radius=1000&crime_type=ROBBERY
+    """
+    snap = current_snapshot()
+    index = snap.spatial_index
+
+    if not 0 < limit <= NEARBY_MAX_RESULTS:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {NEARBY_MAX_RESULTS}.")
+    if bbox is None:
+        if lat is None or lon is None:
+            raise HTTPException(status_code=400, detail="lat and lon are required unless bbox is given.")
+        if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+            raise HTTPException(status_code=400, detail="lat/lon out of range.")
+        if (radius is None) == (k is None):
+            raise HTTPException(status_code=400, detail="Give exactly one of radius or k.")
+        if radius is not None and not 0 < radius <= 50000:
+            raise HTTPException(status_code=400, detail="radius must be between 0 and 50000 meters.")
+        if k is not None and not 0 < k <= NEARBY_MAX_RESULTS:
+            raise HTTPException(status_code=400, detail=f"k must be between 1 and {NEARBY_MAX_RESULTS}.")
+
+    start_ts, end_ts = parse_day_range(start, end)
+    filtered = start_ts is not None or end_ts is not None or bool(crime_type)
+
+    def match(positions):
+        return snap.points.select(start_ts, end_ts, crime_type, positions=positions)
+
+    started = time.perf_counter()
+    distances = None
+    if bbox is not None:
+        try:
+            west, south, east, north = (float(v) for v in bbox.split(","))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="bbox must be west,south,east,north.")
+        if not (west < east and south < north and east - west <= 1 and north - south <= 1):
+            raise HTTPException(status_code=400, detail="bbox must be non-empty and at most 1 degree across.")
+        positions = index.in_box(south, west, north, east)
+        if filtered:
+            positions = positions[match(positions)]
+        positions = np.sort(positions)
+        mode = "bbox"
+    elif radius is not None:
+        positions, distances = index.within(lat, lon, radius)
+        if filtered:
+            keep = match(positions)
+            positions, distances = positions[keep], distances[keep]
+        mode = "radius"
+    else:
+        positions, distances = index.nearest(lat, lon, k, match if filtered else None)
+        mode = "knn"
+    took_ms = (time.perf_counter() - started) * 1000
+
+    points = snap.points
+    shown = positions[:limit]
+    data = [
+        {
+            "date": str(points.days[i]),
+            "crime_type": points.crime_types[points.crime_codes[i]],
+            "count": int(points.counts[i]),
+            "latitude": round(float(points.lat[i]), 6),
+            "longitude": round(float(points.lon[i]), 6),
+            **({"distance_m": round(float(distances[n]), 1)} if distances is not None else {}),
+        }
+        for n, i in enumerate(shown.tolist())
+    ]
+    return {
+        "status": "success",
+        "mode": mode,
+        "total": int(len(positions)),
+        "crimes": int(points.counts[positions].sum()),
+        "query_ms": round(took_ms, 3),
+        "data": data,
+    }
+
+
+# ---------- 4e) MAP TILES ------------------------------
+@app.get("/tiles/{z}/{x}/{y}", tags=["insights"])
+def get_tile(z: int, x: int, y: int, crime_type: str = None, start: str = None, end: str = None):
+    """
+    Pre-aggregated incident counts for one Web Mercator (slippy map)
+    tile: at most 32 x 32 cells, each [col, row, count, lon, lat] with
+    row 0 at the top and lon/lat the centroid of its incidents, so the
+    payload stays the same size however much history there is. Optional
+    crime_type and start/end month (YYYY-MM, inclusive) filters.
+    Example: /tiles/12/3477/1967?crime_type=ROBBERY&start=2024-01 (downtown Davao)
+    """
+    snap = current_snapshot()
+    pyramid = snap.tile_pyramid
+
+    if not MIN_ZOOM <= z <= pyramid.max_zoom:
+        raise HTTPException(status_code=400, detail=f"z must be between {MIN_ZOOM} and {pyramid.max_zoom}.")
+    if not (0 <= x < 1 << z and 0 <= y < 1 << z):
+        raise HTTPException(status_code=400, detail=f"x and y must be between 0 and {(1 << z) - 1} at z={z}.")
+
+    start_ts, end_ts = parse_month(start, "start"), parse_month(end, "end")
+    first_month = (start_ts.year - 1970) * 12 + start_ts.month - 1 if start_ts is not None else None
+    last_month = (end_ts.year - 1970) * 12 + end_ts.month - 1 if end_ts is not None else None
+    crime_codes = snap.points.crime_codes_for(crime_type) if crime_type else None
+
+    return {"status": "success", "z": z, "x": x, "y": y,
+            **pyramid.tile(z, x, y, crime_codes, first_month, last_month)}
+
+
+# ---------- 5) INCREMENTAL MONTHLY UPDATES -------------
+def get_incremental_model(name: str, snap: DataSnapshot) -> IncrementalModel:
+    model = incremental_models.get(name)
+    if model is not None:
+        return model
+
+    if name == TOTAL_SERIES:
+        spec = series_spec(name, snap.order_winners, enforce=True)
+        target_ts, results = snap.ts, snap.sarima_model
+    else:
+        spec = series_spec(name, snap.order_winners)
+        target_ts = snap.count_cube.series(crime_type=name)
+        if len(target_ts) < MIN_HISTORY_MONTHS:
+            raise ValueError(f"Not enough history for {name} to fit a model.")
+        params = stored_params(name, target_ts, spec, snap.order_winners, get_artifact_store(spec))
+        results = apply_params(target_ts, params, **spec) if params is not None else fit_sarima(target_ts, **spec)
+
+    model = IncrementalModel(name, target_ts, results, refit_every=REFIT_EVERY_MONTHS,
+                             drift_threshold=DRIFT_THRESHOLD, **spec)
+
+    incremental_models[name] = model
+    return model
+
+
+@app.post("/ingest/monthly", response_model=IngestResponse, tags=["ingest"])
+def ingest_monthly(request: IngestRequest, http_request: Request):
+    """
+    Append newly closed months to the city-wide (or one crime type's)
+    fitted model without a full re-estimation. A refit happens every
+    SARIMA_REFIT_EVERY_MONTHS months, when forecast drift passes
+    SARIMA_DRIFT_THRESHOLD, or when "refit": true is sent.
+    Needs X-Admin-Token (SARIMA_ADMIN_TOKEN); disabled when no token
+    is configured.
+    Example body: {"observations": [{"date": "2025-01-01", "count": 210}]}
+    """
+    check_admin_token(http_request)
+    current_snapshot()
+
+    if not request.observations:
+        raise HTTPException(status_code=400, detail="observations must not be empty.")
+
+    try:
+        dates = pd.to_datetime([o.date for o in request.observations]).to_period("M").to_timestamp()
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD.")
+
+    new_ts = pd.Series([float(o.count) for o in request.observations], index=dates).sort_index()
+    if new_ts.index.has_duplicates or len(new_ts) != len(pd.date_range(new_ts.index[0], new_ts.index[-1], freq="MS")):
+        raise HTTPException(status_code=400, detail="observations must be consecutive months without duplicates.")
+    new_ts = new_ts.asfreq("MS")
+
+    name = normalize_crime_type(request.crime_type) if request.crime_type else TOTAL_SERIES
+
+    # held across the update so a reload can't publish in between and
+    # have this ingest's copy of the old snapshot replace it
+    with snapshot_lock:
+        snap = current_snapshot()
+        try:
+            model = get_incremental_model(name, snap)
+            info = model.update(new_ts, force_refit=request.refit)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        if info["refit"]:
+            record_forecast(name, model.forecast)
+            spec = {"order": model.order, "seasonal_order": model.seasonal_order, "enforce": model.enforce}
+            persist_fit(name, model.ts, model.forecast, spec, snap.csv_hash)
+
+        total = {"ts": model.ts, "sarima_model": model.results, "global_forecast": model.forecast}
+        # served forecasts changed without a new dataset version
+        generation = snap.generation + 1
+        publish_snapshot(replace(
+            snap,
+            generation=generation,
+            model_version=compute_model_version(snap.order_winners, generation),
+            **(total if name == TOTAL_SERIES else {}),
+        ), reset=False)
+
+    print(f"[INGEST] {name}: +{info['appended']} month(s), refit={info['reason'] or 'no'}")
+    return IngestResponse(status="success", **info)
+
+
+# ---------- 5b) INCIDENT BATCHES ----------------------
+@app.post("/incidents", response_model=IncidentBatchResponse, tags=["ingest"])
+def ingest_incidents(request: IncidentBatchRequest, http_request: Request):
+    """
+    Append a batch of new incident records to the incident log and fold
+    them into the monthly counts, top crimes / barangays and possible
+    crimes right away. Only the new records are aggregated. A batch_id
+    that was already stored is acknowledged without being added again.
+    Dates must fall between the first month of the dataset and a month
+    from today, and coordinates (when given) inside Davao City; anything
+    else rejects the whole batch with 422. Needs X-Admin-Token
+    (SARIMA_ADMIN_TOKEN); disabled when no token is configured.
+    Example body: {"batch_id": "r-1042", "incidents": [{"date": "2025-01-14",
+        "barangay": "BAGO APLAYA", "crime_type": "Robbery", "count": 1,
+        "latitude": 7.05, "longitude": 125.58}]}
+    """
+    check_admin_token(http_request)
+    snap = current_snapshot()
+
+    if not request.incidents:
+        raise HTTPException(status_code=400, detail="incidents must not be empty.")
+    if len(request.incidents) > INCIDENT_BATCH_LIMIT:
+        raise HTTPException(status_code=400, detail=f"At most {INCIDENT_BATCH_LIMIT} incidents per batch.")
+
+    first_day, last_day = incident_date_bounds(snap.count_cube.months[0])
+    records = []
+    for i, incident in enumerate(request.incidents):
+        try:
+            date = pd.to_datetime(incident.date)
+        except Exception:
+            raise HTTPException(status_code=400, detail=f"incidents[{i}]: invalid date format. Use YYYY-MM-DD.")
+        if not first_day <= date <= last_day:
+            raise HTTPException(status_code=422, detail=f"incidents[{i}]: date must be between "
+                                                        f"{first_day.date()} and {last_day.date()}.")
+        lat, lon = incident.latitude, incident.longitude
+        # no location and the report form's 0/0 placeholder are both "unknown"
+        if (lat is None) != (lon is None):
+            raise HTTPException(status_code=422, detail=f"incidents[{i}]: give both latitude and longitude or neither.")
+        if lat is not None and (lat, lon) != (0, 0) and not in_city(lat, lon):
+            raise HTTPException(status_code=422, detail=f"incidents[{i}]: coordinates outside Davao City "
+                                                        f"(lat {CITY_BOUNDS[0]}..{CITY_BOUNDS[2]}, "
+                                                        f"lon {CITY_BOUNDS[1]}..{CITY_BOUNDS[3]}).")
+        barangay, crime_type = incident.barangay.strip(), incident.crime_type.strip()
+        if not barangay or not crime_type:
+            raise HTTPException(status_code=400, detail=f"incidents[{i}]: barangay and crime_type are required.")
+        if incident.count <= 0:
+            raise HTTPException(status_code=400, detail=f"incidents[{i}]: count must be positive.")
+        records.append({
+            "date": date.strftime("%Y-%m-%d"),
+            "barangay": barangay,
+            "crime_type": crime_type,
+            "crime_count": incident.count,
+            "latitude": incident.latitude,
+            "longitude": incident.longitude,
+        })
+
+    batch_id = request.batch_id or uuid.uuid4().hex
+    # held across append + publish so snapshots fold batches in log order
+    with snapshot_lock:
+        written = incident_store.append(records, batch_id)
+        snap = current_snapshot()
+        if written is not None:
+            snap = apply_incidents(snap)
+            publish_snapshot(snap, reset=False)
+
+    if written is not None:
+        print(f"[INCIDENTS] Batch {batch_id}: +{len(records)} record(s), now {snap.dataset_version}.")
+    return IncidentBatchResponse(
+        status="success",
+        batch_id=batch_id,
+        accepted=len(records) if written is not None else 0,
+        duplicate=written is None,
+        dataset_version=snap.dataset_version,
+        incidents=snap.incidents,
+    )
+
+
+# ---------- 6) FORECAST CACHE --------------------------
+@app.get("/cache/stats", tags=["cache"])
+def get_cache_stats():
+    """
+    Hit/miss counters and size of the fitted-model cache, plus how many
+    fits were started vs. coalesced onto an in-flight fit.
+    Example: /cache/stats
+    """
+    return {
+        "status": "success",
+        "dataset_version": snapshot.dataset_version if snapshot is not None else None,
+        "data": forecast_cache.stats(),
+        "fits": fit_flight.stats(),
+        "hotspots": hotspot_cache.stats(),
+        "spatial_index": snapshot.spatial_index.stats() if snapshot is not None else None,
+        "tiles": snapshot.tile_pyramid.stats() if snapshot is not None else None,
+    }
+
+
+@app.post("/cache/invalidate", tags=["cache"])
+def invalidate_cache(http_request: Request, crime_type: str = None):
+    """
+    Drop cached fits so the next request refits. Needs X-Admin-Token
+    (SARIMA_ADMIN_TOKEN); disabled when no token is configured.
+    Example: POST /cache/invalidate?crime_type=ROBBERY (omit crime_type to clear all)
+    """
+    check_admin_token(http_request)
+    removed = forecast_cache.invalidate(normalize_crime_type(crime_type) if crime_type else None)
+    return {"status": "success", "removed": removed}
+
+
+@app.get("/models/orders", tags=["cache"])
+def get_model_orders():
+    """
+    SARIMA order used for each series: the offline order-search winner
+    (python order_search.py) or the fixed default.
+    Example: /models/orders
+    """
+    snap = current_snapshot()
+
+    data = {}
+    for name in [TOTAL_SERIES] + snap.count_cube.crime_type_names:
+        spec = series_spec(name, snap.order_winners, enforce=name == TOTAL_SERIES)
+        winner = snap.order_winners.get(name)
+        data[name] = {
+            "order": list(spec["order"]),
+            "seasonal_order": list(spec["seasonal_order"]),
+            "source": "search" if winner is not None else "default",
+            "criterion": winner.get("criterion") if winner else None,
+            "score": winner.get(winner.get("criterion")) if winner else None,
+        }
+    return {"status": "success", "data": data}
+
+
+# ---------- 7) METRICS ---------------------------------
+def collect_cache_metrics():
+    """Copy the cache and single-flight counters into the registry at scrape time."""
+    stats = forecast_cache.stats()
+    CACHE_LOOKUPS.set_total(stats["hits"], result="hit")
+    CACHE_LOOKUPS.set_total(stats["misses"], result="miss")
+    CACHE_HIT_RATIO.set(stats["hit_ratio"])
+    CACHE_ENTRIES.set(stats["entries"])
+    flights = fit_flight.stats()
+    FITS_STARTED.set_total(flights["started"], outcome="started")
+    FITS_STARTED.set_total(flights["coalesced"], outcome="coalesced")
+
+
+metrics.add_collector(collect_cache_metrics)
+
+
+@app.get("/metrics", tags=["metrics"])
+def get_metrics():
+    """
+    Prometheus text exposition: request latency per route, fit duration /
+    iterations / ConvergenceWarnings per series, fallback counts (method
+    label of sarima_forecasts_total), cache hit ratio and load phase timings.
+    Example: /metrics
+    """
+    return Response(content=metrics.render(), media_type=CONTENT_TYPE)
+
+
+# ---------- 8) DATASET RELOAD --------------------------
+def check_admin_token(request: Request):
+    """403 unless X-Admin-Token matches SARIMA_ADMIN_TOKEN; write routes fail closed when it is unset."""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Write routes are disabled: SARIMA_ADMIN_TOKEN is not set.")
+    if not hmac.compare_digest(request.headers.get("x-admin-token", ""), ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid or missing X-Admin-Token.")
+
+
+@app.post("/admin/reload", status_code=202, tags=["admin"])
+def trigger_reload(request: Request):
+    """
+    Re-read davao_crime_5years.csv and rebuild the models in the
+    background; the current snapshot keeps serving until the new one is
+    published. Needs X-Admin-Token (SARIMA_ADMIN_TOKEN); disabled when
+    no token is configured (the file watcher still reloads).
+    Example: POST /admin/reload
+    """
+    check_admin_token(request)
+    if reload_lock.locked():
+        return {"status": "running", "reload": dict(reload_status)}
+
+    threading.Thread(target=reload_dataset, args=("admin request",), name="sarima-reload", daemon=True).start()
+    return {"status": "accepted", "reload": dict(reload_status)}
+
+
+@app.get("/admin/reload", tags=["admin"])
+def get_reload_status():
+    """
+    State of the last reload and the snapshot currently served.
+    Example: /admin/reload
+    """
+    snap = snapshot
+    return {
+        "status": "success",
+        "reload": dict(reload_status),
+        "snapshot": snap.summary() if snap is not None else None,
+    }
+
+
+# =========================================================
 # RUN SERVER (for local dev)
 # =========================================================
 if __name__ == '__main__':
@@ -0,0 +1,131 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Hashable, Optional
+
+
+class FittedModelCache:
+    """
+    Bounded LRU + TTL cache for fitted per-crime-type forecasts.
+
+    Keys are (crime_type, dataset_version) tuples, so a reload of the
+    data never serves a forecast fitted on the old dataset.
+    """
+
+    def __init__(self, max_entries: int = 64, ttl_seconds: float = 3600.0):
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_seconds = float(ttl_seconds)
+        self._entries = OrderedDict()   # key -> (stored_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, value = entry
+                if self.ttl_seconds <= 0 or time.monotonic() - stored_at < self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                # expired
+                del self._entries[key]
+                self.evictions += 1
+            self.misses += 1
+            return None
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, crime_type: Optional[str] = None) -> int:
+        """Drop every entry, or only those for one crime type. Returns the count removed."""
+        with self._lock:
+            if crime_type is None:
+                removed = len(self._entries)
+                self._entries.clear()
+                return removed
+            keys = [k for k in self._entries if k[0] == crime_type]
+            for k in keys:
+                del self._entries[k]
+            return len(keys)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent work for the same key onto one shared Future.
+
+    The first caller starts the work; callers arriving while it is still
+    running get the same Future instead of starting a duplicate. `start`
+    runs outside the lock, so slow submissions for other keys (or a
+    `start` that itself uses the SingleFlight) never wait on it.
+    """
+
+    def __init__(self):
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.started = 0
+        self.coalesced = 0
+
+    def run(self, key: Hashable, start: Callable[[], Future]) -> Future:
+        """
+        Return the in-flight Future for `key`, or call `start()` to create
+        one. Callers get a Future that settles with start()'s Future.
+        """
+        with self._lock:
+            shared = self._inflight.get(key)
+            if shared is not None:
+                self.coalesced += 1
+                return shared
+            # claim the key before starting so concurrent callers join this flight
+            shared = Future()
+            self._inflight[key] = shared
+            self.started += 1
+        shared.add_done_callback(lambda _: self._forget(key, shared))
+
+        try:
+            future = start()
+        except BaseException as e:
+            shared.set_exception(e)
+            raise
+        future.add_done_callback(lambda f: _copy_outcome(f, shared))
+        return shared
+
+    def _forget(self, key: Hashable, future: Future) -> None:
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"started": self.started, "coalesced": self.coalesced, "in_flight": len(self._inflight)}
+
+
+def _copy_outcome(source: Future, target: Future) -> None:
+    """Settle `target` the way `source` settled."""
+    if source.cancelled():
+        target.cancel()
+    elif source.exception() is not None:
+        target.set_exception(source.exception())
+    else:
+        target.set_result(source.result())
@@ -0,0 +1,179 @@
+"""
+Offline SARIMA order search, one winner per series.
+
+    python order_search.py --criterion bic --workers 4
+
+Every series the API serves (the city-wide total and each crime type) is
+fitted with every candidate (p,1,q)(P,1,Q)[12] order on a process pool,
+in two stages:
+
+1. screen: a short fit (--screen-iter iterations) of every candidate;
+   candidates whose AIC/BIC is more than --margin above the series' best
+   screened value are dropped as clearly dominated;
+2. refine: the survivors are fitted to convergence, warm-started from
+   their screening params.
+
+The best converged candidate per series is written to the order store
+(artifacts/orders/ by default), which the API reads at startup.
+"""
+import argparse
+import itertools
+import json
+import os
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List
+
+import pandas as pd
+from statsmodels.tools.sm_exceptions import ConvergenceWarning
+
+from artifact_store import OrderStore
+from count_cube import CountCube
+from dataset import BASE_DIR, DEFAULT_CSV_PATH, load_crime_data
+from forecasting import TOTAL_SERIES, fit_sarima, monthly_series
+
+DEFAULT_ORDER_DIR = os.path.join(
+    os.getenv("SARIMA_ARTIFACT_DIR", os.path.join(BASE_DIR, "artifacts")), "orders"
+)
+SEASON = 12
+MIN_SEARCH_MONTHS = 36      # shorter series keep the default order
+
+
+def candidate_orders(max_p: int, max_q: int, max_P: int, max_Q: int) -> List[tuple]:
+    """(order, seasonal_order) pairs, simplest first. d = D = 1 like the API model."""
+    candidates = [
+        ((p, 1, q), (P, 1, Q, SEASON))
+        for p, q, P, Q in itertools.product(range(max_p + 1), range(max_q + 1), range(max_P + 1), range(max_Q + 1))
+    ]
+    return sorted(candidates, key=lambda c: (sum(c[0]) + sum(c[1][:3]), c))
+
+
+def fit_candidate(name: str, target_ts: pd.Series, order, seasonal_order, maxiter: int,
+                  start_params=None) -> dict:
+    """Fit one candidate (enforcing stationarity/invertibility) and summarise it. Runs in a worker."""
+    record = {"name": name, "order": list(order), "seasonal_order": list(seasonal_order)}
+    started = time.perf_counter()
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        try:
+            results = fit_sarima(target_ts, enforce=True, start_params=start_params, order=order,
+                                 seasonal_order=seasonal_order, maxiter=maxiter)
+            record.update(
+                aic=float(results.aic),
+                bic=float(results.bic),
+                llf=float(results.llf),
+                params=[float(p) for p in results.params],
+                converged=bool(results.mle_retvals.get("converged", False)),
+            )
+        except Exception as e:
+            record.update(error=str(e))
+    record["convergence_warnings"] = sum(issubclass(w.category, ConvergenceWarning) for w in caught)
+    record["seconds"] = round(time.perf_counter() - started, 3)
+    return record
+
+
+def search_series(pool: ProcessPoolExecutor, series: Dict[str, pd.Series], candidates: List[tuple],
+                  criterion: str, margin: float, screen_iter: int, maxiter: int) -> Dict[str, dict]:
+    """Screen every (series, candidate), prune dominated ones, refine the rest. Returns name -> report."""
+    def run(jobs):
+        futures = [pool.submit(fit_candidate, *job) for job in jobs]
+        return [f.result() for f in futures]
+
+    screened = run([(name, ts, order, seasonal, screen_iter) for name, ts in series.items()
+                    for order, seasonal in candidates])
+
+    survivors = []
+    reports = {name: {"candidates": len(candidates), "failed": 0, "pruned": 0} for name in series}
+    for name in series:
+        rows = [r for r in screened if r["name"] == name]
+        ok = [r for r in rows if "error" not in r]
+        reports[name]["failed"] = len(rows) - len(ok)
+        if not ok:
+            continue
+        best = min(r[criterion] for r in ok)
+        keep = [r for r in ok if r[criterion] <= best + margin]
+        reports[name]["pruned"] = len(ok) - len(keep)
+        survivors += [(name, series[name], tuple(r["order"]), tuple(r["seasonal_order"]), maxiter, r["params"])
+                      for r in keep]
+
+    refined = run(survivors)
+    for name in series:
+        rows = [r for r in refined if r["name"] == name and "error" not in r]
+        if not rows:
+            continue
+        # a converged fit beats a better-scoring one that did not converge
+        winner = min(rows, key=lambda r: (not r["converged"], r[criterion]))
+        reports[name].update(
+            refined=len(rows),
+            winner={k: winner[k] for k in ("order", "seasonal_order", "aic", "bic", "llf", "params",
+                                           "converged", "convergence_warnings")},
+            runner_up=sorted(r[criterion] for r in rows)[1] if len(rows) > 1 else None,
+        )
+    return reports
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--csv", default=DEFAULT_CSV_PATH)
+    parser.add_argument("--output-dir", default=DEFAULT_ORDER_DIR, help="order store directory")
+    parser.add_argument("--criterion", choices=("aic", "bic"), default="bic")
+    parser.add_argument("--margin", type=float, default=10.0,
+                        help="prune candidates screening this far above the best (10 = no real support)")
+    parser.add_argument("--max-p", type=int, default=2)
+    parser.add_argument("--max-q", type=int, default=2)
+    parser.add_argument("--max-P", type=int, default=1)
+    parser.add_argument("--max-Q", type=int, default=1)
+    parser.add_argument("--screen-iter", type=int, default=15)
+    parser.add_argument("--maxiter", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--series", nargs="*", help="only these crime types (default: total + all)")
+    parser.add_argument("--report", help="also write the full report as JSON here")
+    args = parser.parse_args()
+
+    df = load_crime_data(args.csv)
+    cube = CountCube.from_frame(df)
+    series = {TOTAL_SERIES: monthly_series(df)}
+    series.update({name: cube.series(crime_type=name) for name in cube.crime_type_names})
+    if args.series:
+        wanted = {TOTAL_SERIES} | {" ".join(s.split()).upper() for s in args.series}
+        series = {name: ts for name, ts in series.items() if name in wanted}
+    skipped = [name for name, ts in series.items() if len(ts) < MIN_SEARCH_MONTHS]
+    series = {name: ts for name, ts in series.items() if len(ts) >= MIN_SEARCH_MONTHS}
+
+    candidates = candidate_orders(args.max_p, args.max_q, args.max_P, args.max_Q)
+    print(f"Searching {len(candidates)} orders for {len(series)} series on {args.workers} workers "
+          f"({args.criterion}, margin {args.margin}).")
+
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        reports = search_series(pool, series, candidates, args.criterion, args.margin,
+                                args.screen_iter, args.maxiter)
+
+    store = OrderStore(args.output_dir)
+    for name, report in reports.items():
+        winner = report.get("winner")
+        if winner is None:
+            print(f"  {name}: no candidate could be fitted, keeping the default order")
+            continue
+        store.save(name, series[name], dict(winner, enforce=True, criterion=args.criterion),
+                   df.attrs.get("source_hash"))
+        print(f"  {name}: {tuple(winner['order'])}{tuple(winner['seasonal_order'])} "
+              f"{args.criterion}={winner[args.criterion]:.1f} "
+              f"(pruned {report['pruned']}/{report['candidates']}, converged={winner['converged']})")
+
+    summary = {
+        "criterion": args.criterion,
+        "margin": args.margin,
+        "seconds": round(time.perf_counter() - started, 2),
+        "skipped_short_series": skipped,
+        "series": reports,
+    }
+    print(f"Done in {summary['seconds']}s; winners in {args.output_dir}")
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+import json
+import os
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# optional encoders; each format is only offered when its package is installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+ARROW = "application/vnd.apache.arrow.stream"
+LAYOUTS = ("rows", "columns")
+ETAG_SUFFIXES = {MSGPACK: "msgpack", ARROW: "arrow"}     # JSON keeps the plain ETag
+
+# Accept values -> canonical media type
+MEDIA_ALIASES = {
+    "application/json": JSON,
+    "application/msgpack": MSGPACK,
+    "application/x-msgpack": MSGPACK,
+    "application/vnd.msgpack": MSGPACK,
+    "application/vnd.apache.arrow.stream": ARROW,
+}
+
+# bodies smaller than this go out uncompressed (gzip/brotli cost more than they save)
+COMPRESS_MIN_BYTES = int(os.getenv("SARIMA_COMPRESS_MIN_BYTES", "1024"))
+BROTLI_QUALITY = 4          # fast levels only; 11 costs far more than it saves per request
+
+
+def available_media_types() -> List[str]:
+    media = [JSON]
+    if msgpack is not None:
+        media.append(MSGPACK)
+    if pyarrow is not None:
+        media.append(ARROW)
+    return media
+
+
+# =========================================================
+# Negotiation
+# =========================================================
+def negotiate(accept: Optional[str], tabular: bool = True) -> Optional[str]:
+    """
+    Media type to answer with for an Accept header: the highest-q type
+    we can encode (Arrow only for responses with a table), else JSON
+    (e.g. for Accept: text/csv). None only when the header refuses JSON
+    outright, as application/json;q=0 or a bare */*;q=0 does.
+    """
+    if not accept:
+        return JSON
+    offered = [m for m in available_media_types() if tabular or m != ARROW]
+    ranked = []
+    for position, part in enumerate(accept.split(",")):
+        media, _, params = part.strip().partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        ranked.append((-q, position, media.strip().lower()))
+
+    refused = {MEDIA_ALIASES.get(media, media) for neg_q, _, media in ranked if neg_q == 0}
+    # JSON's q comes from its most specific range in the header
+    listed = {MEDIA_ALIASES.get(media, media) for _, _, media in ranked}
+    json_range = next((m for m in (JSON, "application/*", "*/*") if m in listed), None)
+    json_refused = json_range in refused
+
+    for neg_q, _, media in sorted(ranked):
+        if neg_q == 0:
+            break
+        if media in ("*/*", "application/*"):
+            fits = [m for m in offered if m not in refused and not (m == JSON and json_refused)]
+            if fits:
+                return fits[0]
+            continue
+        canonical = MEDIA_ALIASES.get(media)
+        if canonical in offered and not (canonical == JSON and json_refused):
+            return canonical
+    # nothing listed fits (e.g. text/csv): JSON unless the client refused it
+    return None if json_refused else JSON
+
+
+def accepts_encoding(accept_encoding: Optional[str], coding: str) -> bool:
+    for part in (accept_encoding or "").split(","):
+        name, _, params = part.strip().partition(";")
+        if name.strip().lower() == coding:
+            return params.replace(" ", "") not in ("q=0", "q=0.0")
+    return False
+
+
+# =========================================================
+# Encoders
+# =========================================================
+def dumps_json(payload) -> bytes:
+    """
+    Compact UTF-8 JSON like JSONResponse renders. orjson when installed
+    (also encodes numpy arrays and scalars; a few floats come out spelled
+    differently, e.g. 1e-05 as 0.00001, with the same value).
+    """
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(payload, ensure_ascii=False, allow_nan=False, separators=(",", ":"),
+                      default=_plain).encode("utf-8")
+
+
+def _plain(value):
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def dumps_msgpack(payload) -> bytes:
+    return msgpack.packb(payload, default=_plain, use_bin_type=True)
+
+
+def dumps_arrow(table: Dict[str, list], metadata: Optional[dict] = None) -> bytes:
+    """Arrow IPC stream of one record batch; `metadata` (scalars of the response) goes in the schema."""
+    batch = pyarrow.RecordBatch.from_pydict(table)
+    if metadata:
+        batch = batch.replace_schema_metadata({k: json.dumps(v) for k, v in metadata.items()})
+    sink = pyarrow.BufferOutputStream()
+    with pyarrow.ipc.new_stream(sink, batch.schema) as writer:
+        writer.write_batch(batch)
+    return sink.getvalue().to_pybytes()
+
+
+def encode(payload: dict, media_type: str, table: Optional[Dict[str, list]] = None) -> bytes:
+    """
+    Body for `payload` in `media_type`. Arrow carries `table` (equal-length
+    columns) with the payload's scalar fields as schema metadata.
+    """
+    if media_type == MSGPACK:
+        return dumps_msgpack(payload)
+    if media_type == ARROW:
+        scalars = {k: v for k, v in payload.items() if not isinstance(v, (dict, list))}
+        return dumps_arrow(table, scalars)
+    return dumps_json(payload)
+
+
+def compress(body: bytes, accept_encoding: Optional[str]):
+    """
+    (body, content-encoding) with brotli when the client takes it and the
+    body is worth compressing; (body, None) otherwise, leaving gzip to
+    the GZip middleware.
+    """
+    if brotli is None or len(body) < COMPRESS_MIN_BYTES or not accepts_encoding(accept_encoding, "br"):
+        return body, None
+    return brotli.compress(body, quality=BROTLI_QUALITY), "br"
+
+
+# =========================================================
+# Forecast layouts
+# =========================================================
+def forecast_rows(dates, forecast, lower, upper) -> List[dict]:
+    """[{"date", "forecast", "lower_ci", "upper_ci"}, ...] built straight from the columns."""
+    return [
+        {"date": d, "forecast": f, "lower_ci": lo, "upper_ci": hi}
+        for d, f, lo, hi in zip(dates, forecast, lower, upper)
+    ]
+
+
+def forecast_columns(dates, forecast, lower, upper) -> Dict[str, list]:
+    """{"date": [...], "forecast": [...], "lower_ci": [...], "upper_ci": [...]}."""
+    return {"date": list(dates), "forecast": list(forecast), "lower_ci": list(lower), "upper_ci": list(upper)}
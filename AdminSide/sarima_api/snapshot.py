@@ -0,0 +1,115 @@
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
+
+import pandas as pd
+
+from barangays import BarangayCodes
+from count_cube import CountCube
+from forecasting import SeriesForecast
+from hotspots import IncidentPoints
+from spatial_index import SpatialIndex
+from tiles import TilePyramid
+
+
+# =========================================================
+# Snapshot
+# =========================================================
+@dataclass(frozen=True)
+class DataSnapshot:
+    """
+    Everything the routes read for one loaded dataset and its models.
+
+    A snapshot is built completely off to the side and published with a
+    single reference assignment, so a request that grabbed it at the start
+    never sees half of an old load and half of a new one. Nothing in it is
+    mutated after publication; /ingest/monthly publishes a replaced copy.
+    """
+    dataset_version: str        # hash of the cleaned data, part of every cache key
+    model_version: str          # hash of orders / reconciliation / ingested months
+    csv_hash: str               # sha1 of davao_crime_5years.csv
+    loaded_at: str
+    rows: int
+    ts: pd.Series               # monthly total crimes (city-wide)
+    sarima_model: Any           # fitted statsmodels results for ts
+    global_forecast: SeriesForecast
+    count_cube: CountCube       # month x crime_type x barangay counts
+    top_crimes_overall: pd.Series
+    top_barangays_overall: pd.Series
+    top_crimes_by_month: pd.DataFrame
+    order_winners: Dict[str, dict] = field(default_factory=dict)
+    generation: int = 0         # /ingest/monthly calls applied on top of the load
+    source_version: str = ""    # dataset_version of the CSV alone, before incidents
+    incident_offset: int = 0    # bytes of the incident log folded into the aggregates
+    incidents: int = 0          # incident records folded in
+    points: Optional[IncidentPoints] = None     # located incidents for /hotspots
+    spatial_index: Optional[SpatialIndex] = None    # bucket index over `points` for /nearby
+    tile_pyramid: Optional[TilePyramid] = None      # per-zoom tile aggregates of `points` for /tiles
+    barangay_codes: Optional[BarangayCodes] = None  # canonical barangay / station ids of count_cube.barangays
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.dataset_version}-{self.model_version}"'
+
+    def summary(self) -> dict:
+        return {
+            "dataset_version": self.dataset_version,
+            "model_version": self.model_version,
+            "loaded_at": self.loaded_at,
+            "rows": self.rows,
+            "months": len(self.ts),
+            "generation": self.generation,
+            "incidents": self.incidents,
+        }
+
+
+# =========================================================
+# Source file watcher
+# =========================================================
+class FileWatcher:
+    """
+    Poll a file's mtime/size every `interval` seconds and call
+    `on_change()` once it has changed and then stayed the same for one
+    more poll, so a CSV that is still being written isn't loaded half-way.
+    """
+
+    def __init__(self, path: str, interval: float, on_change: Callable[[], None]):
+        self.path = path
+        self.interval = float(interval)
+        self.on_change = on_change
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _stat(self):
+        try:
+            stat = os.stat(self.path)
+            return stat.st_mtime_ns, stat.st_size
+        except OSError:
+            return None
+
+    def _run(self):
+        seen = self._stat()
+        pending = None
+        while not self._stop.wait(self.interval):
+            current = self._stat()
+            if current is None or current == seen:
+                pending = None
+                continue
+            if current != pending:
+                pending = current      # changed; wait one poll for it to settle
+                continue
+            seen, pending = current, None
+            try:
+                self.on_change()
+            except Exception as e:
+                print(f"[ERROR] Reload after {os.path.basename(self.path)} changed failed: {e}")
+
+    def start(self) -> "FileWatcher":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="sarima-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
@@ -0,0 +1,145 @@
+import math
+from typing import Optional
+
+import numpy as np
+
+from hotspots import IncidentPoints
+
+EARTH_RADIUS_M = 6371008.8
+METERS_PER_DEGREE = 2 * math.pi * EARTH_RADIUS_M / 360     # along a meridian of the same sphere
+BOX_MARGIN = 1.01                   # the lat/lon box around a radius is only exact on the equator
+DEFAULT_INDEX_CELL_DEGREES = 0.01   # ~1.1 km buckets
+MERGE_FRACTION = 0.1                # fold the delta in once it passes 10% of the index
+MIN_MERGE_SIZE = 1024
+
+# cell id = (row + LAT_OFFSET) * ID_STRIDE + (col + LON_OFFSET); any cell
+# size down to ~0.005 degrees keeps row/col inside the offsets
+LAT_OFFSET = 1 << 15
+LON_OFFSET = 1 << 16
+ID_STRIDE = 1 << 18
+
+
+def haversine_m(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """Great-circle distance in meters from one point to many."""
+    p1, p2 = math.radians(lat), np.radians(lats)
+    dphi = p2 - p1
+    dlam = np.radians(lons) - math.radians(lon)
+    a = np.sin(dphi / 2) ** 2 + math.cos(p1) * np.cos(p2) * np.sin(dlam / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class SpatialIndex:
+    """
+    Fixed-degree bucket index (a flat geohash) over an IncidentPoints.
+
+    Point positions are sorted by cell id, row-major, so the cells of one
+    grid row inside a query box are a single contiguous slice found with
+    two searchsorted calls; a query touches a few slices and then checks
+    only those candidates exactly.
+
+    IncidentPoints only ever grows by appending, so an index stays valid
+    for later versions of it: `extend` leaves the sorted part alone and
+    scans the newly appended positions linearly (the delta) until the
+    delta passes MERGE_FRACTION of the index, then re-sorts everything.
+    """
+
+    def __init__(self, points: IncidentPoints, cell: float, order: np.ndarray, cell_ids: np.ndarray,
+                 indexed: int):
+        self.points = points
+        self.cell = cell
+        self.order = order          # point positions sorted by cell id
+        self.cell_ids = cell_ids    # cell id of each entry of `order`
+        self.indexed = indexed      # positions [0, indexed) are in `order`; the rest is the delta
+        self.bounds = None          # (south, west, north, east) of every point
+        if len(points):
+            self.bounds = (float(points.lat.min()), float(points.lon.min()),
+                           float(points.lat.max()), float(points.lon.max()))
+
+    @classmethod
+    def build(cls, points: IncidentPoints, cell: float = DEFAULT_INDEX_CELL_DEGREES) -> "SpatialIndex":
+        ids = cls._cell_ids(points.lat, points.lon, cell)
+        order = np.argsort(ids, kind="stable")
+        return cls(points, cell, order, ids[order], len(points))
+
+    @staticmethod
+    def _cell_ids(lat: np.ndarray, lon: np.ndarray, cell: float) -> np.ndarray:
+        rows = np.floor(lat / cell).astype(np.int64) + LAT_OFFSET
+        cols = np.floor(lon / cell).astype(np.int64) + LON_OFFSET
+        return rows * ID_STRIDE + cols
+
+    def extend(self, points: IncidentPoints) -> "SpatialIndex":
+        """Index for `points`, a later (appended-to) version of this index's points."""
+        if len(points) == len(self.points):
+            return self
+        if len(points) - self.indexed > max(MIN_MERGE_SIZE, MERGE_FRACTION * self.indexed):
+            return SpatialIndex.build(points, self.cell)
+        return SpatialIndex(points, self.cell, self.order, self.cell_ids, self.indexed)
+
+    def stats(self) -> dict:
+        return {
+            "points": len(self.points),
+            "indexed": self.indexed,
+            "delta": len(self.points) - self.indexed,
+            "cells": int(np.count_nonzero(np.diff(self.cell_ids)) + 1) if self.indexed else 0,
+            "cell_degrees": self.cell,
+        }
+
+    # -----------------------------------------------------
+    # queries (positions into self.points)
+    # -----------------------------------------------------
+    def in_box(self, south: float, west: float, north: float, east: float) -> np.ndarray:
+        """Positions of the points inside the box, in no particular order."""
+        row_lo = math.floor(south / self.cell) + LAT_OFFSET
+        row_hi = math.floor(north / self.cell) + LAT_OFFSET
+        col_lo = math.floor(west / self.cell) + LON_OFFSET
+        col_hi = math.floor(east / self.cell) + LON_OFFSET
+
+        rows = np.arange(row_lo, row_hi + 1, dtype=np.int64) * ID_STRIDE
+        starts = np.searchsorted(self.cell_ids, rows + col_lo, side="left")
+        ends = np.searchsorted(self.cell_ids, rows + col_hi, side="right")
+        parts = [self.order[s:e] for s, e in zip(starts.tolist(), ends.tolist()) if e > s]
+        parts.append(np.arange(self.indexed, len(self.points)))
+        candidates = np.concatenate(parts) if len(parts) > 1 else parts[0]
+
+        lat, lon = self.points.lat[candidates], self.points.lon[candidates]
+        inside = (lat >= south) & (lat <= north) & (lon >= west) & (lon <= east)
+        return candidates[inside]
+
+    def within(self, lat: float, lon: float, radius_m: float):
+        """(positions, distances in meters) of the points within `radius_m`, nearest first."""
+        dlat = BOX_MARGIN * radius_m / METERS_PER_DEGREE
+        dlon = BOX_MARGIN * radius_m / (METERS_PER_DEGREE * max(math.cos(math.radians(lat)), 1e-6))
+        candidates = self.in_box(lat - dlat, lon - dlon, lat + dlat, lon + dlon)
+        distances = haversine_m(lat, lon, self.points.lat[candidates], self.points.lon[candidates])
+        keep = distances <= radius_m
+        candidates, distances = candidates[keep], distances[keep]
+        order = np.argsort(distances, kind="stable")
+        return candidates[order], distances[order]
+
+    def nearest(self, lat: float, lon: float, k: int, match=None, max_radius_m: Optional[float] = None):
+        """
+        (positions, distances) of the `k` nearest points accepted by
+        `match` (positions -> bool mask). The search radius starts at one
+        cell and doubles until k matches are found inside it, so a
+        query near the data touches only the buckets around the point.
+        """
+        if len(self.points) == 0 or k <= 0:
+            return np.array([], dtype=np.intp), np.array([], dtype=np.float64)
+
+        # far enough to reach every point, whatever the query location
+        south, west, north, east = self.bounds
+        reach = float(haversine_m(lat, lon, np.array([south, south, north, north]),
+                                  np.array([west, east, west, east])).max())
+        reach += 2 * self.cell * METERS_PER_DEGREE
+        limit = reach if max_radius_m is None else min(max_radius_m, reach)
+
+        radius = self.cell * METERS_PER_DEGREE
+        while True:
+            radius = min(radius, limit)
+            positions, distances = self.within(lat, lon, radius)
+            if match is not None:
+                keep = match(positions)
+                positions, distances = positions[keep], distances[keep]
+            if len(positions) >= k or radius >= limit:
+                return positions[:k], distances[:k]
+            radius *= 2
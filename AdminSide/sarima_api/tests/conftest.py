@@ -0,0 +1,38 @@
+import importlib
+import os
+import sys
+
+import pytest
+
+# the API modules are flat siblings of this folder, imported by name
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TOKEN = "test-token"
+
+
+@pytest.fixture(scope="session")
+def client(tmp_path_factory):
+    """
+    TestClient over main.app, trained before the first request, with the
+    incident log, artifacts and dataset cache under a temp folder so a
+    test run never writes into the source tree.
+    """
+    from fastapi.testclient import TestClient
+
+    tmp = tmp_path_factory.mktemp("api")
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("SARIMA_INCIDENT_LOG", str(tmp / "incidents.jsonl"))
+        mp.setenv("SARIMA_ARTIFACT_DIR", str(tmp / "artifacts"))
+        mp.setenv("SARIMA_DATASET_CACHE_DIR", str(tmp / "dataset_cache"))
+        mp.setenv("SARIMA_ADMIN_TOKEN", TOKEN)
+        mp.setenv("SARIMA_FAST_START", "0")
+        mp.setenv("SARIMA_RELOAD_POLL_SECONDS", "0")
+        mp.setenv("SARIMA_WARMUP", "0")
+        mp.setenv("SARIMA_HIERARCHY_PREBUILD", "0")
+        mp.setenv("SARIMA_HIERARCHY_MIN_INTERVAL_SECONDS", "0")
+        # these read their settings at import
+        for name in ("main", "incident_store", "dataset"):
+            mp.delitem(sys.modules, name, raising=False)
+        main = importlib.import_module("main")
+        with TestClient(main.app) as test_client:
+            yield test_client
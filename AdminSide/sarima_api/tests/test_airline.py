@@ -0,0 +1,84 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from airline import fit_airline, forecast_airline
+from forecasting import fit_sarima
+
+HORIZON = 12
+
+
+def simulate_airline(rng, theta: float, seasonal_theta: float, months: int = 72, level: float = 50.0):
+    """A SARIMA(0,1,1)(0,1,1)[12] path around a seasonal level."""
+    e = rng.normal(0.0, 3.0, months + 13)
+    w = e[13:] + theta * e[12:-1] + seasonal_theta * e[1:-12] + theta * seasonal_theta * e[:-13]
+    y = np.zeros(months)
+    for t in range(months):
+        y[t] = w[t] + (y[t - 1] if t >= 1 else 0) + (y[t - 12] if t >= 12 else 0) - (y[t - 13] if t >= 13 else 0)
+    return y + level + 10 * np.sin(np.arange(months) * 2 * np.pi / 12)
+
+
+@pytest.fixture(scope="module")
+def parity():
+    rng = np.random.default_rng(7)
+    Y = np.array([simulate_airline(rng, t, s) for t, s in [(-0.3, -0.5), (-0.6, -0.4), (0.2, -0.7), (-0.5, -0.8)]])
+    months = pd.date_range("2019-01-01", periods=Y.shape[1], freq="MS")
+
+    fit = fit_airline(Y)
+    mean, lower, upper = forecast_airline(Y, fit, HORIZON)
+
+    reference = []
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        for row in Y:
+            results = fit_sarima(pd.Series(row, index=months), enforce=True)
+            forecast = results.get_forecast(steps=HORIZON)
+            reference.append((results.params.values, results.llf, forecast.predicted_mean.values,
+                              forecast.conf_int().values))
+    return Y, fit, (mean, lower, upper), reference
+
+
+def test_params_and_loglike_match_sarimax(parity):
+    Y, fit, _, reference = parity
+    for i, (params, llf, _, _) in enumerate(reference):
+        np.testing.assert_allclose(fit.params[i, :2], params[:2], atol=0.02)
+        assert fit.loglike[i] == pytest.approx(llf, abs=0.05)
+    assert not fit.degenerate.any()
+
+
+def test_forecasts_and_intervals_match_sarimax(parity):
+    Y, _, (mean, lower, upper), reference = parity
+    for i, (_, _, sm_mean, sm_ci) in enumerate(reference):
+        scale = max(Y[i].mean(), 1.0)
+        assert np.abs(mean[i] - sm_mean).max() / scale < 0.01
+        assert np.abs(lower[i] - sm_ci[:, 0]).max() / scale < 0.01
+        assert np.abs(upper[i] - sm_ci[:, 1]).max() / scale < 0.01
+
+
+def test_constant_differences_are_flagged_and_repeat_the_pattern():
+    Y = np.vstack([np.tile(np.arange(12.0), 6), np.full(72, 5.0)])
+    fit = fit_airline(Y)
+    mean, lower, upper = forecast_airline(Y, fit, 3)
+
+    assert fit.degenerate.all()
+    np.testing.assert_allclose(mean, [[0, 1, 2], [5, 5, 5]])
+    np.testing.assert_allclose(lower, mean)
+    np.testing.assert_allclose(upper, mean)
+
+
+def test_blocked_grid_matches_the_cached_one(parity, monkeypatch):
+    import airline
+    Y, fit, (mean, _, _), _ = parity
+    # a budget too small to keep the grid factors: built and scored block by block
+    monkeypatch.setattr(airline, "MEMORY_BUDGET", 64 * 2**10)
+    blocked = fit_airline(Y)
+    np.testing.assert_allclose(blocked.params, fit.params)
+    np.testing.assert_allclose(forecast_airline(Y, blocked, HORIZON)[0], mean)
+
+
+def test_series_longer_than_the_cap_are_rejected():
+    import airline
+    with pytest.raises(ValueError, match="at most"):
+        fit_airline(np.ones((1, airline.MAX_MONTHS + 1)))
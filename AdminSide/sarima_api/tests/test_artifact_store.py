@@ -0,0 +1,36 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from artifact_store import ArtifactStore
+
+
+def monthly(values):
+    return pd.Series(values, index=pd.date_range("2020-01-01", periods=len(values), freq="MS"), dtype=float)
+
+
+def test_round_trip_and_stale_series(tmp_path):
+    store = ArtifactStore(str(tmp_path), (1, 1, 1), (1, 1, 1, 12))
+    series = monthly(range(24))
+    store.save("ROBBERY", series, [0.1, 0.2, 0.3])
+
+    assert np.allclose(store.load_params("ROBBERY", series), [0.1, 0.2, 0.3])
+    assert store.load_params("ROBBERY", monthly(range(1, 25))) is None
+    assert store.load_params("ROBBERY", series, enforce=True) is None
+
+
+def test_concurrent_saves_of_one_artifact_do_not_collide(tmp_path, capsys):
+    store = ArtifactStore(str(tmp_path), (1, 1, 1), (1, 1, 1, 12))
+    series = monthly(range(240))
+
+    def save(i):
+        store.save("ROBBERY", series, [float(i)] * 50)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(save, range(200)))
+
+    assert "[WARN]" not in capsys.readouterr().out
+    assert store.load_params("ROBBERY", series) is not None
+    assert os.listdir(store.root) == ["robbery.json"]
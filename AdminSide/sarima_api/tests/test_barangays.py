@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+from barangays import UNASSIGNED_STATION, BarangayCodes, normalize_barangay, station_note
+
+LISTING = [
+    ("PS1", "BARANGAY 19-B (POB.)"),
+    ("PS1", "BARANGAY 1-A (POB.)"),
+    ("PS2", "Wilfredo Aquino"),
+    ("PS2", "75-A Matina Aplaya"),
+    ("PS3", "Talomo Proper"),
+    ("PS3", "Buhangin Proper"),
+    ("PS10", "Sto. Niño"),
+]
+
+
+@pytest.fixture
+def codes():
+    return BarangayCodes.from_listing(LISTING)
+
+
+@pytest.mark.parametrize("raw, key", [
+    ("BARANGAY 19-B (POB.)", "19B"),
+    ("Brgy. 19-B", "19B"),
+    ("brgy 19b (pob)", "19B"),
+    ("75-A Matina Aplaya", "75A MATINA APLAYA"),
+    ("BUHANGIN PROPER (BRGY IS NOW UNDER PS 18, DCPO)", "BUHANGIN PROPER"),
+])
+def test_normalized_match_keys(raw, key):
+    assert normalize_barangay(raw) == key
+
+
+def test_station_note():
+    assert station_note("Buhangin (BRGY IS NOW UNDER PS 18, DCPO)") == "PS18"
+    assert station_note("Buhangin (brgy under ps 3)") == "PS3"
+    assert station_note("Buhangin") is None
+
+
+def test_resolution_methods(codes):
+    table = codes.extend([
+        "BRGY 19-B",                # exact after normalizing
+        "AQUINO",                   # alias
+        "MATINA APLAYA",            # alias to a numbered barangay
+        "TALOMO PROPPER",           # close spelling
+        "Santo Nino",               # alias
+        "NEW TOWN",                 # in no list
+    ])
+    names = [table.names[cid] for cid in table.canonical]
+    assert names == ["BARANGAY 19-B (POB.)", "Wilfredo Aquino", "75-A Matina Aplaya", "Talomo Proper",
+                     "Sto. Niño", "NEW TOWN"]
+    assert table.methods == ["exact", "alias", "alias", "fuzzy", "alias", "unlisted"]
+    assert [table.stations[s] for s in table.station_codes] == ["PS1", "PS2", "PS2", "PS3", "PS10",
+                                                                 UNASSIGNED_STATION]
+
+
+def test_numbered_barangays_are_never_fuzzy_matched(codes):
+    table = codes.extend(["BARANGAY 11-A", "BARANGAY 1-A"])
+    assert table.methods == ["unlisted", "exact"]
+    assert table.canonical[0] != table.canonical[1]
+
+
+def test_short_names_are_never_fuzzy_matched():
+    table = BarangayCodes.from_listing([("PS1", "Bago")]).extend(["BAGA"])
+    assert table.methods == ["unlisted"]
+
+
+def test_station_note_moves_the_whole_barangay(codes):
+    table = codes.extend(["Buhangin Proper", "BUHANGIN PROPER (BRGY IS NOW UNDER PS 18, DCPO)"])
+    assert table.canonical[0] == table.canonical[1]
+    assert [table.stations[s] for s in table.station_codes] == ["PS18", "PS18"]
+    assert "PS18" not in codes.stations     # the original table is left alone
+
+
+def test_extend_skips_resolved_names_and_keeps_ids(codes):
+    first = codes.extend(["NEW TOWN", "AQUINO"])
+    second = first.extend(["AQUINO", "NEW  TOWN", "OTHER PLACE"])
+    assert second.raw_names == ["NEW TOWN", "AQUINO", "NEW  TOWN", "OTHER PLACE"]
+    assert np.array_equal(second.canonical[:2], first.canonical)
+    assert second.canonical[2] == first.canonical[0]
+    assert first.extend(["AQUINO"]) is first
+
+
+def test_match_key_matches_extend(codes):
+    for raw in ["BRGY 19-B", "AQUINO", "TALOMO PROPPER", "NEW TOWN"]:
+        table = codes.extend([raw])
+        assert codes.match_key(raw) == table.keys[table.canonical[0]]
@@ -0,0 +1,44 @@
+import pytest
+
+from conftest import TOKEN
+from serialization import MSGPACK, available_media_types
+
+
+def test_matching_etag_gets_a_304(client):
+    first = client.get("/stats")
+    etag = first.headers["etag"]
+    assert first.status_code == 200 and etag.startswith('W/"')
+    assert "must-revalidate" in first.headers["cache-control"]
+
+    for if_none_match in (etag, etag.removeprefix("W/"), f'"other", {etag}', "*"):
+        response = client.get("/stats", headers={"If-None-Match": if_none_match})
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+    assert client.get("/stats", headers={"If-None-Match": '"other"'}).status_code == 200
+
+
+def test_unversioned_routes_are_not_tagged(client):
+    assert "etag" not in client.get("/health").headers
+
+
+def test_publishing_incidents_changes_the_etag(client):
+    etag = client.get("/stats").headers["etag"]
+    response = client.post("/incidents", headers={"X-Admin-Token": TOKEN}, json={"incidents": [
+        {"date": "2024-11-20", "barangay": "BAGO APLAYA", "crime_type": "Theft", "count": 2}]})
+    assert response.status_code == 200
+
+    fresh = client.get("/stats", headers={"If-None-Match": etag})
+    assert fresh.status_code == 200
+    assert fresh.headers["etag"] != etag
+    assert client.get("/stats", headers={"If-None-Match": fresh.headers["etag"]}).status_code == 304
+
+
+def test_binary_representations_get_their_own_etag(client):
+    if MSGPACK not in available_media_types():
+        pytest.skip("msgpack is not installed")
+    json_etag = client.get("/forecast").headers["etag"]
+    msgpack_etag = client.get("/forecast", headers={"Accept": MSGPACK}).headers["etag"]
+    assert msgpack_etag != json_etag
+    assert client.get("/forecast", headers={"Accept": MSGPACK, "If-None-Match": json_etag}).status_code == 200
@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from count_cube import CountCube
+
+
+def incidents(rng, n: int, start: str, end: str, crime_types, barangays) -> pd.DataFrame:
+    days = pd.date_range(start, end, freq="D")
+    return pd.DataFrame({
+        "date": rng.choice(days, n),
+        "crime_type": rng.choice(crime_types, n),
+        "barangay": rng.choice(barangays, n),
+        "crime_count": rng.integers(1, 4, n),
+    })
+
+
+def aligned_counts(cube: CountCube, crime_types, barangays) -> np.ndarray:
+    """cube.counts with the label axes in the given order (add appends, from_frame sorts)."""
+    c = [cube.crime_types.index(name) for name in crime_types]
+    b = [cube.barangays.index(name) for name in barangays]
+    return cube.counts[:, c][:, :, b]
+
+
+def assert_same_cube(added: CountCube, rebuilt: CountCube):
+    assert list(added.months) == list(rebuilt.months)
+    assert sorted(added.crime_types) == rebuilt.crime_types
+    assert sorted(added.barangays) == rebuilt.barangays
+    np.testing.assert_array_equal(aligned_counts(added, rebuilt.crime_types, rebuilt.barangays), rebuilt.counts)
+
+    # the incrementally updated running totals match a recomputation from counts
+    fresh = CountCube(added.months, added.crime_types, added.barangays, added.counts)
+    np.testing.assert_array_equal(added.cum, fresh.cum)
+    np.testing.assert_array_equal(added.month_totals, fresh.month_totals)
+    np.testing.assert_array_equal(added.calendar_totals, fresh.calendar_totals)
+
+
+@pytest.fixture
+def base():
+    rng = np.random.default_rng(3)
+    return rng, incidents(rng, 400, "2022-01-01", "2023-12-31", ["ROBBERY", "THEFT", "MURDER"],
+                          ["BAGO APLAYA", "TALOMO", "BUHANGIN"])
+
+
+def test_add_latest_month_matches_rebuild(base):
+    rng, history = base
+    new = incidents(rng, 30, "2023-12-01", "2024-01-31", ["ROBBERY", "THEFT"], ["TALOMO", "BUHANGIN"])
+    assert_same_cube(CountCube.from_frame(history).add(new), CountCube.from_frame(pd.concat([history, new])))
+
+
+def test_add_new_labels_and_earlier_months_matches_rebuild(base):
+    rng, history = base
+    new = incidents(rng, 50, "2021-06-01", "2024-03-31", ["ROBBERY", "CARNAPPING"], ["TALOMO", "CALINAN"])
+    assert_same_cube(CountCube.from_frame(history).add(new), CountCube.from_frame(pd.concat([history, new])))
+
+
+def test_batches_in_sequence_match_rebuild(base):
+    rng, history = base
+    cube, frames = CountCube.from_frame(history), [history]
+    for month in ("2024-01", "2024-02", "2023-07"):
+        batch = incidents(rng, 10, f"{month}-01", f"{month}-28", ["THEFT", "HOMICIDE"], ["BUHANGIN", "TORIL"])
+        cube = cube.add(batch)
+        frames.append(batch)
+    assert_same_cube(cube, CountCube.from_frame(pd.concat(frames)))
+
+
+def test_add_leaves_the_original_untouched(base):
+    rng, history = base
+    cube = CountCube.from_frame(history)
+    before = cube.counts.copy(), cube.cum.copy()
+    cube.add(incidents(rng, 20, "2024-01-01", "2024-01-31", ["ROBBERY"], ["TALOMO"]))
+    np.testing.assert_array_equal(cube.counts, before[0])
+    np.testing.assert_array_equal(cube.cum, before[1])
+
+
+def test_add_nothing_returns_the_same_cube(base):
+    _, history = base
+    cube = CountCube.from_frame(history)
+    assert cube.add(history.iloc[:0]) is cube
@@ -0,0 +1,129 @@
+import os
+import time
+
+from snapshot import FileWatcher
+
+
+class Polls:
+    """Stands in for the watcher's stop event: runs one step per poll, then stops."""
+
+    def __init__(self, steps):
+        self.steps = list(steps)
+
+    def wait(self, timeout):
+        if not self.steps:
+            return True
+        self.steps.pop(0)()
+        return False
+
+    def set(self):
+        self.steps = []
+
+
+def watch(path, steps):
+    """Names of the polls after which on_change fired."""
+    fired = []
+    watcher = FileWatcher(str(path), 0, lambda: fired.append(poll[0]))
+    poll = [None]
+
+    def step(name, action):
+        def run():
+            poll[0] = name
+            action()
+        return run
+
+    watcher._stop = Polls(step(name, action) for name, action in steps)
+    watcher._run()
+    return fired
+
+
+def write(path, text, mtime_ns):
+    def run():
+        path.write_text(text)
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+    return run
+
+
+def nothing():
+    pass
+
+
+def test_fires_once_after_the_file_settles(tmp_path):
+    path = tmp_path / "crimes.csv"
+    write(path, "a\n", 1_000)()
+    fired = watch(path, [
+        ("grows", write(path, "a\nb", 2_000)),
+        ("grows more", write(path, "a\nb\nc\n", 3_000)),
+        ("settled", nothing),
+        ("quiet", nothing),
+        ("quiet again", nothing),
+    ])
+    assert fired == ["settled"]
+
+
+def test_waits_while_the_size_still_changes(tmp_path):
+    path = tmp_path / "crimes.csv"
+    write(path, "a\n", 1_000)()
+    fired = watch(path, [
+        ("first chunk", write(path, "a\nb", 2_000)),
+        ("same mtime, more bytes", write(path, "a\nb\nc\n", 2_000)),
+        ("settled", nothing),
+    ])
+    assert fired == ["settled"]
+
+
+def test_every_settled_change_fires(tmp_path):
+    path = tmp_path / "crimes.csv"
+    write(path, "a\n", 1_000)()
+    fired = watch(path, [
+        ("edit", write(path, "b\n", 2_000)),
+        ("settled", nothing),
+        ("second edit", write(path, "c\nc\n", 3_000)),
+        ("settled again", nothing),
+    ])
+    assert fired == ["settled", "settled again"]
+
+
+def test_a_missing_file_does_not_fire(tmp_path):
+    path = tmp_path / "crimes.csv"
+    write(path, "a\n", 1_000)()
+    fired = watch(path, [
+        ("removed", path.unlink),
+        ("still gone", nothing),
+        ("back unchanged", write(path, "a\n", 1_000)),
+        ("quiet", nothing),
+    ])
+    assert fired == []
+
+
+def test_a_failing_reload_keeps_watching(tmp_path, capsys):
+    path = tmp_path / "crimes.csv"
+    write(path, "a\n", 1_000)()
+    calls = []
+
+    def reload():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("bad csv")
+
+    watcher = FileWatcher(str(path), 0, reload)
+    watcher._stop = Polls([write(path, "b\n", 2_000), nothing, write(path, "c\nc\n", 3_000), nothing])
+    watcher._run()
+    assert len(calls) == 2
+    assert "[ERROR] Reload after crimes.csv changed failed: bad csv" in capsys.readouterr().out
+
+
+def test_thread_picks_up_a_change(tmp_path):
+    path = tmp_path / "crimes.csv"
+    write(path, "a\n", 1_000)()
+    fired = []
+    watcher = FileWatcher(str(path), 0.02, lambda: fired.append(1)).start()
+    try:
+        time.sleep(0.1)     # let the thread take its first stat
+        write(path, "b\nb\n", 2_000)()
+        deadline = time.monotonic() + 5
+        while not fired and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        watcher.stop()
+    assert fired == [1]
@@ -0,0 +1,40 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+
+@pytest.fixture
+def broken_pool(client, monkeypatch):
+    import main
+    pool = ProcessPoolExecutor(max_workers=1)
+    with pytest.raises(BrokenProcessPool):
+        pool.submit(os._exit, 1).result()
+    monkeypatch.setattr(main, "fit_pool", pool)
+    main.forecast_cache.invalidate()
+    yield main
+    main.reset_fit_pool()
+
+
+def test_batch_refits_in_process_when_the_pool_is_broken(client, broken_pool):
+    main = broken_pool
+    names = [n for n in main.current_snapshot().count_cube.crime_type_names
+             if n not in main.incremental_models][:2]
+
+    response = client.post("/forecast/batch", json={"crime_types": names, "horizon": 6})
+    assert response.status_code == 200
+    assert sorted(response.json()["series"]) == sorted(names)
+    assert main.fit_pool is None
+    for name in names:
+        assert main.forecast_cache.get((name, main.current_snapshot().dataset_version)) is not None
+
+
+def test_single_route_refits_in_process_when_the_pool_is_broken(client, broken_pool):
+    main = broken_pool
+    name = next(n for n in main.current_snapshot().count_cube.crime_type_names
+                if n not in main.incremental_models)
+
+    response = client.get("/forecast", params={"crime_type": name, "horizon": 6})
+    assert response.status_code == 200
+    assert main.fit_pool is None
@@ -0,0 +1,77 @@
+import time
+
+import pytest
+
+
+def wait_for_builder(main, timeout: float = 120.0):
+    deadline = time.monotonic() + timeout
+    while main.hierarchy_building and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert not main.hierarchy_building
+
+
+@pytest.fixture
+def failing_build(client, monkeypatch):
+    import main
+    wait_for_builder(main)
+    calls = []
+
+    def build(*args, **kwargs):
+        calls.append(1)
+        raise MemoryError("cannot allocate")
+
+    monkeypatch.setattr(main.HierarchicalForecast, "build", build)
+    monkeypatch.setattr(main, "hierarchy_forecast", None)
+    monkeypatch.setattr(main, "hierarchy_failure", None)
+    return main, calls
+
+
+def test_failed_build_is_not_retried_by_every_request(client, failing_build):
+    main, calls = failing_build
+    main.schedule_hierarchy_build()
+    wait_for_builder(main)
+
+    for _ in range(3):
+        response = client.get("/forecast/hierarchy")
+        assert response.status_code == 503
+        assert "failed" in response.json()["detail"]
+        assert int(response.headers["retry-after"]) > 15
+        wait_for_builder(main)
+    assert len(calls) == 1
+    assert client.get("/ready").json()["hierarchy_error"] == "cannot allocate"
+
+
+def test_failed_build_is_retried_after_the_backoff(client, failing_build, monkeypatch):
+    main, calls = failing_build
+    main.schedule_hierarchy_build()
+    wait_for_builder(main)
+
+    monkeypatch.setattr(main, "HIERARCHY_RETRY_SECONDS", 0.0)
+    client.get("/forecast/hierarchy")
+    wait_for_builder(main)
+    assert len(calls) == 2
+
+
+def test_rebuilds_wait_out_the_minimum_interval(client, monkeypatch):
+    import main
+    wait_for_builder(main)
+    starts = []
+
+    def build(*args, **kwargs):
+        starts.append(time.monotonic())
+        raise MemoryError("cannot allocate")
+
+    monkeypatch.setattr(main.HierarchicalForecast, "build", build)
+    monkeypatch.setattr(main, "hierarchy_forecast", None)
+    monkeypatch.setattr(main, "hierarchy_failure", None)
+    monkeypatch.setattr(main, "HIERARCHY_RETRY_SECONDS", 0.0)
+    monkeypatch.setattr(main, "HIERARCHY_MIN_INTERVAL_SECONDS", 1.0)
+    last_start = time.monotonic()
+    monkeypatch.setattr(main, "hierarchy_started_at", last_start)
+
+    main.schedule_hierarchy_build()
+    main.schedule_hierarchy_build()
+    assert main.hierarchy_building
+    wait_for_builder(main)
+    assert len(starts) == 1
+    assert starts[0] - last_start >= 1.0
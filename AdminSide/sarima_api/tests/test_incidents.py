@@ -0,0 +1,137 @@
+import pandas as pd
+import pytest
+
+from conftest import TOKEN
+from incident_store import RECORD_COLUMNS, IncidentStore
+
+RECORD = {"date": "2024-12-05", "barangay": "BAGO APLAYA", "crime_type": "ROBBERY", "crime_count": 1,
+          "latitude": 7.05, "longitude": 125.58}
+
+
+# =========================================================
+# IncidentStore
+# =========================================================
+def test_repeated_batch_id_is_stored_once(tmp_path):
+    store = IncidentStore(str(tmp_path / "incidents.jsonl"))
+    assert store.append([RECORD, RECORD], "b1") == (0, store.size)
+    assert store.append([RECORD], "b1") is None
+    assert store.records == 2
+    assert len(store.read()) == 2
+
+
+def test_batches_are_remembered_across_restarts(tmp_path):
+    path = str(tmp_path / "incidents.jsonl")
+    IncidentStore(path).append([RECORD], "b1")
+    store = IncidentStore(path)
+    assert store.append([RECORD], "b1") is None
+    assert store.append([RECORD], "b2") is not None
+    assert store.records == 2
+
+
+def test_partial_last_line_is_dropped_on_recovery(tmp_path):
+    path = str(tmp_path / "incidents.jsonl")
+    store = IncidentStore(path)
+    store.append([RECORD], "b1")
+    with open(path, "ab") as f:
+        f.write(b'{"batch":"b2","date":"2024-')
+
+    recovered = IncidentStore(path)
+    assert (recovered.size, recovered.records) == (store.size, 1)
+    assert recovered.state() == store.state()
+    assert recovered.append([RECORD], "b2") is not None
+
+
+def test_read_between_offsets(tmp_path):
+    store = IncidentStore(str(tmp_path / "incidents.jsonl"))
+    _, first_end = store.append([RECORD], "b1")
+    store.append([dict(RECORD, crime_type="THEFT", latitude=None, longitude=None)], "b2")
+
+    tail = store.read(first_end)
+    assert tail["crime_type"].tolist() == ["THEFT"]
+    assert tail["latitude"].isna().all()
+    assert str(tail["date"].dtype).startswith("datetime64")
+
+
+# =========================================================
+# POST /incidents
+# =========================================================
+def post(client, incidents, batch_id=None, token=TOKEN):
+    body = {"incidents": incidents}
+    if batch_id:
+        body["batch_id"] = batch_id
+    return client.post("/incidents", json=body, headers={"X-Admin-Token": token} if token else {})
+
+
+def incident(**changes):
+    base = {"date": "2024-12-05", "barangay": "BAGO APLAYA", "crime_type": "Robbery", "count": 1}
+    base.update(changes)
+    return {k: v for k, v in base.items() if v is not None}
+
+
+def test_admin_token_is_required(client):
+    assert post(client, [incident()], token=None).status_code == 403
+    assert post(client, [incident()], token="wrong").status_code == 403
+
+
+@pytest.mark.parametrize("changes", [
+    {"date": "2099-01-01"},
+    {"date": "1900-01-01"},
+    {"latitude": 95.0, "longitude": 500.0},
+    {"latitude": 14.6, "longitude": 121.0},         # Manila
+    {"latitude": 7.05},                             # longitude missing
+])
+def test_out_of_range_batches_are_rejected(client, changes):
+    before = client.get("/ready").json()["snapshot"]["dataset_version"]
+    response = post(client, [incident(), incident(**changes)])
+    assert response.status_code == 422
+    assert client.get("/ready").json()["snapshot"]["dataset_version"] == before
+
+
+@pytest.mark.parametrize("changes", [
+    {},
+    {"latitude": 7.07, "longitude": 125.61},
+    {"latitude": 0.0, "longitude": 0.0},            # the report form's "no location"
+])
+def test_valid_incidents_are_accepted(client, changes):
+    response = post(client, [incident(**changes)])
+    assert response.status_code == 200
+    assert response.json()["accepted"] == 1
+
+
+def test_resent_batch_is_acknowledged_without_counting_twice(client):
+    first = post(client, [incident(), incident(crime_type="THEFT")], batch_id="resend-1").json()
+    again = post(client, [incident(), incident(crime_type="THEFT")], batch_id="resend-1").json()
+
+    assert (first["accepted"], first["duplicate"]) == (2, False)
+    assert (again["accepted"], again["duplicate"]) == (0, True)
+    assert again["dataset_version"] == first["dataset_version"]
+    assert again["incidents"] == first["incidents"]
+
+
+def test_write_routes_fail_closed_without_a_token(client, monkeypatch):
+    import main
+    monkeypatch.setattr(main, "ADMIN_TOKEN", None)
+    assert post(client, [incident()], token="anything").status_code == 403
+    assert client.post("/cache/invalidate").status_code == 403
+    assert client.post("/admin/reload").status_code == 403
+
+
+def test_replay_skips_records_the_route_would_reject(client):
+    import main
+    snap = main.snapshot
+    records = pd.DataFrame([
+        dict(RECORD),
+        dict(RECORD, date="1900-01-01"),
+        dict(RECORD, date="2099-06-01"),
+        dict(RECORD, date="not a date"),
+        dict(RECORD, latitude=14.6, longitude=121.0),
+        dict(RECORD, latitude=0.0, longitude=0.0),
+        dict(RECORD, latitude=None, longitude=None),
+    ], columns=RECORD_COLUMNS)
+    records["date"] = pd.to_datetime(records["date"], errors="coerce")
+    records["latitude"] = pd.to_numeric(records["latitude"]).astype("float32")
+    records["longitude"] = pd.to_numeric(records["longitude"]).astype("float32")
+
+    kept = main.valid_incidents(records, snap.count_cube.months[0])
+    assert len(kept) == 3
+    assert kept["date"].max() < pd.Timestamp("2099-01-01")
@@ -0,0 +1,139 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import pytest
+
+from model_cache import FittedModelCache, SingleFlight
+
+
+# =========================================================
+# FittedModelCache
+# =========================================================
+def test_evicts_least_recently_used():
+    cache = FittedModelCache(max_entries=2, ttl_seconds=0)
+    cache.put(("ROBBERY", "v1"), "robbery")
+    cache.put(("THEFT", "v1"), "theft")
+    assert cache.get(("ROBBERY", "v1")) == "robbery"     # THEFT is now the oldest
+
+    cache.put(("MURDER", "v1"), "murder")
+
+    assert cache.get(("THEFT", "v1")) is None
+    assert cache.get(("ROBBERY", "v1")) == "robbery"
+    assert cache.get(("MURDER", "v1")) == "murder"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_expires_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    cache = FittedModelCache(max_entries=4, ttl_seconds=60)
+    cache.put(("ROBBERY", "v1"), "robbery")
+
+    now[0] += 59
+    assert cache.get(("ROBBERY", "v1")) == "robbery"
+    now[0] += 2
+    assert cache.get(("ROBBERY", "v1")) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_invalidate_one_crime_type_keeps_the_others():
+    cache = FittedModelCache(max_entries=8, ttl_seconds=0)
+    for version in ("v1", "v2"):
+        cache.put(("ROBBERY", version), "robbery")
+        cache.put(("THEFT", version), "theft")
+
+    assert cache.invalidate("ROBBERY") == 2
+    assert cache.get(("ROBBERY", "v2")) is None
+    assert cache.get(("THEFT", "v2")) == "theft"
+    assert cache.invalidate() == 2
+
+
+def test_stats_count_hits_and_misses():
+    cache = FittedModelCache(max_entries=2, ttl_seconds=0)
+    cache.put("a", 1)
+    cache.get("a")
+    cache.get("b")
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_ratio"]) == (1, 1, 0.5)
+
+
+# =========================================================
+# SingleFlight
+# =========================================================
+def test_concurrent_callers_share_one_start():
+    flight = SingleFlight()
+    release = threading.Event()
+    starts = []
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        def start() -> Future:
+            starts.append(1)
+            return pool.submit(lambda: release.wait(5) and 42)
+
+        results = []
+        callers = [threading.Thread(target=lambda: results.append(flight.run("ROBBERY", start))) for _ in range(8)]
+        for t in callers:
+            t.start()
+        for t in callers:
+            t.join()
+        release.set()
+
+        assert len(starts) == 1
+        assert {f.result(timeout=5) for f in results} == {42}
+    assert flight.stats() == {"started": 1, "coalesced": 7, "in_flight": 0}
+
+
+def test_new_flight_after_the_previous_one_finished():
+    flight = SingleFlight()
+
+    def start() -> Future:
+        future = Future()
+        future.set_result("done")
+        return future
+
+    assert flight.run("k", start).result() == "done"
+    assert flight.run("k", start).result() == "done"
+    assert flight.stats()["started"] == 2
+
+
+def test_failure_reaches_every_waiter_and_clears_the_key():
+    flight = SingleFlight()
+    pending = Future()
+    first = flight.run("k", lambda: pending)
+    second = flight.run("k", lambda: pytest.fail("joined callers must not start"))
+
+    pending.set_exception(RuntimeError("fit failed"))
+
+    for future in (first, second):
+        with pytest.raises(RuntimeError, match="fit failed"):
+            future.result()
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_start_that_raises_propagates_and_clears_the_key():
+    flight = SingleFlight()
+
+    def start() -> Future:
+        raise ValueError("no pool")
+
+    with pytest.raises(ValueError):
+        flight.run("k", start)
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_start_runs_outside_the_lock():
+    flight = SingleFlight()
+    inner = {}
+
+    def start() -> Future:
+        # a start that needs the SingleFlight (another key) must not deadlock
+        done = Future()
+        done.set_result("inner")
+        inner["future"] = flight.run("other", lambda: done)
+        outer = Future()
+        outer.set_result("outer")
+        return outer
+
+    assert flight.run("k", start).result(timeout=5) == "outer"
+    assert inner["future"].result(timeout=5) == "inner"
@@ -0,0 +1,47 @@
+import pytest
+
+from serialization import ARROW, JSON, MSGPACK, available_media_types, negotiate
+
+
+@pytest.mark.parametrize("accept", [None, "", "*/*", "application/*", "text/csv", "text/html, text/csv;q=0.5"])
+def test_unmet_accept_falls_back_to_json(accept):
+    assert negotiate(accept) == JSON
+
+
+@pytest.mark.parametrize("accept", ["application/json;q=0", "text/csv, application/json;q=0", "*/*;q=0",
+                                    "text/csv, */*;q=0"])
+def test_explicitly_refused_json_is_not_acceptable(accept):
+    assert negotiate(accept) is None
+
+
+def test_a_specific_range_overrides_a_refused_wildcard():
+    assert negotiate("*/*;q=0, application/json") == JSON
+
+
+def test_wildcard_skips_a_refused_json():
+    offered = [m for m in available_media_types() if m != JSON]
+    assert negotiate("application/json;q=0, */*") == (offered[0] if offered else None)
+
+
+@pytest.mark.parametrize("media", [MSGPACK, ARROW])
+def test_binary_types_when_installed(media):
+    if media not in available_media_types():
+        pytest.skip(f"no encoder for {media}")
+    assert negotiate(f"{media}, application/json;q=0.5") == media
+    assert negotiate(media, tabular=False) == (media if media != ARROW else JSON)
+
+
+def test_route_answers_json_for_an_unmet_accept(client):
+    response = client.get("/forecast", params={"horizon": 3}, headers={"Accept": "text/csv"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == JSON
+    assert client.get("/forecast", headers={"Accept": "application/json;q=0"}).status_code == 406
+
+
+def test_gzip_leaves_a_brotli_body_alone(client, monkeypatch):
+    import main
+    body = b"x" * 4096          # stands in for a br body; brotli itself is optional
+    monkeypatch.setattr(main, "compress", lambda raw, accept_encoding: (body, "br"))
+    response = client.get("/forecast", params={"horizon": 3}, headers={"Accept-Encoding": "gzip, br"})
+    assert response.headers["content-encoding"] == "br"
+    assert response.num_bytes_downloaded == len(body)
@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import spatial_index
+from hotspots import CITY_BOUNDS, IncidentPoints
+from spatial_index import SpatialIndex, haversine_m
+
+
+def random_points(n: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    south, west, north, east = CITY_BOUNDS
+    return pd.DataFrame({
+        "date": pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 365, n), unit="D"),
+        "crime_type": rng.choice(["THEFT", "ROBBERY", "PHYSICAL INJURY"], n),
+        "crime_count": 1,
+        "latitude": rng.uniform(south, north, n),
+        "longitude": rng.uniform(west, east, n),
+    })
+
+
+def brute_box(points, south, west, north, east):
+    inside = (points.lat >= south) & (points.lat <= north) & (points.lon >= west) & (points.lon <= east)
+    return np.flatnonzero(inside)
+
+
+def brute_within(points, lat, lon, radius_m):
+    distances = haversine_m(lat, lon, points.lat, points.lon)
+    return np.flatnonzero(distances <= radius_m)
+
+
+QUERIES = [
+    (7.07, 125.61, 7.09, 125.63),       # downtown
+    (7.0, 125.4, 7.3, 125.7),           # most of the city
+    (6.0, 124.0, 6.5, 124.5),           # nowhere near it
+    (7.100, 125.600, 7.100, 125.600),   # a single point
+]
+
+
+@pytest.fixture(scope="module")
+def index():
+    return SpatialIndex.build(IncidentPoints.from_frame(random_points(5000, seed=1)))
+
+
+@pytest.mark.parametrize("box", QUERIES)
+def test_box_query_matches_a_full_scan(index, box):
+    assert sorted(index.in_box(*box).tolist()) == brute_box(index.points, *box).tolist()
+
+
+@pytest.mark.parametrize("radius_m", [50.0, 800.0, 5000.0])
+def test_radius_query_matches_a_full_scan_nearest_first(index, radius_m):
+    positions, distances = index.within(7.08, 125.61, radius_m)
+    assert sorted(positions.tolist()) == brute_within(index.points, 7.08, 125.61, radius_m).tolist()
+    assert np.all(np.diff(distances) >= 0)
+
+
+def test_nearest_matches_a_full_scan(index):
+    positions, distances = index.nearest(7.08, 125.61, k=10)
+    everything = haversine_m(7.08, 125.61, index.points.lat, index.points.lon)
+    assert np.allclose(distances, np.sort(everything)[:10])
+
+    robbery = index.points.crime_types.index("ROBBERY")
+    positions, _ = index.nearest(7.08, 125.61, k=5, match=lambda p: index.points.crime_codes[p] == robbery)
+    assert len(positions) == 5 and np.all(index.points.crime_codes[positions] == robbery)
+
+
+def test_queries_see_points_in_the_delta(index):
+    grown = index.points.add(random_points(200, seed=2))
+    extended = index.extend(grown)
+    assert extended.indexed == index.indexed and extended.stats()["delta"] == 200
+
+    for box in QUERIES:
+        assert sorted(extended.in_box(*box).tolist()) == brute_box(grown, *box).tolist()
+    positions, _ = extended.within(7.08, 125.61, 2000.0)
+    assert sorted(positions.tolist()) == brute_within(grown, 7.08, 125.61, 2000.0).tolist()
+
+
+def test_a_large_delta_is_merged(index, monkeypatch):
+    monkeypatch.setattr(spatial_index, "MIN_MERGE_SIZE", 10)
+    grown = index.points.add(random_points(600, seed=3))
+    extended = index.extend(grown)
+    assert extended.indexed == len(grown) and extended.stats()["delta"] == 0
+    assert sorted(extended.in_box(*QUERIES[1]).tolist()) == brute_box(grown, *QUERIES[1]).tolist()
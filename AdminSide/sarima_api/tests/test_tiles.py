@@ -0,0 +1,128 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import tiles
+from hotspots import CITY_BOUNDS, IncidentPoints
+from tiles import CELL_BITS, MAX_ZOOM, MIN_ZOOM, TilePyramid, mercator_cells, months_since_epoch
+
+
+def tile_bounds(z: int, x: int, y: int) -> tuple:
+    """(south, west, north, east) of a slippy-map tile, the standard inverse."""
+    n = 1 << z
+
+    def lat(row):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * row / n))))
+
+    return lat(y + 1), x / n * 360.0 - 180.0, lat(y), (x + 1) / n * 360.0 - 180.0
+
+
+def tile_of(lat, lon, z: int) -> tuple:
+    gx, gy = mercator_cells(np.atleast_1d(lat), np.atleast_1d(lon))
+    shift = MAX_ZOOM - z + CELL_BITS
+    return gx >> shift, gy >> shift
+
+
+def random_points(n: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    south, west, north, east = CITY_BOUNDS
+    return pd.DataFrame({
+        "date": pd.Timestamp("2023-01-01") + pd.to_timedelta(rng.integers(0, 730, n), unit="D"),
+        "crime_type": rng.choice(["THEFT", "ROBBERY", "PHYSICAL INJURY"], n),
+        "crime_count": rng.integers(1, 4, n),
+        "latitude": rng.uniform(south, north, n),
+        "longitude": rng.uniform(west, east, n),
+    })
+
+
+@pytest.fixture(scope="module")
+def points():
+    return IncidentPoints.from_frame(random_points(3000, seed=1))
+
+
+@pytest.fixture(scope="module")
+def pyramid(points):
+    return TilePyramid.build(points)
+
+
+@pytest.mark.parametrize("z", [MIN_ZOOM, 12, 15, MAX_ZOOM])
+def test_every_point_lies_inside_its_tile(points, z):
+    xs, ys = tile_of(points.lat, points.lon, z)
+    for lat, lon, x, y in zip(points.lat[:200], points.lon[:200], xs[:200].tolist(), ys[:200].tolist()):
+        south, west, north, east = tile_bounds(z, x, y)
+        assert south <= lat <= north and west <= lon <= east
+
+
+@pytest.mark.parametrize("z", [MIN_ZOOM, 10, 14, MAX_ZOOM])
+def test_tile_corners_round_trip(z):
+    x, y = tile_of(7.07, 125.61, z)
+    south, west, north, east = tile_bounds(z, int(x[0]), int(y[0]))
+    eps = 1e-9
+    for lat, lon in [(north - eps, west + eps), (south + eps, east - eps), ((south + north) / 2, (west + east) / 2)]:
+        assert tile_of(lat, lon, z) == (x, y)
+
+
+def brute_tile(points, z, x, y, codes=None, first_month=None, last_month=None):
+    xs, ys = tile_of(points.lat, points.lon, z)
+    keep = (xs == x) & (ys == y)
+    if codes is not None:
+        keep &= np.isin(points.crime_codes, codes)
+    months = months_since_epoch(points.days)
+    if first_month is not None:
+        keep &= months >= first_month
+    if last_month is not None:
+        keep &= months <= last_month
+    return int(points.counts[keep].sum())
+
+
+@pytest.mark.parametrize("z", [MIN_ZOOM, 11, 13])
+def test_tiles_count_what_a_full_scan_counts(points, pyramid, z):
+    xs, ys = tile_of(points.lat, points.lon, z)
+    seen = set(zip(xs.tolist(), ys.tolist()))
+    assert sum(pyramid.tile(z, x, y)["total"] for x, y in seen) == int(points.counts.sum())
+    for x, y in list(seen)[:20]:
+        tile = pyramid.tile(z, x, y)
+        assert tile["total"] == brute_tile(points, z, x, y)
+        assert sum(cell[2] for cell in tile["cells"]) == tile["total"]
+        south, west, north, east = tile_bounds(z, x, y)
+        for col, row, _, lon, lat in tile["cells"]:
+            assert 0 <= col < 32 and 0 <= row < 32
+            assert south <= lat <= north and west <= lon <= east
+
+
+def test_filters_match_a_full_scan(points, pyramid):
+    x, y = tile_of(7.07, 125.61, 10)
+    x, y = int(x[0]), int(y[0])
+    codes = np.array([points.crime_types.index("ROBBERY")])
+    first, last = months_since_epoch(np.array(["2023-06-01", "2024-03-01"], dtype="datetime64[D]")).tolist()
+    assert pyramid.tile(10, x, y, codes, first, last)["total"] == brute_tile(points, 10, x, y, codes, first, last)
+
+
+@pytest.mark.parametrize("min_merge", [tiles.MIN_MERGE_SIZE, 10])
+def test_appended_points_are_counted(points, pyramid, monkeypatch, min_merge):
+    monkeypatch.setattr(tiles, "MIN_MERGE_SIZE", min_merge)
+    grown = points.add(random_points(400, seed=2))
+    extended = pyramid.extend(grown)
+    assert extended.stats()["delta"] == (400 if min_merge > 400 else 0)
+
+    rebuilt = TilePyramid.build(grown)
+    xs, ys = tile_of(grown.lat, grown.lon, 12)
+    for x, y in list(set(zip(xs.tolist(), ys.tolist())))[:30]:
+        got, want = extended.tile(12, x, y), rebuilt.tile(12, x, y)
+        assert got["total"] == want["total"]
+        assert [cell[:3] for cell in got["cells"]] == [cell[:3] for cell in want["cells"]]
+
+
+def test_documented_tile_has_data(client):
+    # the /tiles/{z}/{x}/{y} docstring example; downtown Davao at z12
+    response = client.get("/tiles/12/3477/1967", params={"crime_type": "ROBBERY", "start": "2024-01"})
+    assert response.status_code == 200
+    assert response.json()["total"] > 0
+    assert client.get("/tiles/12/3477/1967").json()["total"] > response.json()["total"]
+
+
+def test_tile_coordinates_are_validated(client):
+    assert client.get("/tiles/4/0/0").status_code == 400
+    assert client.get("/tiles/12/4096/0").status_code == 400
@@ -0,0 +1,188 @@
+import math
+from typing import Dict, Optional
+
+import numpy as np
+
+from hotspots import IncidentPoints
+
+MIN_ZOOM = 6                # one tile covers all of Davao (and then some)
+MAX_ZOOM = 18
+CELL_BITS = 5               # 2**5 = 32 x 32 cells per tile, at most 1024 per response
+MERGE_FRACTION = 0.1        # same delta policy as SpatialIndex
+MIN_MERGE_SIZE = 1024
+MAX_MERCATOR_LAT = 85.05112878
+
+
+def mercator_cells(lat: np.ndarray, lon: np.ndarray, max_zoom: int = MAX_ZOOM) -> tuple:
+    """
+    Global Web Mercator cell coordinates (x, y) at `max_zoom`, with
+    2**CELL_BITS cells per tile side; `>> (max_zoom - z)` gives zoom z.
+    """
+    scale = float(1 << (max_zoom + CELL_BITS))
+    lat = np.radians(np.clip(lat, -MAX_MERCATOR_LAT, MAX_MERCATOR_LAT))
+    x = (np.asarray(lon, dtype=np.float64) + 180.0) / 360.0
+    y = (1.0 - np.log(np.tan(lat) + 1.0 / np.cos(lat)) / math.pi) / 2.0
+    top = scale - 1
+    return (np.clip(np.floor(x * scale), 0, top).astype(np.int64),
+            np.clip(np.floor(y * scale), 0, top).astype(np.int64))
+
+
+def months_since_epoch(days: np.ndarray) -> np.ndarray:
+    return days.astype("datetime64[M]").astype(np.int64)
+
+
+def _binned(cells: np.ndarray, weights: np.ndarray, size: int) -> np.ndarray:
+    # np.bincount returns int64 instead of float64 for empty input
+    return np.bincount(cells, weights=weights, minlength=size).astype(np.float64, copy=False)
+
+
+class TileLevel:
+    """
+    Aggregates for one zoom level: one row per (cell, crime type, month)
+    with the incident count and coordinate sums (for a count-weighted
+    centroid), sorted by cell key = tile * cells_per_tile + cell so one
+    tile is one contiguous slice.
+    """
+
+    def __init__(self, keys: np.ndarray, crime_codes: np.ndarray, months: np.ndarray, counts: np.ndarray,
+                 lat_sums: np.ndarray, lon_sums: np.ndarray):
+        self.keys = keys
+        self.crime_codes = crime_codes
+        self.months = months
+        self.counts = counts
+        self.lat_sums = lat_sums
+        self.lon_sums = lon_sums
+
+    @classmethod
+    def build(cls, keys: np.ndarray, crime_codes: np.ndarray, months: np.ndarray, counts: np.ndarray,
+              lat: np.ndarray, lon: np.ndarray) -> "TileLevel":
+        order = np.lexsort((months, crime_codes, keys))
+        keys, crime_codes, months = keys[order], crime_codes[order], months[order]
+        if len(keys) == 0:
+            return cls(keys, crime_codes, months, counts[order].astype(np.int64),
+                       lat[order], lon[order])
+        new_group = np.ones(len(keys), dtype=bool)
+        new_group[1:] = (np.diff(keys) != 0) | (np.diff(crime_codes) != 0) | (np.diff(months) != 0)
+        starts = np.flatnonzero(new_group)
+        weights = counts[order].astype(np.int64)
+        return cls(
+            keys[starts], crime_codes[starts], months[starts],
+            np.add.reduceat(weights, starts),
+            np.add.reduceat(lat[order] * weights, starts),
+            np.add.reduceat(lon[order] * weights, starts),
+        )
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+
+class TilePyramid:
+    """
+    Incident counts per Web Mercator tile cell, crime type and month for
+    every zoom from MIN_ZOOM to MAX_ZOOM, precomputed so a tile request
+    is a slice + filter + one bincount and returns at most
+    (2**CELL_BITS)**2 cells however many incidents there are.
+
+    Built over an IncidentPoints and, like SpatialIndex, extended by
+    appended points without re-aggregation: they stay in a delta that is
+    binned at request time until it passes MERGE_FRACTION of the
+    aggregated points.
+    """
+
+    def __init__(self, points: IncidentPoints, levels: Dict[int, TileLevel], indexed: int,
+                 max_zoom: int = MAX_ZOOM):
+        self.points = points
+        self.levels = levels
+        self.indexed = indexed      # points [0, indexed) are in `levels`; the rest is the delta
+        self.max_zoom = max_zoom
+
+    @classmethod
+    def build(cls, points: IncidentPoints, max_zoom: int = MAX_ZOOM) -> "TilePyramid":
+        gx, gy = mercator_cells(points.lat, points.lon, max_zoom)
+        months = months_since_epoch(points.days)
+        levels = {}
+        for zoom in range(MIN_ZOOM, max_zoom + 1):
+            levels[zoom] = TileLevel.build(cls._keys(gx, gy, zoom, max_zoom), points.crime_codes, months,
+                                           points.counts, points.lat, points.lon)
+        return cls(points, levels, len(points), max_zoom)
+
+    @staticmethod
+    def _keys(gx: np.ndarray, gy: np.ndarray, zoom: int, max_zoom: int) -> np.ndarray:
+        """Cell key at `zoom`: tile (row-major over 2**zoom tiles) then cell within the tile."""
+        shift = max_zoom - zoom
+        cx, cy = gx >> shift, gy >> shift
+        side = 1 << CELL_BITS
+        tile = (cx >> CELL_BITS) * (1 << zoom) + (cy >> CELL_BITS)
+        return tile * (side * side) + (cy & (side - 1)) * side + (cx & (side - 1))
+
+    def extend(self, points: IncidentPoints) -> "TilePyramid":
+        """Pyramid for `points`, a later (appended-to) version of this pyramid's points."""
+        if len(points) == len(self.points):
+            return self
+        if len(points) - self.indexed > max(MIN_MERGE_SIZE, MERGE_FRACTION * self.indexed):
+            return TilePyramid.build(points, self.max_zoom)
+        return TilePyramid(points, self.levels, self.indexed, self.max_zoom)
+
+    def stats(self) -> dict:
+        return {
+            "points": len(self.points),
+            "delta": len(self.points) - self.indexed,
+            "zooms": [MIN_ZOOM, self.max_zoom],
+            "rows": {zoom: len(level) for zoom, level in self.levels.items()},
+        }
+
+    def tile(self, zoom: int, x: int, y: int, crime_codes: Optional[np.ndarray] = None,
+             first_month: Optional[int] = None, last_month: Optional[int] = None) -> dict:
+        """
+        Cells of tile zoom/x/y with incidents, optionally only for some
+        crime-type codes and an inclusive month range (months since 1970).
+        Each cell is [col, row, count, lon, lat] with row 0 at the top and
+        lon/lat the count-weighted centroid of its incidents.
+        """
+        side = 1 << CELL_BITS
+        per_tile = side * side
+        tile = x * (1 << zoom) + y
+        level = self.levels[zoom]
+        lo, hi = np.searchsorted(level.keys, [tile * per_tile, (tile + 1) * per_tile])
+
+        cells = level.keys[lo:hi] - tile * per_tile
+        keep = self._match(level.crime_codes[lo:hi], level.months[lo:hi], crime_codes, first_month, last_month)
+        counts = _binned(cells[keep], level.counts[lo:hi][keep], per_tile)
+        lat_sums = _binned(cells[keep], level.lat_sums[lo:hi][keep], per_tile)
+        lon_sums = _binned(cells[keep], level.lon_sums[lo:hi][keep], per_tile)
+
+        if self.indexed < len(self.points):
+            delta = slice(self.indexed, len(self.points))
+            gx, gy = mercator_cells(self.points.lat[delta], self.points.lon[delta], self.max_zoom)
+            keys = self._keys(gx, gy, zoom, self.max_zoom)
+            keep = (keys >= tile * per_tile) & (keys < (tile + 1) * per_tile) & self._match(
+                self.points.crime_codes[delta], months_since_epoch(self.points.days[delta]),
+                crime_codes, first_month, last_month)
+            weights = self.points.counts[delta][keep].astype(np.float64)
+            cells = keys[keep] - tile * per_tile
+            counts += _binned(cells, weights, per_tile)
+            lat_sums += _binned(cells, self.points.lat[delta][keep] * weights, per_tile)
+            lon_sums += _binned(cells, self.points.lon[delta][keep] * weights, per_tile)
+
+        filled = np.flatnonzero(counts)
+        return {
+            "cells_per_side": side,
+            "total": int(counts.sum()),
+            "cells": [
+                [c % side, c // side, int(n), round(lo_sum / n, 6), round(la_sum / n, 6)]
+                for c, n, lo_sum, la_sum in zip(filled.tolist(), counts[filled].tolist(),
+                                                lon_sums[filled].tolist(), lat_sums[filled].tolist())
+            ],
+        }
+
+    @staticmethod
+    def _match(crime_codes: np.ndarray, months: np.ndarray, wanted: Optional[np.ndarray],
+               first_month: Optional[int], last_month: Optional[int]) -> np.ndarray:
+        keep = np.ones(len(crime_codes), dtype=bool)
+        if wanted is not None:
+            keep &= np.isin(crime_codes, wanted)
+        if first_month is not None:
+            keep &= months >= first_month
+        if last_month is not None:
+            keep &= months <= last_month
+        return keep
@@ -2,20 +2,13 @@
 import pandas as pd
 import numpy as np
 from statsmodels.tsa.statespace.sarimax import SARIMAX
-import os
-import sys
+
+from dataset import DEFAULT_CSV_PATH, load_crime_data
 
 # Load Data
-base_dir = os.path.dirname(os.path.abspath(__file__))
-csv_path = os.path.join(base_dir, "..", "data", "davao_crime_5years.csv")
-
-print(f"Loading data from: {csv_path}")
-df = pd.read_csv(csv_path)
-df["date"] = pd.to_datetime(df["date"], errors="coerce")
-df = df.dropna(subset=["date"]).sort_values("date")
-df["crime_count"] = pd.to_numeric(df["crime_count"], errors="coerce")
-df = df[df["crime_count"] > 0]
-df["crime_type"] = df["crime_type"].astype(str).str.strip().str.upper()
+print(f"Loading data from: {DEFAULT_CSV_PATH}")
+df = load_crime_data()
+df["crime_type"] = df["crime_type"].astype(str).str.upper()
 
 crime_type = "ROBBERY"
 print(f"\nAnalyzing: {crime_type}")